@@ -0,0 +1,30 @@
+"""Index reports on (created_at, id) for keyset pagination
+
+Revision ID: 3f1c9a2b7d10
+Revises:
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f1c9a2b7d10"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches ORDER BY created_at DESC, id DESC and the row-value comparison
+    # used by cursor pagination in ReportService.query_reports.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_created_at_id "
+            "ON reports (created_at DESC, id DESC)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reports_created_at_id")
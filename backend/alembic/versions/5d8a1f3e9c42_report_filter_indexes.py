@@ -0,0 +1,43 @@
+"""Composite indexes for status, severity and primary issue-type filters
+
+Revision ID: 5d8a1f3e9c42
+Revises: c47d9e2f5b18
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8a1f3e9c42"
+down_revision = "c47d9e2f5b18"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    # status IN (...) ORDER BY created_at DESC, id DESC: walk each status'
+    # range already in page order, no sort step
+    "ix_reports_status_created_at":
+        "ON reports (status, created_at DESC, id DESC)",
+    # min/max_severity range scans, ordered for recency within a band
+    "ix_reports_severity_created_at":
+        "ON reports (severity_score, created_at DESC) WHERE severity_score IS NOT NULL",
+    # EXISTS probe from a report row: primary label of report_id
+    "ix_issue_labels_primary_report":
+        "ON issue_labels (report_id, label) WHERE is_primary",
+    # Label-driven plans: all reports whose primary label is X
+    "ix_issue_labels_primary_label":
+        "ON issue_labels (label, report_id) WHERE is_primary",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
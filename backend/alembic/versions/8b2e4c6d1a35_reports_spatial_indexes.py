@@ -0,0 +1,42 @@
+"""GiST indexes on reports.geometry for bbox and radius queries
+
+Revision ID: 8b2e4c6d1a35
+Revises: 3f1c9a2b7d10
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = "8b2e4c6d1a35"
+down_revision = "3f1c9a2b7d10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Serves the && envelope test used for bbox (map viewport) filtering
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_geometry "
+            "ON reports USING GIST (geometry)"
+        )
+        # Serves ST_DWithin(geography(geometry), ...) radius queries; geography
+        # needs lon/lat, so geometries stored in another SRID are transformed
+        # exactly as ReportService._filter_radius does.
+        geometry = "geometry"
+        if settings.SPATIAL_SRID != 4326:
+            geometry = "ST_Transform(geometry, 4326)"
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_geography "
+            f"ON reports USING GIST (geography({geometry}))"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reports_geography")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reports_geometry")
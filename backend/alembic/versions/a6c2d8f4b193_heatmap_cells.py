@@ -0,0 +1,40 @@
+"""Pre-aggregated heatmap cell counts per tile, issue type and day
+
+Revision ID: a6c2d8f4b193
+Revises: e91b3c7a4f26
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a6c2d8f4b193"
+down_revision = "e91b3c7a4f26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Maintained by app.services.heatmap_tiles; after upgrading an existing
+    # database, fill it with scripts/rebuild_heatmap_tiles.py.
+    # The primary key is the ON CONFLICT arbiter for delta upserts and
+    # serves tile reads (zoom, tile range, day >= ...).
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS heatmap_cells (
+            zoom SMALLINT NOT NULL,
+            tile_x INTEGER NOT NULL,
+            tile_y INTEGER NOT NULL,
+            day DATE NOT NULL,
+            issue_type VARCHAR(50) NOT NULL DEFAULT '',
+            cell INTEGER NOT NULL,
+            report_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (zoom, tile_x, tile_y, day, issue_type, cell)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS heatmap_cells")
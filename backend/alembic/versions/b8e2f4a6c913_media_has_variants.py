@@ -0,0 +1,26 @@
+"""Record whether an image's thumbnail and model variants were stored
+
+Revision ID: b8e2f4a6c913
+Revises: a6c2d8f4b193
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e2f4a6c913"
+down_revision = "a6c2d8f4b193"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # FALSE for images the server could not decode (e.g. HEIC, truncated
+    # uploads): only the original is stored. A constant default does not
+    # rewrite the table.
+    op.execute("ALTER TABLE media ADD COLUMN IF NOT EXISTS has_variants BOOLEAN NOT NULL DEFAULT TRUE")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE media DROP COLUMN IF EXISTS has_variants")
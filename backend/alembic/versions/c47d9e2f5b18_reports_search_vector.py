@@ -0,0 +1,86 @@
+"""Full-text search vector and GIN index on reports
+
+Revision ID: c47d9e2f5b18
+Revises: 8b2e4c6d1a35
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = "c47d9e2f5b18"
+down_revision = "8b2e4c6d1a35"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# The 'english' configuration must match search_index.SEARCH_CONFIG.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # A plain nullable column is a catalog-only change. A GENERATED ... STORED
+    # column would rewrite the whole table under ACCESS EXCLUSIVE, blocking
+    # reads and writes for the duration; instead a trigger keeps the vector
+    # current and existing rows are backfilled in short batches.
+    op.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION reports_search_vector_update() RETURNS trigger AS $$ "
+        f"BEGIN NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')}; RETURN NEW; END "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute("DROP TRIGGER IF EXISTS reports_search_vector_update ON reports")
+    op.execute(
+        "CREATE TRIGGER reports_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF title, description ON reports "
+        "FOR EACH ROW EXECUTE FUNCTION reports_search_vector_update()"
+    )
+
+    with op.get_context().autocommit_block():
+        # Rows written from here on are covered by the trigger. Each batch
+        # commits on its own, walking the primary key, so row locks are
+        # held briefly and no NULL scan is repeated.
+        bind = op.get_bind()
+        last_id = None
+        while True:
+            # Last id of the next batch (None for the final, shorter one);
+            # ORDER BY/OFFSET works for uuid keys, which have no max()
+            after = "WHERE id > :last_id" if last_id is not None else ""
+            upper = bind.execute(
+                text(f"SELECT id FROM reports {after} ORDER BY id LIMIT 1 OFFSET :offset"),
+                {"last_id": last_id, "offset": BACKFILL_BATCH_SIZE - 1}
+            ).scalar()
+            bounds = [
+                "id > :last_id" if last_id is not None else None,
+                "id <= :upper" if upper is not None else None,
+                "search_vector IS NULL",
+            ]
+            bind.execute(
+                text(
+                    f"UPDATE reports SET search_vector = {SEARCH_VECTOR.format(row='')} "
+                    f"WHERE {' AND '.join(bound for bound in bounds if bound)}"
+                ),
+                {"last_id": last_id, "upper": upper}
+            )
+            if upper is None:
+                break
+            last_id = upper
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_search_vector "
+            "ON reports USING GIN (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reports_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS reports_search_vector_update ON reports")
+    op.execute("DROP FUNCTION IF EXISTS reports_search_vector_update()")
+    op.execute("ALTER TABLE reports DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,32 @@
+"""External record id on reports for idempotent bulk ingestion
+
+Revision ID: e91b3c7a4f26
+Revises: 5d8a1f3e9c42
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e91b3c7a4f26"
+down_revision = "5d8a1f3e9c42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS external_id VARCHAR(255)")
+    # Arbiter for INSERT ... ON CONFLICT (source, external_id) WHERE
+    # external_id IS NOT NULL in ReportService.bulk_create_reports
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_reports_source_external_id "
+            "ON reports (source, external_id) WHERE external_id IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ux_reports_source_external_id")
+    op.execute("ALTER TABLE reports DROP COLUMN IF EXISTS external_id")
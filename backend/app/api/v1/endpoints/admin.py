@@ -21,11 +21,21 @@ async def get_queue_status(
 
 @router.get("/models")
 async def get_model_info(
+    refresh: bool = False,
     current_user = Depends(get_current_admin_user)
 ):
     """Get ML model information and performance metrics."""
     admin_service = AdminService()
-    return await admin_service.get_model_info()
+    return await admin_service.get_model_info(refresh)
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats(
+    current_user = Depends(get_current_admin_user)
+):
+    """Get database connection pool usage and checkout wait times (this worker process)."""
+    admin_service = AdminService()
+    return admin_service.get_db_pool_stats()
 
 
 @router.post("/models/retrain")
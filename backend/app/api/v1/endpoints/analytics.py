@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import List, Dict, Any
+import hashlib
+import json
 import logging
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.db.database import AnySession, get_async_db
 from app.schemas.schemas import HeatmapPoint, AnalyticsResponse
 from app.services.analytics_service import AnalyticsService
 
@@ -13,14 +15,51 @@ logger = logging.getLogger(__name__)
 
 @router.get("/heatmap", response_model=List[HeatmapPoint])
 async def get_heatmap_data(
+    request: Request,
     bbox: str = None,  # "min_lon,min_lat,max_lon,max_lat"
     issue_type: str = None,
-    days: int = 7,
-    db: Session = Depends(get_db)
+    days: int = Query(7, ge=1, le=365),
+    db: AnySession = Depends(get_async_db)
 ):
     """Get heatmap data for geographic visualization."""
     analytics_service = AnalyticsService(db)
-    return await analytics_service.get_heatmap_data(bbox, issue_type, days)
+    try:
+        points = await analytics_service.get_heatmap_data(bbox, issue_type, days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _conditional_json(request, points)
+
+
+@router.get("/heatmap/tiles/{zoom}/{x}/{y}", response_model=List[HeatmapPoint])
+async def get_heatmap_tile(
+    request: Request,
+    zoom: int,
+    x: int,
+    y: int,
+    issue_type: str = None,
+    days: int = Query(7, ge=1, le=365),
+    db: AnySession = Depends(get_async_db)
+):
+    """Get the heatmap points of one Web Mercator (slippy map) tile."""
+    analytics_service = AnalyticsService(db)
+    try:
+        points = await analytics_service.get_heatmap_tile(zoom, x, y, issue_type, days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _conditional_json(request, points)
+
+
+def _conditional_json(request: Request, payload: Any) -> Response:
+    """JSON response with a content ETag; 304 if the client already has it."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.HEATMAP_CACHE_MAX_AGE}"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/trends")
@@ -28,16 +67,37 @@ async def get_trends(
     period: str = "7d",  # 1d, 7d, 30d, 90d
     group_by: str = "day",  # hour, day, week
     issue_type: str = None,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get temporal trend analysis."""
     analytics_service = AnalyticsService(db)
     return await analytics_service.get_trends(period, group_by, issue_type)
 
 
+@router.get("/hotspots")
+async def get_hotspots(
+    days: int = Query(30, ge=1, le=365),
+    limit: int = Query(10, ge=1, le=100),
+    db: AnySession = Depends(get_async_db)
+):
+    """Get the densest clusters of reports."""
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_geographic_hotspots(limit, days)
+
+
+@router.get("/severity-distribution")
+async def get_severity_distribution(
+    days: int = Query(30, ge=1, le=365),
+    db: AnySession = Depends(get_async_db)
+):
+    """Get report counts per severity bucket."""
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_severity_distribution(days)
+
+
 @router.get("/summary", response_model=AnalyticsResponse)
 async def get_summary(
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get dashboard summary statistics."""
     analytics_service = AnalyticsService(db)
@@ -48,7 +108,7 @@ async def get_summary(
 async def get_issue_distribution(
     bbox: str = None,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get issue type distribution."""
     analytics_service = AnalyticsService(db)
@@ -59,7 +119,7 @@ async def get_issue_distribution(
 async def get_severity_analysis(
     bbox: str = None,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get severity score analysis."""
     analytics_service = AnalyticsService(db)
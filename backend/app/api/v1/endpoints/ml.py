@@ -24,11 +24,12 @@ async def analyze_content(
 
 @router.get("/models")
 async def list_models(
+    refresh: bool = False,
     current_user = Depends(get_current_user)
 ):
-    """List available ML models and their status."""
+    """List available ML models and their status (cached unless refresh=true)."""
     ml_service = MLService()
-    return await ml_service.get_model_status()
+    return await ml_service.get_model_status(refresh=refresh)
 
 
 @router.post("/models/{model_name}/test")
@@ -40,3 +41,16 @@ async def test_model(
     """Test a specific ML model."""
     ml_service = MLService()
     return await ml_service.test_model(model_name, test_data)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    current_user = Depends(get_current_user)
+):
+    """Get hit/miss counters for the ML caches and batchers."""
+    ml_service = MLService()
+    return {
+        "media": ml_service.media_cache.stats(),
+        "results": ml_service.result_cache.stats(),
+        "batching": ml_service.batching_stats()
+    }
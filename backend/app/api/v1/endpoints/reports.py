@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
 from typing import List, Optional
+import asyncio
+import json
 import logging
 
-from app.db.database import get_db
+from app.db.database import AnySession, get_async_db
 from app.schemas.schemas import (
     ReportCreate, ReportResponse, ReportSummary, ReportQuery, 
-    PaginatedResponse, MLAnalysisResponse
+    PaginatedResponse, MLAnalysisResponse, BulkIngestResponse, BulkDeleteRequest
 )
+from app.core.config import settings
 from app.services.report_service import ReportService
-from app.services.ml_service import MLService
 from app.core.deps import get_current_user, get_current_admin_user
+from app.tasks.ml_tasks import enqueue_report_analysis, enqueue_report_ml
+from app.tasks.geocoding_tasks import enqueue_geocoding
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,7 +23,6 @@ logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=dict)
 async def create_report(
-    background_tasks: BackgroundTasks,
     title: Optional[str] = Form(None),
     description: Optional[str] = Form(None),
     lat: Optional[float] = Form(None),
@@ -28,7 +31,7 @@ async def create_report(
     source: str = Form("WEB"),
     user_id: Optional[str] = Form(None),
     media: List[UploadFile] = File(default=[]),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Create a new civic issue report."""
     try:
@@ -48,8 +51,12 @@ async def create_report(
         # Create report
         report = await report_service.create_report(report_data, media)
         
-        # Schedule background ML processing
-        background_tasks.add_task(process_report_async, report.id, db)
+        # ML analysis runs on the Celery ml_processing workers; publishing
+        # can block on the broker, so it happens in a worker thread too
+        if not await asyncio.to_thread(enqueue_report_ml, report.id):
+            logger.warning(f"Report {report.id} left PENDING: ML analysis could not be queued")
+        if settings.GEOCODE_DEFERRED and report.geometry is None and report.address:
+            await asyncio.to_thread(enqueue_geocoding, [report.id])
         
         return {
             "report_id": report.id,
@@ -62,10 +69,119 @@ async def create_report(
         raise HTTPException(status_code=500, detail="Failed to create report")
 
 
+@router.post("/bulk", response_model=BulkIngestResponse)
+async def bulk_create_reports(
+    request: Request,
+    defer_geocoding: Optional[bool] = None,
+    db: AnySession = Depends(get_async_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """Ingest many reports from a connector (admin only).
+    
+    The body is a JSON array of report objects, or NDJSON (one object per
+    line, ``Content-Type: application/x-ndjson``). Each record is validated
+    like ``ReportCreate``; invalid records are reported and skipped. Records
+    with an ``external_id`` already ingested for their source are ignored.
+    
+    With ``defer_geocoding`` (default ``GEOCODE_DEFERRED``) address-only
+    records are stored right away and geocoded by a background task.
+    """
+    body = await request.body()
+    try:
+        records = _parse_bulk_body(body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(records) > settings.BULK_INGEST_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_INGEST_MAX_ITEMS} records per request"
+        )
+    
+    items, errors = [], []
+    for index, record in enumerate(records):
+        if isinstance(record, Exception):
+            errors.append({"index": index, "error": str(record)})
+            continue
+        try:
+            items.append(ReportCreate.model_validate(record))
+        except ValidationError as e:
+            errors.append({"index": index, "error": e.errors(include_url=False, include_context=False, include_input=False)})
+    
+    report_service = ReportService(db)
+    try:
+        result = await report_service.bulk_create_reports(items, defer_geocoding)
+    except Exception as e:
+        logger.error(f"Error ingesting reports: {e}")
+        raise HTTPException(status_code=500, detail="Failed to ingest reports")
+    
+    report_ids = result["report_ids"]
+    geocode_pending = result["geocode_pending"]
+    # Publishing can block on the broker; keep it off the event loop
+    if geocode_pending and not await asyncio.to_thread(enqueue_geocoding, geocode_pending):
+        geocode_pending = []
+    queued = await asyncio.to_thread(enqueue_report_analysis, report_ids) if report_ids else False
+    return BulkIngestResponse(
+        received=len(records),
+        inserted=len(report_ids),
+        duplicates=result["duplicates"],
+        invalid=len(errors),
+        errors=errors,
+        report_ids=report_ids,
+        queued=queued,
+        geocoding_queued=len(geocode_pending)
+    )
+
+
+@router.post("/bulk-delete")
+async def bulk_delete_reports(
+    request: BulkDeleteRequest,
+    db: AnySession = Depends(get_async_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """Delete many reports and their media (admin only)."""
+    report_service = ReportService(db)
+    try:
+        return await report_service.delete_reports(list(dict.fromkeys(request.report_ids)))
+    except Exception as e:
+        logger.error(f"Error deleting reports: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete reports")
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Decode a JSON array or NDJSON body.
+    
+    For NDJSON, a malformed line becomes a ValueError in its slot so the
+    rest of the batch can still be ingested.
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    
+    if "ndjson" not in content_type and text.startswith("["):
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of reports")
+        return records
+    
+    records = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            records.append(ValueError(f"Invalid JSON line: {e}"))
+    return records
+
+
 @router.get("/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: str,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get detailed report information."""
     report_service = ReportService(db)
@@ -80,18 +196,27 @@ async def get_report(
 @router.get("/", response_model=PaginatedResponse)
 async def query_reports(
     query: ReportQuery = Depends(),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
-    """Query reports with filtering and pagination."""
+    """Query reports with filtering and pagination.
+    
+    Pass the returned ``next_cursor`` as ``cursor`` for constant-time deep
+    paging (newest-first results only; relevance-ranked ``q`` results page
+    with ``page``); ``count=estimated|capped`` avoids an exact COUNT(*).
+    ``bbox`` and ``near``/``radius_m`` filter spatially (WGS84 degrees, metres).
+    """
     report_service = ReportService(db)
-    return await report_service.query_reports(query)
+    try:
+        return await report_service.query_reports(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{report_id}/status")
 async def update_report_status(
     report_id: str,
     status: str,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_async_db),
     current_user = Depends(get_current_admin_user)
 ):
     """Update report status (admin only)."""
@@ -107,7 +232,7 @@ async def update_report_status(
 @router.delete("/{report_id}")
 async def delete_report(
     report_id: str,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_async_db),
     current_user = Depends(get_current_admin_user)
 ):
     """Delete a report (admin only)."""
@@ -119,21 +244,3 @@ async def delete_report(
     
     return {"message": "Report deleted successfully"}
 
-
-async def process_report_async(report_id: str, db: Session):
-    """Background task to process report with ML."""
-    try:
-        ml_service = MLService()
-        report_service = ReportService(db)
-        
-        # Run ML analysis
-        await ml_service.analyze_report(report_id)
-        
-        # Update report status
-        await report_service.update_status(report_id, "PROCESSED")
-        
-        logger.info(f"Successfully processed report {report_id}")
-        
-    except Exception as e:
-        logger.error(f"Error processing report {report_id}: {e}")
-        await report_service.update_status(report_id, "FAILED")
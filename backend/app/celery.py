@@ -6,7 +6,7 @@ celery_app = Celery(
     "civinsight",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=['app.tasks.ml_tasks', 'app.tasks.notification_tasks']
+    include=['app.tasks.ml_tasks', 'app.tasks.geocoding_tasks', 'app.tasks.notification_tasks']
 )
 
 # Configure Celery
@@ -26,5 +26,6 @@ celery_app.conf.update(
 # Task routing
 celery_app.conf.task_routes = {
     'app.tasks.ml_tasks.*': {'queue': 'ml_processing'},
+    'app.tasks.geocoding_tasks.*': {'queue': 'geocoding'},
     'app.tasks.notification_tasks.*': {'queue': 'notifications'},
 }
@@ -33,6 +33,21 @@ class Settings(BaseSettings):
         values = info.data if hasattr(info, 'data') else {}
         return f"postgresql://{values.get('DATABASE_USER', 'postgres')}:{values.get('DATABASE_PASSWORD', '')}@{values.get('DATABASE_HOST', 'localhost')}:{values.get('DATABASE_PORT', 5432)}/{values.get('DATABASE_NAME', 'civinsight_ai')}"
 
+    DATABASE_ASYNC_ENABLED: bool = True  # asyncpg sessions on the request path
+    
+    # Connection pool (per engine, per process; PostgreSQL only)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds; recycle before server/LB idle timeouts
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_PGBOUNCER: bool = False  # behind PgBouncer: no app-side pool, no statement caches
+    
+    REPORTS_COUNT_CAP: int = 10000  # upper bound for count=capped
+    SPATIAL_SRID: int = 4326  # SRID of reports.geometry
+    SPATIAL_INDEX_CELL_SIZE: float = 0.01  # degrees; in-memory fallback index without PostGIS
+    BULK_INGEST_MAX_ITEMS: int = 10000  # records per POST /reports/bulk
+    BULK_INSERT_BATCH_SIZE: int = 1000  # rows per INSERT statement
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -61,11 +76,25 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     S3_BUCKET: Optional[str] = None
     S3_PRESIGNED_URL_EXPIRATION: int = 3600
+    S3_MULTIPART_CHUNK_SIZE: int = 8388608  # 8MB; files larger than one chunk use multipart
+    S3_MULTIPART_CONCURRENCY: int = 4  # parts uploaded (and buffered) at once per file
+    MEDIA_UPLOAD_CONCURRENCY: int = 4  # files of one report processed/uploaded at once
+    
+    # Storage backend: "s3", or "local" to keep media on disk (dev/tests)
+    STORAGE_BACKEND: str = "s3"
+    LOCAL_STORAGE_DIR: str = "./storage"
+    LOCAL_STORAGE_URL: str = "http://localhost:8000/media"  # served by the app when local
     
     # Hugging Face
     HUGGINGFACE_API_TOKEN: Optional[str] = None
     HUGGINGFACE_API_URL: str = "https://api-inference.huggingface.co/models"
     
+    # ML inference backend: "api" (Hugging Face Inference API) or "local"
+    ML_BACKEND: str = "api"
+    ML_LOCAL_MODEL_DIR: Optional[str] = None  # pre-downloaded models for offline use
+    ML_LOCAL_DEVICE: str = "cpu"
+    ML_LOCAL_WORKERS: int = 1
+    
     # External APIs
     GOOGLE_MAPS_API_KEY: Optional[str] = None
     TWITTER_API_KEY: Optional[str] = None
@@ -74,9 +103,78 @@ class Settings(BaseSettings):
     
     # ML Configuration
     ML_CONFIDENCE_THRESHOLD: float = 0.7
+    ML_LABEL_MIN_CONFIDENCE: float = 0.2  # lowest score stored as an issue label
     IMAGE_MAX_SIZE: int = 10485760  # 10MB
     VIDEO_MAX_SIZE: int = 104857600  # 100MB
+    IMAGE_MODEL_MAX_SIDE: int = 800  # px; variant sent to image models
+    THUMBNAIL_MAX_SIDE: int = 256  # px
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_PROCESSING_WORKERS: int = 4
     BATCH_SIZE: int = 32
+    ML_BATCHING_ENABLED: bool = True
+    ML_BATCH_MAX_WAIT_MS: int = 20
+    ML_REQUEST_TIMEOUT: float = 30.0
+    ML_BULK_TASK_SIZE: int = 50  # reports per batch analysis task
+    ML_BULK_CONCURRENCY: int = 8  # reports analyzed concurrently within one task
+    ML_PIPELINE_TIMEOUT: float = 45.0
+    ML_TASK_MAX_RETRIES: int = 5  # retries of a report whose analysis failed
+    ML_TASK_RETRY_BACKOFF: int = 60  # seconds before the first retry; doubles each time
+    
+    # Per-model adaptive concurrency and circuit breaking (remote API)
+    ML_CONCURRENCY_INITIAL: int = 8
+    ML_CONCURRENCY_MIN: int = 1
+    ML_CONCURRENCY_MAX: int = 64
+    ML_LATENCY_TARGET: float = 5.0  # seconds; slower calls shrink the limit
+    ML_BREAKER_FAILURE_THRESHOLD: int = 5
+    ML_BREAKER_RESET_TIMEOUT: float = 30.0
+    ML_BREAKER_MAX_OPEN: float = 300.0
+    
+    ML_STATUS_REFRESH_INTERVAL: float = 60.0
+    ML_STATUS_MAX_AGE: float = 300.0  # serve a live probe if the snapshot is older
+    ML_STATUS_PROBE_TIMEOUT: float = 10.0  # per model availability probe, including its HTTP request
+    MEDIA_CACHE_MAX_BYTES: int = 268435456  # 256MB
+    MEDIA_CACHE_TTL: float = 300.0
+    ML_RESULT_CACHE_SIZE: int = 10000
+    ML_RESULT_CACHE_TTL: int = 86400  # 24 hours
+    ML_RESULT_CACHE_REDIS_ENABLED: bool = True
+    CACHE_VERSION: str = "1"  # bump to invalidate every cached result
+    
+    # Geocoding (Nominatim allows at most one request per second)
+    GEOCODER_BACKEND: str = "nominatim"  # "nominatim" or "gazetteer" (offline)
+    GAZETTEER_PATH: Optional[str] = None  # directory written by scripts/build_gazetteer.py
+    GAZETTEER_MAX_DISTANCE_M: float = 150.0  # reverse lookups farther than this find nothing
+    GEOCODER_USER_AGENT: str = "civinsight-ai"
+    GEOCODE_TIMEOUT: float = 10.0
+    GEOCODE_MIN_INTERVAL: float = 1.0
+    GEOCODE_CACHE_SIZE: int = 50000
+    GEOCODE_CACHE_TTL: int = 2592000  # 30 days
+    GEOCODE_CACHE_REDIS_ENABLED: bool = True
+    GEOCODE_RATE_LIMIT_REDIS_ENABLED: bool = True  # GEOCODE_MIN_INTERVAL across all processes
+    GEOCODE_REVERSE_PRECISION: int = 4  # decimal places (~11m)
+    GEOCODE_DEFERRED: bool = False  # store address-only reports first, geocode in the background
+    GEOCODE_BATCH_SIZE: int = 500  # reports per background geocoding task
+    GEOCODE_BATCH_CONCURRENCY: int = 8  # concurrent lookups within a batch
+    
+    # Hotspot detection
+    HOTSPOT_CELL_SIZE: float = 0.002  # grid cell, degrees (~200m)
+    HOTSPOT_EPS_M: float = 300.0  # DBSCAN neighbourhood radius
+    HOTSPOT_MIN_REPORTS: int = 5  # reports within eps to seed a cluster
+    HOTSPOT_DENSITY_FACTOR: float = 3.0  # ...and this many times the median cell density
+    HOTSPOT_REBUILD_INTERVAL: float = 900.0  # full reload; new reports are merged in between
+    HOTSPOT_REFRESH_OVERLAP: float = 300.0  # seconds re-read per request for late-committed/geocoded reports
+    
+    # Heatmap tiles (Web Mercator zoom levels kept pre-aggregated)
+    HEATMAP_MIN_ZOOM: int = 8
+    HEATMAP_MAX_ZOOM: int = 16
+    HEATMAP_TILE_CELLS: int = 32  # cells per tile side
+    HEATMAP_MAX_VIEWPORT_TILES: int = 16  # /heatmap picks the deepest zoom within this
+    HEATMAP_CACHE_MAX_AGE: int = 60  # seconds, Cache-Control on heatmap responses
+    
+    # Outbound HTTP connection pool
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True
     
     # Rate Limiting
     RATE_LIMIT_REQUESTS_PER_MINUTE: int = 60
@@ -1,12 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 import logging
 
-from app.db.database import get_db
+from app.db.database import AnySession, get_async_db, run_in_session
 from app.core.config import settings
-from app.services.auth_service import AuthService
+from app.models.models import User
 
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
@@ -14,7 +13,7 @@ logger = logging.getLogger(__name__)
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get current authenticated user."""
     credentials_exception = HTTPException(
@@ -35,8 +34,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    auth_service = AuthService(db)
-    user = await auth_service.get_user_by_id(user_id)
+    user = await run_in_session(db, lambda session: session.get(User, user_id))
     if user is None:
         raise credentials_exception
     
@@ -57,7 +55,7 @@ async def get_current_admin_user(
 
 async def get_optional_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_async_db)
 ):
     """Get current user if token is provided, otherwise None."""
     try:
@@ -1,19 +1,131 @@
+from typing import Any, Callable, Dict, Optional, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+
+def _engine_options(url: str, is_async: bool) -> Dict[str, Any]:
+    """Pool configuration from settings.
+    
+    Behind PgBouncer (transaction pooling) connections must not be held
+    or carry prepared statements across transactions, so pooling is left
+    to PgBouncer and asyncpg's statement caches are disabled.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": True, "echo": settings.DEBUG}
+    if not url.startswith("postgres"):
+        return options
+    
+    if settings.DB_PGBOUNCER:
+        options["poolclass"] = NullPool
+        options.pop("pool_pre_ping")
+        if is_async:
+            options["connect_args"] = {"statement_cache_size": 0}
+        return options
+    
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+# Engines are created on first use rather than at import, so modules
+# (and tests) can be imported without the database driver installed.
+_engines: Dict[bool, Any] = {}
+
+
+def get_engine() -> Engine:
+    """Synchronous engine: Celery tasks, scripts and Alembic."""
+    if False not in _engines:
+        _engines[False] = create_engine(
+            str(settings.DATABASE_URL),
+            **_engine_options(str(settings.DATABASE_URL), is_async=False)
+        )
+    return _engines[False]
+
 
-engine = create_engine(
-    str(settings.DATABASE_URL),
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
-)
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to ``get_engine()`` on its first session."""
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    driver = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "postgres": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }.get(scheme, scheme)
+    async_url = f"{driver}{sep}{rest}"
+    if settings.DB_PGBOUNCER and driver == "postgresql+asyncpg":
+        # SQLAlchemy's own prepared statement cache on top of asyncpg's
+        async_url = make_url(async_url).update_query_dict(
+            {"prepared_statement_cache_size": "0"}
+        ).render_as_string(hide_password=False)
+    return async_url
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    """Asyncio engine for the FastAPI request path: queries await the driver
+    instead of blocking the event loop. None if async sessions are disabled.
+    """
+    if not settings.DATABASE_ASYNC_ENABLED:
+        return None
+    if True not in _engines:
+        _engines[True] = create_async_engine(
+            _async_database_url(str(settings.DATABASE_URL)),
+            **_engine_options(str(settings.DATABASE_URL), is_async=True)
+        )
+    return _engines[True]
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    """async_sessionmaker that binds to ``get_async_engine()`` on its first session."""
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_async_engine())
+        return super().__call__(**local_kw)
+
+
+# expire_on_commit=False: attributes of committed objects stay readable
+# without an implicit (awaitable) refresh.
+AsyncSessionLocal = _LazyAsyncSessionmaker(
+    autoflush=False, expire_on_commit=False
+) if settings.DATABASE_ASYNC_ENABLED else None
+
+
+def __getattr__(name: str) -> Any:
+    """``database.engine`` / ``database.async_engine``, created on first access."""
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+AnySession = Union[Session, AsyncSession]
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -21,3 +133,37 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an AsyncSession (a sync Session if async is disabled)."""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_in_session(db: AnySession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ORM code written against a sync ``Session`` on either session type.
+
+    ``fn(session, *args, **kwargs)`` receives a sync Session. For an
+    AsyncSession it runs via ``run_sync``, so its I/O awaits the async
+    driver rather than blocking the loop.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
+
+
+def sync_view(db: AnySession) -> Session:
+    """The sync Session behind ``db``, for building queries.
+
+    For an AsyncSession it may only execute inside ``run_in_session``.
+    """
+    return db.sync_session if isinstance(db, AsyncSession) else db
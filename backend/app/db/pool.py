@@ -0,0 +1,106 @@
+"""
+Connection pools that record checkout wait times, for sizing pools from data.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout wait statistics; recent waits are kept for percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+
+        def percentile(p: float) -> float:
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000 if recent else 0.0
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_avg_ms": total_wait / checkouts * 1000 if checkouts else 0.0,
+            "wait_p50_ms": percentile(0.50),
+            "wait_p95_ms": percentile(0.95),
+            "wait_p99_ms": percentile(0.99),
+            "wait_max_ms": max_wait * 1000,
+        }
+
+
+class _InstrumentedMixin:
+    """Times ``_do_get``, the point where a checkout blocks on a full pool."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics  # keep history across pool resets
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Current occupancy and wait metrics of ``engine``'s pool."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            # Negative until the base pool is full, then the number of extra
+            # connections opened beyond pool_size
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
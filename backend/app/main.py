@@ -3,13 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
+from urllib.parse import urlparse
 import uvicorn
+import asyncio
 import logging
+import os
 
 from app.core.config import settings
 from app.db.database import get_db
 from app.api.v1.router import api_router
 from app.core.logging import setup_logging
+from app.services.http_client import close_http_client
+from app.services.ml_service import close_zero_shot_batchers, run_model_status_refresher
 
 
 # Setup logging
@@ -39,6 +44,30 @@ if settings.BACKEND_CORS_ORIGINS:
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Serve media from disk when not using S3
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(
+        urlparse(settings.LOCAL_STORAGE_URL).path,
+        StaticFiles(directory=settings.LOCAL_STORAGE_DIR),
+        name="media"
+    )
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start background refreshers."""
+    app.state.model_status_task = asyncio.create_task(run_model_status_refresher())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background refreshers, finish in-flight inference batches and
+    release pooled outbound connections."""
+    app.state.model_status_task.cancel()
+    await close_zero_shot_batchers(timeout=settings.ML_REQUEST_TIMEOUT)
+    await close_http_client()
+
 
 @app.get("/")
 async def root():
@@ -35,6 +35,17 @@ class IssueType(str, Enum):
     OTHER = "other"
 
 
+class CountMode(str, Enum):
+    EXACT = "exact"  # COUNT(*) over the filtered rows
+    ESTIMATED = "estimated"  # planner row estimate, no scan
+    CAPPED = "capped"  # exact up to REPORTS_COUNT_CAP, then reported as the cap
+
+
+class ReportSort(str, Enum):
+    NEWEST = "newest"
+    RELEVANCE = "relevance"  # full-text rank for q; the default when q is given
+
+
 # Pydantic models for API requests/responses
 class ReportCreate(BaseModel):
     title: Optional[str] = None
@@ -44,6 +55,22 @@ class ReportCreate(BaseModel):
     address: Optional[str] = None
     source: ReportSource = ReportSource.WEB
     user_id: Optional[str] = None
+    external_id: Optional[str] = Field(None, max_length=255)  # connector's record id, unique per source
+
+
+class BulkIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int  # already ingested (same source and external_id)
+    invalid: int
+    errors: List[Dict[str, Any]] = []  # {"index": n, "error": ...} per rejected record
+    report_ids: List[str] = []
+    queued: bool = False  # ML analysis enqueued
+    geocoding_queued: int = 0  # address-only reports awaiting background geocoding
+
+
+class BulkDeleteRequest(BaseModel):
+    report_ids: List[str] = Field(..., min_length=1, max_length=1000)
 
 
 class MediaResponse(BaseModel):
@@ -124,6 +151,8 @@ class ReportSummary(BaseModel):
 
 class ReportQuery(BaseModel):
     bbox: Optional[str] = None  # "min_lon,min_lat,max_lon,max_lat"
+    near: Optional[str] = None  # "lat,lon" centre for a radius query
+    radius_m: float = Field(1000, gt=0, le=100000)
     q: Optional[str] = None  # Text search
     issue_type: Optional[List[IssueType]] = None
     status: Optional[List[ReportStatus]] = None
@@ -133,6 +162,9 @@ class ReportQuery(BaseModel):
     until: Optional[datetime] = None
     page: int = Field(1, ge=1)
     per_page: int = Field(20, ge=1, le=100)
+    sort: Optional[ReportSort] = None
+    cursor: Optional[str] = None  # next_cursor from a previous page; overrides page
+    count: CountMode = CountMode.EXACT
 
 
 class PaginatedResponse(BaseModel):
@@ -141,6 +173,8 @@ class PaginatedResponse(BaseModel):
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class MLAnalysisRequest(BaseModel):
@@ -154,6 +188,7 @@ class MLAnalysisResponse(BaseModel):
     image_caption: Optional[str] = None
     object_detection: Optional[List[Dict[str, Any]]] = None
     vqa_results: Optional[Dict[str, Any]] = None
+    failed_pipelines: List[str] = []
     processing_time_ms: int
     confidence_scores: Dict[str, float]
 
@@ -4,7 +4,10 @@ Admin service for administrative operations.
 
 from typing import Dict, List, Any
 from sqlalchemy.orm import Session
+from app.db import database
+from app.db.pool import pool_stats
 from app.models.models import Report, User
+from app.services.ml_service import MLService
 
 class AdminService:
     @staticmethod
@@ -32,3 +35,23 @@ class AdminService:
             "status": report.status,
             "created_at": report.created_at.isoformat() if report.created_at else None
         }
+
+    @staticmethod
+    def get_db_pool_stats() -> Dict[str, Any]:
+        """Connection pool occupancy and checkout wait times for this process."""
+        stats = {"sync": pool_stats(database.engine)}
+        if database.async_engine is not None:
+            stats["async"] = pool_stats(database.async_engine.sync_engine)
+        return stats
+
+    @staticmethod
+    async def get_model_info(refresh: bool = False) -> Dict[str, Any]:
+        """Get ML model status (cached snapshot unless refresh) and cache metrics."""
+        ml_service = MLService()
+        return {
+            "models": await ml_service.get_model_status(refresh=refresh),
+            "media_cache": ml_service.media_cache.stats(),
+            "result_cache": ml_service.result_cache.stats(),
+            "batching": ml_service.batching_stats(),
+            "resilience": ml_service.backend.resilience_stats()
+        }
@@ -2,46 +2,193 @@
 Analytics service for generating insights and statistics.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.models.models import Report, Media
+from app.db.database import AnySession, run_in_session
+from app.models.models import Report, Media, IssueLabel
+from app.services.heatmap_tiles import TileCounts, heatmap_tiles, tile_bounds, tile_range
+from app.services.hotspots import hotspot_index
+from app.services.spatial_index import BBox, parse_bbox
 
 class AnalyticsService:
-    @staticmethod
-    def get_report_statistics(db: Session, days: int = 30) -> Dict[str, Any]:
+    """Report statistics; works with both sync and async sessions.
+
+    Each method's queries run in one ``run_in_session`` call, so on an
+    AsyncSession they await the driver instead of blocking the event loop.
+    """
+
+    def __init__(self, db: AnySession):
+        self.db = db
+
+    async def get_report_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get basic report statistics for the last N days."""
+        return await run_in_session(self.db, self._report_statistics, days)
+
+    async def get_severity_distribution(self, days: int = 30) -> Dict[str, int]:
+        """Get distribution of reports by severity score."""
+        return await run_in_session(self.db, self._severity_distribution, days)
+
+    async def get_geographic_hotspots(self, limit: int = 10, days: int = 30) -> List[Dict[str, Any]]:
+        """Get geographic areas with highest report density.
+
+        Clusters come from the shared ``hotspot_index``, which keeps
+        per-day grid bins in memory and only loads new reports per call.
+        """
+        return await hotspot_index.hotspots(self.db, days, limit)
+
+    async def get_heatmap_data(
+        self, bbox: Optional[str] = None, issue_type: Optional[str] = None, days: int = 7
+    ) -> List[Dict[str, Any]]:
+        """Heatmap points for a viewport, read from pre-aggregated tiles.
+
+        The zoom level is the deepest one at which ``bbox`` spans at most
+        ``HEATMAP_MAX_VIEWPORT_TILES`` tiles.
+        """
+        return await run_in_session(self.db, self._heatmap_data, bbox, issue_type, days)
+
+    async def get_heatmap_tile(
+        self, zoom: int, x: int, y: int, issue_type: Optional[str] = None, days: int = 7
+    ) -> List[Dict[str, Any]]:
+        """Heatmap points of one ``zoom/x/y`` tile.
+
+        Zooms beyond ``HEATMAP_MAX_ZOOM`` are cut from their ancestor tile.
+        """
+        return await run_in_session(self.db, self._heatmap_tile, zoom, x, y, issue_type, days)
+
+    async def get_summary(self) -> Dict[str, Any]:
+        """Dashboard summary statistics."""
+        return await run_in_session(self.db, self._summary)
+
+    @staticmethod
+    def _report_statistics(db: Session, days: int) -> Dict[str, Any]:
         start_date = datetime.utcnow() - timedelta(days=days)
-        
-        total_reports = db.query(Report).filter(Report.created_at >= start_date).count()
-        pending_reports = db.query(Report).filter(
-            Report.created_at >= start_date,
-            Report.status == "PENDING"
-        ).count()
-        
+
+        total_reports, pending_reports = db.query(
+            func.count(Report.id),
+            func.count(Report.id).filter(Report.status == "PENDING")
+        ).filter(Report.created_at >= start_date).one()
+
         return {
             "total_reports": total_reports,
             "pending_reports": pending_reports,
             "resolved_reports": total_reports - pending_reports,
             "period_days": days
         }
-    
+
     @staticmethod
-    def get_severity_distribution(db: Session, days: int = 30) -> Dict[str, int]:
-        """Get distribution of reports by severity score."""
+    def _heatmap_data(db: Session, bbox: Optional[str], issue_type: Optional[str], days: int) -> List[Dict[str, Any]]:
+        if bbox:
+            bounds = parse_bbox(bbox)
+            zoom = heatmap_tiles.zoom_for_bbox(bounds)
+            tiles = tile_range(bounds, zoom)
+        else:
+            bounds, zoom, tiles = None, heatmap_tiles.min_zoom, None
+        since = _first_day(days)
+        counts = heatmap_tiles.read_tiles(db, zoom, tiles, issue_type, since)
+        peak = heatmap_tiles.peak(db, zoom, issue_type, since)
+        return _heatmap_points(counts, zoom, peak, bounds)
+
+    @staticmethod
+    def _heatmap_tile(
+        db: Session, zoom: int, x: int, y: int, issue_type: Optional[str], days: int
+    ) -> List[Dict[str, Any]]:
+        if zoom < heatmap_tiles.min_zoom:
+            raise ValueError(f"Heatmap tiles start at zoom {heatmap_tiles.min_zoom}")
+        if not (0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom):
+            raise ValueError("Tile coordinates out of range")
+
+        read_zoom = min(zoom, heatmap_tiles.max_zoom)
+        shift = zoom - read_zoom
+        tile = (x >> shift, x >> shift, y >> shift, y >> shift)
+        since = _first_day(days)
+        counts = heatmap_tiles.read_tiles(db, read_zoom, tile, issue_type, since)
+        peak = heatmap_tiles.peak(db, read_zoom, issue_type, since)
+        return _heatmap_points(counts, read_zoom, peak, tile_bounds(zoom, x, y) if shift else None)
+
+    @staticmethod
+    def _severity_distribution(db: Session, days: int) -> Dict[str, int]:
         start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # For now, return empty distribution - can be expanded later
+        severity = Report.severity_score
+
+        # Buckets on the 0-10 severity scale; unscored reports are not counted
+        low, medium, high, critical = db.query(
+            func.count(Report.id).filter(severity < 3),
+            func.count(Report.id).filter(severity >= 3, severity < 6),
+            func.count(Report.id).filter(severity >= 6, severity < 8),
+            func.count(Report.id).filter(severity >= 8)
+        ).filter(Report.created_at >= start_date).one()
+
         return {
-            "low": 0,
-            "medium": 0,
-            "high": 0,
-            "critical": 0
+            "low": low,
+            "medium": medium,
+            "high": high,
+            "critical": critical
         }
-    
+
     @staticmethod
-    def get_geographic_hotspots(db: Session, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get geographic areas with highest report density."""
-        # For now, return empty list - can be expanded with proper geospatial queries
-        return []
+    def _summary(db: Session) -> Dict[str, Any]:
+        now = datetime.utcnow()
+
+        # One pass over reports for all scalar aggregates
+        total, last_24h, last_7d, avg_severity = db.query(
+            func.count(Report.id),
+            func.count(Report.id).filter(Report.created_at >= now - timedelta(days=1)),
+            func.count(Report.id).filter(Report.created_at >= now - timedelta(days=7)),
+            func.avg(Report.severity_score)
+        ).one()
+
+        by_status = dict(
+            db.query(Report.status, func.count(Report.id)).group_by(Report.status).all()
+        )
+        by_type = dict(
+            db.query(IssueLabel.label, func.count(IssueLabel.id))
+            .filter(IssueLabel.is_primary)
+            .group_by(IssueLabel.label)
+            .all()
+        )
+
+        processed = db.query(Report.created_at, Report.processed_at).filter(
+            Report.processed_at.isnot(None),
+            Report.created_at >= now - timedelta(days=7)
+        ).all()
+        processing_ms = [
+            (processed_at - created_at).total_seconds() * 1000
+            for created_at, processed_at in processed
+        ]
+
+        return {
+            "total_reports": total,
+            "reports_by_status": {str(getattr(k, "value", k)): v for k, v in by_status.items()},
+            "reports_by_type": by_type,
+            "avg_severity": float(avg_severity or 0.0),
+            "processing_time_avg_ms": sum(processing_ms) / len(processing_ms) if processing_ms else 0.0,
+            "reports_last_24h": last_24h,
+            "reports_last_7d": last_7d
+        }
+
+
+def _first_day(days: int):
+    """First UTC day bucket of a window of ``days`` days ending today."""
+    return datetime.utcnow().date() - timedelta(days=days - 1)
+
+
+def _heatmap_points(
+    counts: TileCounts, zoom: int, peak: int, bounds: Optional[BBox] = None
+) -> List[Dict[str, Any]]:
+    """Cell centres with counts; intensity is relative to ``peak``, the
+    busiest cell of the whole zoom level, so every tile and viewport at a
+    zoom shares one scale.
+    """
+    points = []
+    for (tile_x, tile_y, cell), count in sorted(counts.items()):
+        lat, lon = heatmap_tiles.cell_center(zoom, tile_x, tile_y, cell)
+        if bounds and not (bounds[0] <= lon <= bounds[2] and bounds[1] <= lat <= bounds[3]):
+            continue
+        points.append({"lat": lat, "lon": lon, "issue_count": count})
+    # The cached peak can trail counts written since it was read
+    peak = max(peak, max((point["issue_count"] for point in points), default=0))
+    for point in points:
+        point["intensity"] = point["issue_count"] / peak
+    return points
@@ -0,0 +1,178 @@
+"""
+Offline geocoding from a local gazetteer compiled into memory-mapped arrays.
+
+A compiled gazetteer is a directory of ``.npy`` files plus a UTF-8 text blob,
+written by ``build_gazetteer`` (see ``scripts/build_gazetteer.py``):
+
+- ``key_hashes.npy`` / ``key_rows.npy``: sorted 64-bit hashes of normalized
+  address keys and the row each one resolves to (forward lookups are a
+  binary search);
+- ``coords.npy``: ``(lat, lon)`` per row;
+- ``text.bin`` / ``text_offsets.npy``: the display address of each row;
+- ``cell_ids.npy`` / ``cell_starts.npy`` / ``cell_rows.npy``: rows grouped
+  by lon/lat grid cell, sorted by cell id (reverse lookups scan the cells
+  around the query point).
+
+Everything is opened with ``mmap_mode="r"``, so only the pages a lookup
+touches become resident and worker processes share them via the page cache.
+"""
+
+import hashlib
+import json
+import math
+import os
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.services.spatial_index import EARTH_RADIUS_M
+
+FORMAT_VERSION = 1
+_METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def key_hash(key: str) -> int:
+    """Stable 64-bit hash of a normalized address key."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class Gazetteer:
+    """Read-only view of a compiled gazetteer directory."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported gazetteer format in {path}: {meta.get('version')}")
+
+        self.path = path
+        self.cell_size = float(meta["cell_size"])
+        self._columns = int(math.ceil(360 / self.cell_size))
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self._key_hashes = load("key_hashes")
+        self._key_rows = load("key_rows")
+        self._coords = load("coords")
+        self._text_offsets = load("text_offsets")
+        self._cell_ids = load("cell_ids")
+        self._cell_starts = load("cell_starts")
+        self._cell_rows = load("cell_rows")
+        self._text = np.memmap(os.path.join(path, "text.bin"), dtype=np.uint8, mode="r") \
+            if self._text_offsets[-1] else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def geocode(self, key: str) -> Optional[Dict[str, float]]:
+        """Coordinates for a normalized address key, or None."""
+        target = np.uint64(key_hash(key))
+        index = int(np.searchsorted(self._key_hashes, target))
+        if index == len(self._key_hashes) or self._key_hashes[index] != target:
+            return None
+        lat, lon = self._coords[int(self._key_rows[index])]
+        return {"lat": float(lat), "lon": float(lon)}
+
+    def reverse(self, lat: float, lon: float, max_distance_m: float) -> Optional[str]:
+        """Address of the nearest entry within ``max_distance_m``, or None."""
+        row, column = _cell(lat, lon, self.cell_size)
+        row_span = int(math.ceil(max_distance_m / _METRES_PER_DEGREE / self.cell_size))
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        column_span = min(
+            self._columns, int(math.ceil(max_distance_m / (_METRES_PER_DEGREE * cos_lat) / self.cell_size))
+        )
+
+        # Cell ids are row-major, so each grid row of the search window is
+        # one contiguous run of cells and therefore of cell_rows.
+        candidates = []
+        for r in range(row - row_span, row + row_span + 1):
+            first = r * self._columns + max(0, column - column_span)
+            last = r * self._columns + min(self._columns - 1, column + column_span)
+            start = int(np.searchsorted(self._cell_ids, first, side="left"))
+            end = int(np.searchsorted(self._cell_ids, last, side="right"))
+            if start < end:
+                candidates.append(self._cell_rows[self._cell_starts[start]:self._cell_starts[end]])
+        if not candidates:
+            return None
+
+        rows = np.concatenate(candidates)
+        points = self._coords[rows]
+        distances = _haversine_m(lat, lon, points[:, 0], points[:, 1])
+        nearest = int(np.argmin(distances))
+        if distances[nearest] > max_distance_m:
+            return None
+        return self.text(int(rows[nearest]))
+
+    def text(self, row: int) -> str:
+        start, end = int(self._text_offsets[row]), int(self._text_offsets[row + 1])
+        return self._text[start:end].tobytes().decode("utf-8")
+
+
+def build_gazetteer(
+    entries: Iterable[Tuple[str, float, float, Iterable[str]]],
+    path: str,
+    normalize: Callable[[str], str],
+    cell_size: float = 0.005,
+) -> int:
+    """Compile ``(address, lat, lon, extra_keys)`` entries into ``path``.
+
+    Each entry is found by its normalized address and by each normalized
+    extra key (e.g. the address without city and postcode). When a key
+    occurs more than once the first entry wins. Returns the number of rows.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    coords, offsets, hashes, key_rows = [], [0], [], []
+    seen = set()
+    with open(os.path.join(path, "text.bin"), "wb") as text:
+        for address, lat, lon, extra_keys in entries:
+            row = len(coords)
+            coords.append((lat, lon))
+            encoded = address.encode("utf-8")
+            text.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+            for key in (address, *extra_keys):
+                digest = key_hash(normalize(key))
+                if digest not in seen:
+                    seen.add(digest)
+                    hashes.append(digest)
+                    key_rows.append(row)
+
+    coords_array = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    hash_array = np.array(hashes, dtype=np.uint64)
+    order = np.argsort(hash_array, kind="stable")
+
+    columns = int(math.ceil(360 / cell_size))
+    cell_of_row = np.array(
+        [r * columns + c for r, c in (_cell(lat, lon, cell_size) for lat, lon in coords)], dtype=np.int64
+    )
+    by_cell = np.argsort(cell_of_row, kind="stable")
+    cell_ids, starts = np.unique(cell_of_row[by_cell], return_index=True)
+
+    arrays = {
+        "key_hashes": hash_array[order],
+        "key_rows": np.array(key_rows, dtype=np.uint32)[order],
+        "coords": coords_array,
+        "text_offsets": np.array(offsets, dtype=np.uint64),
+        "cell_ids": cell_ids.astype(np.int64),
+        "cell_starts": np.append(starts, len(coords)).astype(np.int64),
+        "cell_rows": by_cell.astype(np.uint32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"version": FORMAT_VERSION, "cell_size": cell_size, "rows": len(coords)}, f)
+    return len(coords)
+
+
+def _cell(lat: float, lon: float, cell_size: float) -> Tuple[int, int]:
+    return int(math.floor((lat + 90) / cell_size)), int(math.floor((lon + 180) / cell_size))
+
+
+def _haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    phi1, phi2 = math.radians(lat), np.radians(lats)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
@@ -1,28 +1,238 @@
-import httpx
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
 
+from app.core.config import settings
+from app.services.gazetteer import Gazetteer
+from app.services.result_cache import ResultCache, content_hash
+
 logger = logging.getLogger(__name__)
 
+_PUNCTUATION = re.compile(r"[^\w\s#]")
+
+# Street-type abbreviations folded into cache keys, so "12 Main St." and
+# "12 main street" share an entry
+_ABBREVIATIONS = {
+    "st": "street",
+    "ave": "avenue",
+    "av": "avenue",
+    "rd": "road",
+    "blvd": "boulevard",
+    "dr": "drive",
+    "ln": "lane",
+    "ct": "court",
+    "pl": "place",
+    "sq": "square",
+    "hwy": "highway",
+    "pkwy": "parkway",
+    "apt": "apartment",
+}
+
+
+def normalize_address(address: str) -> str:
+    """Canonical form of an address used for cache keys."""
+    tokens = _PUNCTUATION.sub(" ", address.lower()).split()
+    return " ".join(_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+# Atomically reserves the next start slot: returns how many milliseconds
+# the caller must wait and moves the shared next start one interval past
+# it. Uses the Redis server clock, so worker clocks need not agree.
+_RESERVE_SLOT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local start = math.max(now, tonumber(redis.call('GET', KEYS[1]) or 0))
+local next_start = start + tonumber(ARGV[1])
+redis.call('SET', KEYS[1], next_start, 'PX', next_start - now + 1000)
+return start - now
+"""
+
+
+class _IntervalLimiter:
+    """Spaces call starts at least ``interval`` seconds apart.
+    
+    Nominatim's usage policy allows one request per second per client, and
+    every API and Celery worker process is the same client, so with
+    ``redis_url`` set start slots are reserved in Redis and the limit holds
+    across processes. Without Redis, or while it is unreachable, calls are
+    spaced per event loop only.
+    """
+    
+    def __init__(self, interval: float, redis_url: Optional[str] = None, key: str = "geo:next_start"):
+        self.interval = interval
+        self.redis_url = redis_url
+        self.key = key
+        self._next_start = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def wait(self):
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                delay_ms = await redis.eval(_RESERVE_SLOT, 1, self.key, int(self.interval * 1000))
+            except Exception as e:
+                logger.warning(f"Shared geocoding rate limit unavailable, spacing locally: {e}")
+            else:
+                if delay_ms > 0:
+                    await asyncio.sleep(delay_ms / 1000)
+                return
+        await self._wait_local()
+    
+    async def _wait_local(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+    
+        async with self._lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + self.interval
+    
+    def _get_redis(self):
+        """Lazily connect to Redis on the running loop, if configured."""
+        if not self.redis_url:
+            return None
+    
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            try:
+                from redis import asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed; geocoding rate limit is per process")
+                self.redis_url = None
+                return None
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=1.0)
+            self._redis_loop = loop
+        return self._redis
+
+
+# Shared by every GeocodingService so the cache, rate limit and in-flight
+# lookups are per process (the rate limit across processes, via Redis)
+# rather than per request.
+geocode_cache = ResultCache(
+    namespace="geo",
+    max_entries=settings.GEOCODE_CACHE_SIZE,
+    ttl=settings.GEOCODE_CACHE_TTL,
+    redis_url=settings.REDIS_URL if settings.GEOCODE_CACHE_REDIS_ENABLED else None,
+)
+_limiter = _IntervalLimiter(
+    settings.GEOCODE_MIN_INTERVAL,
+    redis_url=settings.REDIS_URL if settings.GEOCODE_RATE_LIMIT_REDIS_ENABLED else None,
+)
+_in_flight: Dict[str, asyncio.Task] = {}
+_in_flight_loop: Optional[asyncio.AbstractEventLoop] = None
+_nominatim: Optional[Nominatim] = None
+_gazetteer: Optional[Gazetteer] = None
+
+
+def _get_nominatim() -> Nominatim:
+    global _nominatim
+    if _nominatim is None:
+        _nominatim = Nominatim(user_agent=settings.GEOCODER_USER_AGENT, timeout=settings.GEOCODE_TIMEOUT)
+    return _nominatim
+
+
+def _get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        if not settings.GAZETTEER_PATH:
+            raise RuntimeError("GEOCODER_BACKEND=gazetteer requires GAZETTEER_PATH")
+        _gazetteer = Gazetteer(settings.GAZETTEER_PATH)
+        logger.info(f"Loaded gazetteer with {len(_gazetteer)} entries from {settings.GAZETTEER_PATH}")
+    return _gazetteer
+
 
 class GeocodingService:
-    """Service for geocoding addresses and reverse geocoding coordinates."""
+    """Service for geocoding addresses and reverse geocoding coordinates.
+    
+    Nominatim calls run in a worker thread behind a process-wide rate
+    limit. Results are cached by normalized address (or rounded
+    coordinates) in an LRU backed by Redis; "not found" answers are cached
+    too, lookup errors are not.
+    
+    With ``GEOCODER_BACKEND=gazetteer`` lookups are answered in-process from
+    the local gazetteer at ``GAZETTEER_PATH`` instead, with no network
+    access and no cache.
+    """
     
     def __init__(self):
-        self.nominatim = Nominatim(user_agent="civinsight-ai")
+        self.gazetteer = _get_gazetteer() if settings.GEOCODER_BACKEND == "gazetteer" else None
+        self.nominatim = _get_nominatim() if self.gazetteer is None else None
+        self.cache = geocode_cache
     
     async def geocode_address(self, address: str) -> Optional[Dict[str, float]]:
         """Convert address to coordinates."""
+        normalized = normalize_address(address)
+        if not normalized:
+            return None
+        if self.gazetteer is not None:
+            return self.gazetteer.geocode(normalized)
+    
+        key = self.cache.make_key("fwd", [], content_hash(normalized.encode("utf-8")))
+        result = await self._cached(key, lambda: self._geocode_remote(address))
+        return result or None
+    
+    async def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
+        """Convert coordinates to address."""
+        if self.gazetteer is not None:
+            return self.gazetteer.reverse(lat, lon, settings.GAZETTEER_MAX_DISTANCE_M)
+        precision = settings.GEOCODE_REVERSE_PRECISION
+        # ~11m at 4 decimals: finer than an address, coarse enough to share
+        key = self.cache.make_key("rev", [precision], f"{lat:.{precision}f},{lon:.{precision}f}")
+        result = await self._cached(key, lambda: self._reverse_remote(round(lat, precision), round(lon, precision)))
+        return result.get("address") if result else None
+    
+    async def _cached(self, key: str, lookup: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Cached value for ``key``; concurrent misses share one lookup.
+    
+        ``lookup`` returns ``{}`` for "no match" (cached) and None on errors
+        (not cached, so the next request retries).
+        """
+        global _in_flight_loop
+    
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+    
+        loop = asyncio.get_running_loop()
+        if loop is not _in_flight_loop:
+            _in_flight.clear()
+            _in_flight_loop = loop
+    
+        # The lookup runs as its own task so a cancelled caller does not
+        # abort it for the others waiting on the same key
+        task = _in_flight.get(key)
+        if task is None:
+            task = loop.create_task(self._lookup_and_store(key, lookup))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def _lookup_and_store(self, key: str, lookup: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        result = await lookup()
+        if result is not None:
+            await self.cache.set(key, result)
+        return result
+    
+    async def _geocode_remote(self, address: str) -> Optional[Dict[str, float]]:
         try:
-            location = self.nominatim.geocode(address, timeout=10)
+            await _limiter.wait()
+            location = await asyncio.to_thread(self.nominatim.geocode, address)
             if location:
                 return {
                     "lat": location.latitude,
                     "lon": location.longitude
                 }
-            return None
+            return {}
         except GeocoderTimedOut:
             logger.warning(f"Geocoding timeout for address: {address}")
             return None
@@ -30,13 +240,13 @@ class GeocodingService:
             logger.error(f"Geocoding error for address '{address}': {e}")
             return None
     
-    async def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
-        """Convert coordinates to address."""
+    async def _reverse_remote(self, lat: float, lon: float) -> Optional[Dict[str, str]]:
         try:
-            location = self.nominatim.reverse((lat, lon), timeout=10)
+            await _limiter.wait()
+            location = await asyncio.to_thread(self.nominatim.reverse, (lat, lon))
             if location:
-                return location.address
-            return None
+                return {"address": location.address}
+            return {}
         except GeocoderTimedOut:
             logger.warning(f"Reverse geocoding timeout for coords: {lat}, {lon}")
             return None
@@ -0,0 +1,304 @@
+"""
+Pre-aggregated heatmap tiles.
+
+Report counts are kept in the ``heatmap_cells`` table per Web Mercator tile
+(``zoom/x/y``, zooms ``HEATMAP_MIN_ZOOM``..``HEATMAP_MAX_ZOOM``), per cell of
+a ``HEATMAP_TILE_CELLS`` x ``HEATMAP_TILE_CELLS`` grid inside the tile, per
+primary issue type ("" while unlabeled) and per UTC day, so a map view
+reads a few small tiles instead of scanning reports.
+
+Writers compute +1/-1 deltas inside the transaction that inserts, labels,
+locates or deletes reports (``deltas``, ``move``) and write them with
+``commit`` once that transaction has committed. At low zooms one cell
+covers a whole city, so every writer touches the same few rows; holding
+their locks only for the short tile upsert, rather than for a whole bulk
+insert, keeps concurrent ingests from queueing behind each other. If the
+tile write fails the counts lag until ``rebuild``; the report change
+stands.
+
+Every write is a single upsert with its rows sorted by key, so concurrent
+writers lock the cell rows they share in the same order and cannot
+deadlock on each other. A relabel (``move``) puts the -1 for the old label
+and the +1 for the new one in that same upsert.
+"""
+
+import logging
+import math
+import time
+from collections import Counter
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, Integer, String, column, func, select, table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import IssueLabel, Report
+from app.services.spatial_index import BBox, point_coordinates
+
+logger = logging.getLogger(__name__)
+
+MAX_MERCATOR_LAT = 85.05112878
+
+heatmap_cells = table(
+    "heatmap_cells",
+    column("zoom", Integer),
+    column("tile_x", Integer),
+    column("tile_y", Integer),
+    column("day", Date),
+    column("issue_type", String),
+    column("cell", Integer),
+    column("report_count", Integer)
+)
+
+_KEY = ["zoom", "tile_x", "tile_y", "day", "issue_type", "cell"]
+
+# (tile_x, tile_y, cell) -> report count
+TileCounts = Dict[Tuple[int, int, int], int]
+
+
+def _mercator(lat: float, lon: float) -> Tuple[float, float]:
+    """Position in the unit Web Mercator square, y growing southwards."""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    phi = math.radians(lat)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - math.log(math.tan(phi) + 1.0 / math.cos(phi)) / math.pi) / 2.0
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def _unmercator(x: float, y: float) -> Tuple[float, float]:
+    lon = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * y))))
+    return lat, lon
+
+
+def tile_bounds(zoom: int, tile_x: int, tile_y: int) -> BBox:
+    """``(min_lon, min_lat, max_lon, max_lat)`` of a tile."""
+    n = 2 ** zoom
+    max_lat, min_lon = _unmercator(tile_x / n, tile_y / n)
+    min_lat, max_lon = _unmercator((tile_x + 1) / n, (tile_y + 1) / n)
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def tile_range(bbox: BBox, zoom: int) -> Tuple[int, int, int, int]:
+    """Inclusive ``(min_x, max_x, min_y, max_y)`` of the tiles covering ``bbox``."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    n = 2 ** zoom
+    x0, y0 = _mercator(max_lat, min_lon)
+    x1, y1 = _mercator(min_lat, max_lon)
+    return (
+        min(int(x0 * n), n - 1), min(int(x1 * n), n - 1),
+        min(int(y0 * n), n - 1), min(int(y1 * n), n - 1),
+    )
+
+
+class HeatmapTiles:
+    """Maintains and reads the ``heatmap_cells`` aggregates (sync Session)."""
+
+    def __init__(self, min_zoom: int, max_zoom: int, cells: int, peak_ttl: float = 60.0):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.cells = cells
+        self.peak_ttl = peak_ttl
+        # (zoom, issue_type, since) -> (expires_at, busiest cell count)
+        self._peaks: Dict[tuple, Tuple[float, int]] = {}
+
+    def cell_key(self, lat: float, lon: float, zoom: int) -> Tuple[int, int, int]:
+        """``(tile_x, tile_y, cell)`` containing a point at ``zoom``."""
+        size = 2 ** zoom * self.cells
+        x, y = _mercator(lat, lon)
+        grid_x, grid_y = min(int(x * size), size - 1), min(int(y * size), size - 1)
+        tile_x, cell_x = divmod(grid_x, self.cells)
+        tile_y, cell_y = divmod(grid_y, self.cells)
+        return tile_x, tile_y, cell_y * self.cells + cell_x
+
+    def cell_center(self, zoom: int, tile_x: int, tile_y: int, cell: int) -> Tuple[float, float]:
+        """``(lat, lon)`` at the centre of a cell."""
+        size = 2 ** zoom * self.cells
+        cell_y, cell_x = divmod(cell, self.cells)
+        return _unmercator(
+            (tile_x * self.cells + cell_x + 0.5) / size,
+            (tile_y * self.cells + cell_y + 0.5) / size
+        )
+
+    def zoom_for_bbox(self, bbox: BBox) -> int:
+        """Deepest pre-aggregated zoom at which ``bbox`` spans few enough tiles."""
+        for zoom in range(self.max_zoom, self.min_zoom, -1):
+            min_x, max_x, min_y, max_y = tile_range(bbox, zoom)
+            if (max_x - min_x + 1) * (max_y - min_y + 1) <= settings.HEATMAP_MAX_VIEWPORT_TILES:
+                return zoom
+        return self.min_zoom
+
+    def deltas(self, db: Session, report_ids: Iterable[str], sign: int = 1) -> Counter:
+        """Cell deltas that add (``sign=1``) or remove (``sign=-1``) reports at every zoom level.
+
+        Uses the reports' current location, primary label and creation day,
+        so call it after inserting and before deleting; use ``move`` to
+        relabel. Only reads; write the result with ``commit``.
+        """
+        deltas: Counter = Counter()
+        self._collect(db, list(report_ids), sign, deltas)
+        return deltas
+
+    def move(self, db: Session, report_ids: List[str], change: Callable[[], None]) -> Counter:
+        """Run ``change``, which relabels or relocates ``report_ids``, and return the count deltas.
+
+        Counts are read before and after ``change`` (flushed in between);
+        cells whose count is unchanged get no delta. Write the result with
+        ``commit``.
+        """
+        deltas: Counter = Counter()
+        self._collect(db, report_ids, -1, deltas)
+        change()
+        db.flush()
+        self._collect(db, report_ids, 1, deltas)
+        return deltas
+
+    def commit(self, db: Session, deltas: Counter):
+        """Write ``deltas`` as one upsert in its own transaction.
+
+        Call after the transaction that produced them has committed. A
+        failure is logged and rolled back rather than raised: the report
+        change it belongs to is already durable.
+        """
+        if not any(deltas.values()):
+            return
+        try:
+            self._upsert(db, deltas)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Heatmap tiles not updated ({len(deltas)} cells); run rebuild_heatmap_tiles: {e}")
+
+    def apply(self, db: Session, report_ids: Iterable[str], sign: int = 1) -> int:
+        """Write the deltas of ``report_ids`` in the current transaction (for ``rebuild``).
+
+        Does not commit. Returns the number of located reports.
+        """
+        deltas: Counter = Counter()
+        located = self._collect(db, list(report_ids), sign, deltas)
+        self._upsert(db, deltas)
+        return located
+
+    def _collect(self, db: Session, report_ids: List[str], sign: int, deltas: Counter) -> int:
+        """Add the reports' cell deltas to ``deltas``; returns how many are located."""
+        batch_size = settings.BULK_INSERT_BATCH_SIZE
+        located = 0
+        for start in range(0, len(report_ids), batch_size):
+            for lat, lon, created_at, label in self._locate(db, report_ids[start:start + batch_size]):
+                located += 1
+                for zoom in range(self.min_zoom, self.max_zoom + 1):
+                    tile_x, tile_y, cell = self.cell_key(lat, lon, zoom)
+                    deltas[(zoom, tile_x, tile_y, created_at.date(), label or "", cell)] += sign
+        return located
+
+    def read_tiles(
+        self,
+        db: Session,
+        zoom: int,
+        tiles: Optional[Tuple[int, int, int, int]],
+        issue_type: Optional[str],
+        since: date
+    ) -> TileCounts:
+        """Counts per cell in the ``(min_x, max_x, min_y, max_y)`` tile range."""
+        cells = heatmap_cells.c
+        query = db.query(cells.tile_x, cells.tile_y, cells.cell, func.sum(cells.report_count)).filter(
+            cells.zoom == zoom, cells.day >= since
+        )
+        if tiles is not None:
+            min_x, max_x, min_y, max_y = tiles
+            query = query.filter(cells.tile_x.between(min_x, max_x), cells.tile_y.between(min_y, max_y))
+        if issue_type:
+            query = query.filter(cells.issue_type == issue_type)
+        rows = query.group_by(cells.tile_x, cells.tile_y, cells.cell).having(
+            func.sum(cells.report_count) > 0
+        ).all()
+        return {(tile_x, tile_y, cell): int(count) for tile_x, tile_y, cell, count in rows}
+
+    def peak(self, db: Session, zoom: int, issue_type: Optional[str], since: date) -> int:
+        """Count of the busiest cell at ``zoom``, over all tiles.
+
+        The common scale for heatmap intensities, so adjacent tiles shade
+        alike. Cached for ``peak_ttl`` seconds, as the scan covers every
+        cell of the zoom level in the window.
+        """
+        key = (zoom, issue_type or "", since)
+        cached = self._peaks.get(key)
+        now = time.monotonic()
+        if cached and cached[0] > now:
+            return cached[1]
+
+        cells = heatmap_cells.c
+        query = select(func.sum(cells.report_count).label("count")).where(
+            cells.zoom == zoom, cells.day >= since
+        )
+        if issue_type:
+            query = query.where(cells.issue_type == issue_type)
+        counts = query.group_by(cells.tile_x, cells.tile_y, cells.cell).subquery()
+        peak = int(db.query(func.max(counts.c.count)).scalar() or 0)
+        if len(self._peaks) > 1024:
+            self._peaks = {k: v for k, v in self._peaks.items() if v[0] > now}
+        self._peaks[key] = (now + self.peak_ttl, peak)
+        return peak
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute every tile from the reports table; commits."""
+        db.execute(heatmap_cells.delete())
+        located, last_id = 0, None
+        while True:
+            query = db.query(Report.id).order_by(Report.id)
+            if last_id is not None:
+                query = query.filter(Report.id > last_id)
+            # One upsert per batch keeps the delta map small; nothing else
+            # should be writing tiles during a rebuild
+            ids = [report_id for (report_id,) in query.limit(settings.BULK_INSERT_BATCH_SIZE).all()]
+            if not ids:
+                break
+            located += self.apply(db, ids)
+            last_id = ids[-1]
+        db.commit()
+        return located
+
+    def _locate(self, db: Session, report_ids: List[str]) -> List[Tuple[float, float, object, Optional[str]]]:
+        """``(lat, lon, created_at, primary label)`` of the located reports."""
+        label = db.query(IssueLabel.label).filter(
+            IssueLabel.report_id == Report.id, IssueLabel.is_primary
+        ).limit(1).scalar_subquery()
+
+        if db.bind.dialect.name == "postgresql":
+            geometry = Report.geometry
+            if settings.SPATIAL_SRID != 4326:
+                geometry = func.ST_Transform(geometry, 4326)
+            return db.query(func.ST_Y(geometry), func.ST_X(geometry), Report.created_at, label).filter(
+                Report.id.in_(report_ids), Report.geometry.isnot(None)
+            ).all()
+
+        rows = db.query(Report.geometry, Report.created_at, label).filter(
+            Report.id.in_(report_ids), Report.geometry.isnot(None)
+        ).all()
+        located = []
+        for geometry, created_at, primary in rows:
+            coords = point_coordinates(geometry)
+            if coords:
+                located.append((coords[1], coords[0], created_at, primary))
+        return located
+
+    def _upsert(self, db: Session, deltas: Counter):
+        # Sorted so every writer locks shared cell rows in the same order
+        rows = [dict(zip(_KEY, key), report_count=delta) for key, delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(heatmap_cells)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_KEY,
+            set_={"report_count": heatmap_cells.c.report_count + stmt.excluded.report_count}
+        )
+        db.execute(stmt, rows)
+
+
+heatmap_tiles = HeatmapTiles(
+    settings.HEATMAP_MIN_ZOOM, settings.HEATMAP_MAX_ZOOM, settings.HEATMAP_TILE_CELLS,
+    peak_ttl=settings.HEATMAP_CACHE_MAX_AGE
+)
@@ -0,0 +1,292 @@
+"""
+Geographic hotspot detection: report counts binned into a lon/lat grid per
+UTC day, clustered with density-based clustering (DBSCAN).
+
+Binning happens in the database on PostgreSQL (one row per day and occupied
+cell instead of one per report), so clustering cost depends on the number of
+occupied cells rather than the number of reports. Bins are kept in process
+and refreshed incrementally, with a full reload every
+``HOTSPOT_REBUILD_INTERVAL`` to pick up deletions and late changes.
+
+``created_at`` is stamped by the app before a report commits (and before
+bulk ingest geocodes), and deferred geocoding adds geometries afterwards,
+so the newest reports can become visible out of ``created_at`` order. The
+last ``HOTSPOT_REFRESH_OVERLAP`` seconds are therefore re-read on every
+request, report by report, and merged by id; only older reports are
+considered settled and binned.
+"""
+
+import asyncio
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sqlalchemy import BigInteger, Date, cast, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import AnySession, run_in_session
+from app.models.models import Report
+from app.services.spatial_index import EARTH_RADIUS_M, point_coordinates
+
+# Per-cell aggregates: cell id, report count, severity sum, scored count
+_Bins = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class HotspotIndex:
+    """Day-bucketed grid bins of report locations with cached clusterings."""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._columns = int(math.ceil(360 / cell_size))
+        self._version = 0  # bumped whenever the bins change; never reset
+        self._reset()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _reset(self):
+        self._days: Dict[date, _Bins] = {}
+        self._covered_from: Optional[date] = None  # first day loaded
+        self._as_of: Optional[datetime] = None  # reports created up to here are settled and loaded
+        self._recent: Dict[str, datetime] = {}  # loaded reports created after _as_of, by id
+        self._loaded_at = 0.0
+        self._results: Dict[Tuple[date, int, int], List[Dict[str, Any]]] = {}
+
+    async def hotspots(self, db: AnySession, days: int, limit: int) -> List[Dict[str, Any]]:
+        """Densest clusters of reports over the last ``days`` UTC days (today included)."""
+        start_day = datetime.utcnow().date() - timedelta(days=days - 1)
+
+        async with self._get_lock():
+            await self._refresh(db, start_day)
+            key = (start_day, limit, self._version)
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached
+            bins = self._window_bins(start_day)
+
+        # Clustering is CPU-bound; keep it off the event loop
+        result = await asyncio.to_thread(self._cluster, bins, limit)
+        self._results = {k: v for k, v in self._results.items() if k[2] == self._version}
+        self._results[key] = result
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "days_loaded": len(self._days),
+            "cells": int(sum(len(bins[0]) for bins in self._days.values())),
+            "as_of": self._as_of.isoformat() if self._as_of else None,
+            "unsettled_reports": len(self._recent),
+            "age_s": time.monotonic() - self._loaded_at if self._loaded_at else None,
+            "cached_results": len(self._results),
+        }
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def _refresh(self, db: AnySession, start_day: date):
+        """Load what is missing for a window starting at ``start_day``."""
+        if time.monotonic() - self._loaded_at > settings.HOTSPOT_REBUILD_INTERVAL:
+            self._reset()
+
+        start = datetime.combine(start_day, datetime.min.time())
+        settled = datetime.utcnow() - timedelta(seconds=settings.HOTSPOT_REFRESH_OVERLAP)
+        created = Report.created_at
+        changed = False
+        if self._as_of is None:
+            as_of = max(settled, start)
+            self._merge(await run_in_session(db, self._load, [created >= start, created <= as_of]))
+            self._covered_from, self._as_of, self._loaded_at = start_day, as_of, time.monotonic()
+            changed = True
+        elif start_day < self._covered_from:
+            covered = datetime.combine(self._covered_from, datetime.min.time())
+            changed |= self._merge(await run_in_session(db, self._load, [created >= start, created < covered]))
+            self._covered_from = start_day
+
+        # Reports not settled yet: merge those not seen before
+        rows = await run_in_session(db, self._load_points, [created > self._as_of])
+        new = [row for row in rows if row[0] not in self._recent]
+        changed |= self._merge(self._bin_points(new))
+        self._recent.update((report_id, created_at) for report_id, created_at, *_ in new)
+
+        # Advance the settled watermark and forget ids behind it
+        if settled > self._as_of:
+            self._as_of = settled
+            self._recent = {
+                report_id: created_at for report_id, created_at in self._recent.items() if created_at > settled
+            }
+        if changed:
+            self._version += 1
+
+    def _load_points(self, db: Session, window: list) -> List[Tuple[str, datetime, float, float, Optional[float]]]:
+        """``(id, created_at, lon, lat, severity)`` of each located report matching ``window``."""
+        if db.bind.dialect.name == "postgresql":
+            geometry = Report.geometry
+            if settings.SPATIAL_SRID != 4326:
+                geometry = func.ST_Transform(geometry, 4326)
+            rows = db.query(
+                Report.id, Report.created_at, func.ST_X(geometry), func.ST_Y(geometry), Report.severity_score
+            ).filter(Report.geometry.isnot(None), *window).all()
+            return [(str(report_id), created_at, lon, lat, severity) for report_id, created_at, lon, lat, severity in rows]
+
+        rows = db.query(Report.id, Report.created_at, Report.geometry, Report.severity_score).filter(
+            Report.geometry.isnot(None), *window
+        ).all()
+        points = []
+        for report_id, created_at, geometry, severity in rows:
+            coords = point_coordinates(geometry)
+            if coords:
+                points.append((str(report_id), created_at, *coords, severity))
+        return points
+
+    def _bin_points(self, points: List[Tuple[str, datetime, float, float, Optional[float]]]) -> Dict[date, _Bins]:
+        by_day: Dict[date, List[Tuple[int, Optional[float]]]] = {}
+        for _, created_at, lon, lat, severity in points:
+            by_day.setdefault(created_at.date(), []).append((self._cell(lon, lat), severity))
+        return {
+            day: self._aggregate(
+                np.array([cell for cell, _ in items], dtype=np.int64),
+                np.ones(len(items), dtype=np.int64),
+                np.array([s if s is not None else 0.0 for _, s in items], dtype=np.float64),
+                np.array([s is not None for _, s in items], dtype=np.int64),
+            )
+            for day, items in by_day.items()
+        }
+
+    def _load(self, db: Session, window: list) -> Dict[date, _Bins]:
+        """Per-day bins of located reports matching the ``window`` conditions."""
+        if db.bind.dialect.name == "postgresql":
+            return self._load_binned(db, window)
+        return self._bin_points(self._load_points(db, window))
+
+    def _load_binned(self, db: Session, window) -> Dict[date, _Bins]:
+        geometry = Report.geometry
+        if settings.SPATIAL_SRID != 4326:
+            geometry = func.ST_Transform(geometry, 4326)
+        row = cast(func.floor((func.ST_Y(geometry) + 90) / self.cell_size), BigInteger)
+        column = cast(func.floor((func.ST_X(geometry) + 180) / self.cell_size), BigInteger)
+        day = cast(Report.created_at, Date)
+        cell = row * self._columns + column
+
+        rows = db.query(
+            day,
+            cell,
+            func.count(),
+            func.coalesce(func.sum(Report.severity_score), 0.0),
+            func.count(Report.severity_score),
+        ).filter(Report.geometry.isnot(None), *window).group_by(day, cell).all()
+
+        by_day: Dict[date, list] = {}
+        for bucket, cell, count, severity_sum, scored in rows:
+            by_day.setdefault(bucket, []).append((cell, count, float(severity_sum), scored))
+        return {
+            bucket: tuple(np.array(values, dtype=dtype) for values, dtype in zip(
+                zip(*items), (np.int64, np.int64, np.float64, np.int64)
+            ))
+            for bucket, items in by_day.items()
+        }
+
+    def _merge(self, loaded: Dict[date, _Bins]) -> bool:
+        for day, bins in loaded.items():
+            existing = self._days.get(day)
+            if existing is not None:
+                bins = self._aggregate(*(np.concatenate(pair) for pair in zip(existing, bins)))
+            self._days[day] = bins
+        return bool(loaded)
+
+    def _window_bins(self, start_day: date) -> _Bins:
+        selected = [bins for day, bins in self._days.items() if day >= start_day]
+        if not selected:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0), empty
+        return self._aggregate(*(np.concatenate(column) for column in zip(*selected)))
+
+    @staticmethod
+    def _aggregate(cells: np.ndarray, counts: np.ndarray, severity: np.ndarray, scored: np.ndarray) -> _Bins:
+        unique, inverse = np.unique(cells, return_inverse=True)
+        return (
+            unique,
+            np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64),
+            np.bincount(inverse, weights=severity, minlength=len(unique)),
+            np.bincount(inverse, weights=scored, minlength=len(unique)).astype(np.int64),
+        )
+
+    def _cell(self, lon: float, lat: float) -> int:
+        row = int(math.floor((lat + 90) / self.cell_size))
+        column = int(math.floor((lon + 180) / self.cell_size))
+        return row * self._columns + column
+
+    def _cluster(self, bins: _Bins, limit: int) -> List[Dict[str, Any]]:
+        """DBSCAN over occupied cell centres, weighted by report count.
+
+        A cell seeds a cluster when the reports within ``HOTSPOT_EPS_M`` of it
+        reach ``HOTSPOT_MIN_REPORTS`` and ``HOTSPOT_DENSITY_FACTOR`` times what
+        the typical (median) cell density would put there, so a busy window does
+        not merge the whole city into one cluster.
+        """
+        cells, counts, severity, scored = bins
+        if not len(cells):
+            return []
+
+        lats = (cells // self._columns + 0.5) * self.cell_size - 90
+        lons = (cells % self._columns + 0.5) * self.cell_size - 180
+
+        cell_height_m = self.cell_size * math.pi * EARTH_RADIUS_M / 180
+        cell_area_m2 = cell_height_m ** 2 * max(math.cos(math.radians(float(np.average(lats, weights=counts)))), 1e-6)
+        expected = float(np.median(counts)) * math.pi * settings.HOTSPOT_EPS_M ** 2 / cell_area_m2
+        min_samples = max(settings.HOTSPOT_MIN_REPORTS, math.ceil(settings.HOTSPOT_DENSITY_FACTOR * expected))
+
+        labels = DBSCAN(
+            eps=settings.HOTSPOT_EPS_M / EARTH_RADIUS_M,
+            min_samples=min_samples,
+            metric="haversine",
+            algorithm="ball_tree",
+        ).fit(np.radians(np.column_stack([lats, lons])), sample_weight=counts).labels_
+
+        clustered = labels >= 0
+        if not clustered.any():
+            return []
+        labels, lats, lons = labels[clustered], lats[clustered], lons[clustered]
+        counts, severity, scored = counts[clustered], severity[clustered], scored[clustered]
+
+        totals = np.bincount(labels, weights=counts)
+        center_lats = np.bincount(labels, weights=lats * counts) / totals
+        center_lons = np.bincount(labels, weights=lons * counts) / totals
+        severity_sums = np.bincount(labels, weights=severity)
+        scored_counts = np.bincount(labels, weights=scored)
+        distances = _haversine_m(lats, lons, center_lats[labels], center_lons[labels])
+
+        half_cell = self.cell_size / 2
+        hotspots = []
+        for label in np.argsort(-totals)[:limit]:
+            members = labels == label
+            hotspots.append({
+                "lat": float(center_lats[label]),
+                "lon": float(center_lons[label]),
+                "report_count": int(totals[label]),
+                "avg_severity": float(severity_sums[label] / scored_counts[label]) if scored_counts[label] else None,
+                "radius_m": float(distances[members].max()),
+                "bbox": [
+                    float(lons[members].min() - half_cell),
+                    float(lats[members].min() - half_cell),
+                    float(lons[members].max() + half_cell),
+                    float(lats[members].max() + half_cell),
+                ],
+                "cells": int(members.sum()),
+            })
+        return hotspots
+
+
+def _haversine_m(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+hotspot_index = HotspotIndex(settings.HOTSPOT_CELL_SIZE)
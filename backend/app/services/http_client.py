@@ -0,0 +1,51 @@
+"""
+Shared, pooled HTTP client for outbound calls to external services.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client, creating it on first use.
+
+    Connections are bound to the event loop that opened them, so a caller
+    running on a different loop (e.g. a Celery task using asyncio.run) gets a
+    fresh client instead of one whose loop has already been closed.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=settings.HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=settings.ML_REQUEST_TIMEOUT,
+        )
+        _client_loop = loop
+        logger.debug("Created pooled HTTP client")
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and release its pooled connections."""
+    global _client, _client_loop
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
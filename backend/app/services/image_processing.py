@@ -0,0 +1,124 @@
+"""
+Image preprocessing stage shared by media ingestion and the ML pipelines.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pillow releases the GIL while decoding, resampling and encoding, so a
+# thread pool gives real parallelism here without pickling image bytes
+# across process boundaries.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    thread_name_prefix="image-processing"
+)
+
+
+class ImageDecodeError(ValueError):
+    """Raised when Pillow cannot decode an image (unsupported format, truncated data)."""
+
+
+@dataclass
+class ProcessedImage:
+    """Derived variants of one uploaded image."""
+
+    digest: str  # SHA-256 of the original bytes
+    width: int  # after EXIF orientation
+    height: int
+    model_data: bytes  # JPEG, longest side <= IMAGE_MODEL_MAX_SIDE
+    model_width: int
+    model_height: int
+    thumbnail_data: bytes  # JPEG, longest side <= THUMBNAIL_MAX_SIDE
+
+    @property
+    def model_scale(self) -> float:
+        """Factor mapping model-variant pixel coordinates back to the original."""
+        return self.width / self.model_width if self.model_width else 1.0
+
+
+class ImageProcessor:
+    """Decode an image once and derive the variants the rest of the app needs."""
+
+    def __init__(
+        self,
+        model_max_side: Optional[int] = None,
+        thumbnail_max_side: Optional[int] = None,
+        quality: Optional[int] = None,
+    ):
+        self.model_max_side = model_max_side or settings.IMAGE_MODEL_MAX_SIDE
+        self.thumbnail_max_side = thumbnail_max_side or settings.THUMBNAIL_MAX_SIDE
+        self.quality = quality or settings.IMAGE_JPEG_QUALITY
+
+    async def process(self, image_data: bytes) -> ProcessedImage:
+        """Produce model-sized and thumbnail variants on the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._process, image_data)
+
+    async def resize(self, image_data: bytes, max_side: int) -> bytes:
+        """Return ``image_data`` re-encoded no larger than ``max_side`` per side."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._resize, image_data, max_side)
+
+    def _process(self, image_data: bytes) -> ProcessedImage:
+        image, scale = self._decode(image_data, self.model_max_side)
+
+        model_image = image.copy()
+        model_image.thumbnail((self.model_max_side, self.model_max_side), Image.LANCZOS)
+
+        thumbnail = model_image.copy()
+        thumbnail.thumbnail((self.thumbnail_max_side, self.thumbnail_max_side), Image.LANCZOS)
+
+        return ProcessedImage(
+            digest=hashlib.sha256(image_data).hexdigest(),
+            width=round(image.width * scale),
+            height=round(image.height * scale),
+            model_data=self._encode(model_image),
+            model_width=model_image.width,
+            model_height=model_image.height,
+            thumbnail_data=self._encode(thumbnail)
+        )
+
+    def _resize(self, image_data: bytes, max_side: int) -> bytes:
+        image, scale = self._decode(image_data, max_side)
+        if scale == 1.0 and max(image.size) <= max_side:
+            return image_data
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        return self._encode(image)
+
+    @staticmethod
+    def _decode(image_data: bytes, target_side: int) -> Tuple[Image.Image, float]:
+        """Decode, apply EXIF orientation and normalize to RGB.
+
+        Returns the image and the factor between the original resolution and
+        the decoded one (> 1 when JPEG draft mode downsampled during decode).
+        """
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            original_width = image.width
+            # Downsample during JPEG decoding when the source is far larger
+            # than anything we produce; this is much cheaper than a full decode.
+            image.draft("RGB", (target_side, target_side))
+            scale = original_width / image.width
+            image = ImageOps.exif_transpose(image)
+            return image.convert("RGB"), scale
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+            raise ImageDecodeError(f"Cannot decode image: {e}") from e
+
+    def _encode(self, image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+        return buffer.getvalue()
+
+
+image_processor = ImageProcessor()
@@ -0,0 +1,207 @@
+"""
+Download-once media fetch layer shared by the ML pipelines.
+"""
+
+import asyncio
+import calendar
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.core.config import settings
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Presigned S3 URLs carry a fresh signature on every request; these
+# parameters never change which object is returned. Everything else
+# (path, versionId, ...) is part of the cache key.
+_VOLATILE_QUERY_PARAMS = {
+    "x-amz-algorithm", "x-amz-credential", "x-amz-date", "x-amz-expires",
+    "x-amz-signedheaders", "x-amz-signature", "x-amz-security-token",
+    "awsaccesskeyid", "signature", "expires",
+}
+
+
+class MediaTooLargeError(ValueError):
+    """Raised when a download exceeds the cache's per-object byte limit."""
+
+
+@dataclass
+class _CacheEntry:
+    data: bytes
+    etag: Optional[str]
+    fetched_at: float
+    url: str  # last URL the origin accepted for this entry
+
+
+class MediaCache:
+    """Bounded, size-aware LRU of downloaded media.
+
+    Entries are keyed by object (URL without signature parameters), so
+    re-signed links to the same object share one entry, but a cached copy
+    is only served directly for the exact, unexpired URL that fetched or
+    last revalidated it. Any other URL is revalidated with
+    ``If-None-Match``, so the origin still checks its signature and the
+    object version. Concurrent requests for the same URL share a single
+    download, entries younger than ``ttl`` are served without touching the
+    origin, and downloads over ``max_item_bytes`` are aborted.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.shared = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    async def fetch(self, url: str) -> bytes:
+        """Return the bytes behind ``url``, downloading them at most once."""
+        key = self._cache_key(url)
+
+        entry = self._entries.get(key)
+        if entry and entry.url == url and time.monotonic() - entry.fetched_at < self.ttl \
+                and not _url_expired(url):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += len(entry.data)
+            return entry.data
+
+        # Shared per exact URL: each distinct signature reaches the origin
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            self.shared += 1
+            data = await asyncio.shield(inflight)
+            self.bytes_saved += len(data)
+            return data
+
+        task = asyncio.ensure_future(self._download(key, url, entry))
+        self._inflight[url] = task
+        task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # Shield so a pipeline timing out does not cancel the download for
+        # the other pipelines waiting on it.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        lookups = self.hits + self.shared + self.revalidations + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "shared_downloads": self.shared,
+            "evictions": self.evictions,
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def clear(self):
+        """Drop all cached entries (counters are kept)."""
+        self._entries.clear()
+        self._size = 0
+
+    async def _download(self, key: str, url: str, entry: Optional[_CacheEntry]) -> bytes:
+        """Fetch ``url`` from the origin, revalidating ``entry`` when possible."""
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        client = get_http_client()
+        async with client.stream("GET", url, headers=headers, timeout=settings.ML_REQUEST_TIMEOUT) as response:
+            if response.status_code == 304 and entry:
+                entry.fetched_at = time.monotonic()
+                entry.url = url
+                self._entries.move_to_end(key)
+                self.revalidations += 1
+                self.bytes_saved += len(entry.data)
+                return entry.data
+
+            response.raise_for_status()
+            data = await self._read_limited(response, url)
+        self.misses += 1
+        self.bytes_downloaded += len(data)
+
+        self._store(key, _CacheEntry(
+            data=data,
+            etag=response.headers.get("etag"),
+            fetched_at=time.monotonic(),
+            url=url
+        ))
+        return data
+
+    async def _read_limited(self, response, url: str) -> bytes:
+        """Response body, aborting once it exceeds ``max_item_bytes``."""
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_item_bytes:
+            raise MediaTooLargeError(f"{self._cache_key(url)} is {declared} bytes (limit {self.max_item_bytes})")
+
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_item_bytes:
+                raise MediaTooLargeError(f"{self._cache_key(url)} exceeds {self.max_item_bytes} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _store(self, key: str, entry: _CacheEntry):
+        """Insert ``entry`` and evict least recently used items over budget."""
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._size -= len(previous.data)
+
+        self._entries[key] = entry
+        self._size += len(entry.data)
+
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.data)
+            self.evictions += 1
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        """Normalize ``url`` so re-signed links to the same object share a key."""
+        parts = urlsplit(url)
+        query = [
+            (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if name.lower() not in _VOLATILE_QUERY_PARAMS
+        ]
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _url_expired(url: str) -> bool:
+    """Whether a presigned URL (SigV4 or SigV2 query auth) is past its expiry."""
+    params = {name.lower(): value for name, value in parse_qsl(urlsplit(url).query)}
+    try:
+        if "x-amz-date" in params and "x-amz-expires" in params:
+            signed_at = calendar.timegm(time.strptime(params["x-amz-date"], "%Y%m%dT%H%M%SZ"))
+            return time.time() >= signed_at + int(params["x-amz-expires"])
+        if "expires" in params:
+            return time.time() >= int(params["expires"])
+    except ValueError:
+        return True
+    return False
+
+
+media_cache = MediaCache(
+    max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+    max_item_bytes=settings.IMAGE_MAX_SIZE,
+    ttl=settings.MEDIA_CACHE_TTL,
+)
@@ -0,0 +1,336 @@
+"""
+Inference backends for the models configured in MLService.
+
+Backends return raw outputs in the Hugging Face Inference API shape so that
+MLService can post-process them the same way regardless of where the model
+actually ran.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.http_client import get_http_client
+from app.services.resilience import CircuitOpenError, DependencyGuard
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceError(Exception):
+    """Raised when a backend fails to produce a model output."""
+
+    def __init__(
+        self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class InferenceBackend(ABC):
+    """Interface implemented by every inference backend."""
+
+    name = "base"
+
+    @abstractmethod
+    async def zero_shot(self, model_id: str, text: str, labels: List[str]) -> Dict[str, Any]:
+        """Return ``{"labels": [...], "scores": [...]}`` sorted by score."""
+
+    @abstractmethod
+    async def zero_shot_batch(
+        self, model_id: str, texts: List[str], labels: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Classify several texts in one call; results follow input order."""
+
+    @abstractmethod
+    async def image_to_text(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        """Return ``[{"generated_text": ...}]``."""
+
+    @abstractmethod
+    async def object_detection(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        """Return ``[{"label", "score", "box": {xmin, ymin, xmax, ymax}}]``."""
+
+    @abstractmethod
+    async def visual_question_answering(
+        self, model_id: str, image_data: bytes, question: str
+    ) -> List[Dict[str, Any]]:
+        """Return ``[{"answer", "score"}]`` sorted by score."""
+
+    @abstractmethod
+    async def probe(self, model_id: str) -> Dict[str, Any]:
+        """Return ``{"status": ...}`` describing model availability."""
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Per-model limiter/breaker state, for backends that have them."""
+        return {}
+
+
+class HuggingFaceAPIBackend(InferenceBackend):
+    """Runs models remotely through the Hugging Face Inference API."""
+
+    name = "api"
+
+    def __init__(self):
+        self.api_url = settings.HUGGINGFACE_API_URL
+        self.api_token = settings.HUGGINGFACE_API_TOKEN
+        self.request_timeout = settings.ML_REQUEST_TIMEOUT
+        self._guards: Dict[str, DependencyGuard] = {}
+
+    async def zero_shot(self, model_id: str, text: str, labels: List[str]) -> Dict[str, Any]:
+        return await self._post(model_id, json={
+            "inputs": text,
+            "parameters": {
+                "candidate_labels": labels
+            }
+        })
+
+    async def zero_shot_batch(
+        self, model_id: str, texts: List[str], labels: List[str]
+    ) -> List[Dict[str, Any]]:
+        results = await self._post(model_id, json={
+            "inputs": texts,
+            "parameters": {
+                "candidate_labels": labels
+            }
+        })
+        # A single input comes back as a bare object rather than a list
+        return results if isinstance(results, list) else [results]
+
+    async def image_to_text(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        return await self._post(model_id, content=image_data)
+
+    async def object_detection(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        return await self._post(model_id, content=image_data)
+
+    async def visual_question_answering(
+        self, model_id: str, image_data: bytes, question: str
+    ) -> List[Dict[str, Any]]:
+        # Base64 (4/3 of the raw size, versus 2x for hex) streamed straight
+        # into the request body, so the full JSON document is never built.
+        prefix = f'{{"inputs": {{"question": {json.dumps(question)}, "image": "'.encode()
+        suffix = b'"}}'
+        encoded_length = 4 * ((len(image_data) + 2) // 3)
+        return await self._post(
+            model_id,
+            content=_json_base64_stream(prefix, image_data, suffix),
+            headers={
+                "Content-Type": "application/json",
+                "Content-Length": str(len(prefix) + encoded_length + len(suffix))
+            }
+        )
+
+    async def probe(self, model_id: str) -> Dict[str, Any]:
+        client = get_http_client()
+        response = await client.get(
+            f"{self.api_url}/{model_id}",
+            headers=self._auth_headers(),
+            timeout=settings.ML_STATUS_PROBE_TIMEOUT
+        )
+        return {"status": "available" if response.status_code == 200 else "unavailable"}
+
+    async def _post(self, model_id: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Any:
+        """POST to the model endpoint through its limiter and circuit breaker."""
+        guard = self._guards.get(model_id)
+        if guard is None:
+            guard = self._guards[model_id] = DependencyGuard(model_id)
+
+        try:
+            return await guard.call(
+                lambda: self._send(model_id, headers, **kwargs),
+                is_overload=_is_overload,
+                retry_after=lambda e: getattr(e, "retry_after", None)
+            )
+        except CircuitOpenError as e:
+            raise InferenceError(str(e), status_code=503, retry_after=e.retry_after) from e
+
+    async def _send(self, model_id: str, headers: Optional[Dict[str, str]], **kwargs) -> Any:
+        """POST to the model endpoint and decode the JSON response."""
+        client = get_http_client()
+        response = await client.post(
+            f"{self.api_url}/{model_id}",
+            headers={**self._auth_headers(), **(headers or {})},
+            timeout=self.request_timeout,
+            **kwargs
+        )
+        if response.status_code != 200:
+            raise InferenceError(
+                f"{model_id} returned HTTP {response.status_code}",
+                status_code=response.status_code,
+                retry_after=_retry_after(response)
+            )
+        return response.json()
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {model_id: guard.stats() for model_id, guard in self._guards.items()}
+
+    def _auth_headers(self) -> Dict[str, str]:
+        """Authorization headers for the Hugging Face Inference API."""
+        return {"Authorization": f"Bearer {self.api_token}"}
+
+
+def _is_overload(error: Exception) -> bool:
+    """Whether ``error`` means the upstream is unhealthy or saturated."""
+    if isinstance(error, InferenceError):
+        return error.status_code in (429, 500, 502, 503, 504)
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to back off, from Retry-After or the API's ``estimated_time``."""
+    header = response.headers.get("retry-after")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    if response.status_code == 503:
+        try:
+            return float(response.json()["estimated_time"])
+        except Exception:
+            pass
+    return None
+
+
+async def _json_base64_stream(
+    prefix: bytes, data: bytes, suffix: bytes, chunk_size: int = 3 * 16384
+) -> AsyncIterator[bytes]:
+    """Yield ``prefix + base64(data) + suffix`` in bounded chunks.
+
+    ``chunk_size`` is a multiple of 3 so the encoded chunks concatenate into
+    one valid base64 string without intermediate padding.
+    """
+    yield prefix
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield base64.b64encode(view[start:start + chunk_size])
+    yield suffix
+
+
+class LocalTransformersBackend(InferenceBackend):
+    """Runs models in-process on CPU with ``transformers`` pipelines.
+
+    Pipelines are loaded lazily the first time a model is used and then kept
+    for the lifetime of the worker process. Inference runs on a small
+    dedicated thread pool so it never blocks the event loop.
+    """
+
+    name = "local"
+
+    _TASKS = {
+        "zero_shot": "zero-shot-classification",
+        "image_to_text": "image-to-text",
+        "object_detection": "object-detection",
+        "vqa": "visual-question-answering",
+    }
+
+    def __init__(self):
+        self.model_dir = settings.ML_LOCAL_MODEL_DIR
+        self.device = settings.ML_LOCAL_DEVICE
+        self._pipelines: Dict[str, Any] = {}
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.ML_LOCAL_WORKERS,
+            thread_name_prefix="ml-local"
+        )
+
+    async def zero_shot(self, model_id: str, text: str, labels: List[str]) -> Dict[str, Any]:
+        return await self._run("zero_shot", model_id, text, candidate_labels=labels)
+
+    async def zero_shot_batch(
+        self, model_id: str, texts: List[str], labels: List[str]
+    ) -> List[Dict[str, Any]]:
+        results = await self._run(
+            "zero_shot", model_id, texts, candidate_labels=labels, batch_size=len(texts)
+        )
+        return results if isinstance(results, list) else [results]
+
+    async def image_to_text(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        return await self._run("image_to_text", model_id, image_data)
+
+    async def object_detection(self, model_id: str, image_data: bytes) -> List[Dict[str, Any]]:
+        return await self._run("object_detection", model_id, image_data)
+
+    async def visual_question_answering(
+        self, model_id: str, image_data: bytes, question: str
+    ) -> List[Dict[str, Any]]:
+        return await self._run("vqa", model_id, image_data, question=question)
+
+    async def probe(self, model_id: str) -> Dict[str, Any]:
+        if any(key.endswith(f":{model_id}") for key in self._pipelines):
+            return {"status": "available", "loaded": True}
+        if self.model_dir and not os.path.isdir(os.path.join(self.model_dir, model_id)):
+            return {"status": "unavailable", "loaded": False}
+        return {"status": "available", "loaded": False}
+
+    async def _run(self, kind: str, model_id: str, inputs: Any, **kwargs) -> Any:
+        """Execute a pipeline call on the inference thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: self._infer(kind, model_id, inputs, **kwargs)
+        )
+
+    def _infer(self, kind: str, model_id: str, inputs: Any, **kwargs) -> Any:
+        pipe = self._get_pipeline(kind, model_id)
+        if isinstance(inputs, bytes):
+            inputs = self._decode_image(inputs)
+        try:
+            if kind == "vqa":
+                return pipe(image=inputs, **kwargs)
+            return pipe(inputs, **kwargs)
+        except Exception as e:
+            raise InferenceError(f"{model_id} local inference failed: {e}") from e
+
+    def _get_pipeline(self, kind: str, model_id: str):
+        """Return the cached pipeline for ``model_id``, loading it on first use."""
+        key = f"{kind}:{model_id}"
+        pipe = self._pipelines.get(key)
+        if pipe is not None:
+            return pipe
+
+        with self._load_lock:
+            pipe = self._pipelines.get(key)
+            if pipe is None:
+                try:
+                    from transformers import pipeline
+                except ImportError as e:
+                    raise InferenceError("transformers is not installed") from e
+
+                source = os.path.join(self.model_dir, model_id) if self.model_dir else model_id
+                logger.info(f"Loading local model {model_id} for {self._TASKS[kind]}")
+                pipe = pipeline(self._TASKS[kind], model=source, device=self.device)
+                self._pipelines[key] = pipe
+        return pipe
+
+    @staticmethod
+    def _decode_image(image_data: bytes):
+        from PIL import Image
+
+        return Image.open(io.BytesIO(image_data)).convert("RGB")
+
+
+_backends: Dict[str, InferenceBackend] = {}
+
+
+def get_inference_backend(name: Optional[str] = None) -> InferenceBackend:
+    """Return the process-wide backend selected by ``ML_BACKEND``."""
+    name = name or settings.ML_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        if name == "local":
+            backend = LocalTransformersBackend()
+        elif name == "api":
+            backend = HuggingFaceAPIBackend()
+        else:
+            raise ValueError(f"Unknown ML backend: {name}")
+        _backends[name] = backend
+    return backend
@@ -0,0 +1,132 @@
+"""
+Micro-batching of concurrent single-item inference calls.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``submit`` calls into batched ``process_batch`` calls.
+
+    Items are collected until either ``max_batch_size`` is reached or
+    ``max_wait`` seconds have passed since the first pending item, then sent
+    as one batch. Each caller receives the result at its own position in the
+    batch; if the batch fails, every caller in it receives the exception.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # In-flight batches; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pending work from a previous (now closed) loop can never finish
+            self._pending = []
+            self._timer = None
+            self._tasks = set()
+            self._loop = loop
+
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Dispatch up to ``max_batch_size`` pending items as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if batch:
+            task = self._loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._pending:
+            self._timer = self._loop.call_later(self.max_wait, self._flush)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch returned {len(results)} results for {len(batch)} inputs"
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(batch)} items: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self, timeout: Optional[float] = None):
+        """Dispatch pending items and wait for in-flight batches.
+
+        Batches still running after ``timeout`` seconds are cancelled, and
+        so are their callers.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            return
+        while self._pending:
+            self._flush()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        tasks = set(self._tasks)
+        if not tasks:
+            return
+        _, running = await asyncio.wait(tasks, timeout=timeout)
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Batch counters for monitoring."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "pending": len(self._pending),
+            "in_flight": len(self._tasks),
+        }
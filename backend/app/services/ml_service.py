@@ -1,24 +1,99 @@
-import httpx
 import asyncio
 import time
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional
-from PIL import Image
-import io
+from sqlalchemy import literal_column
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.schemas.schemas import MLAnalysisRequest, MLAnalysisResponse
+from app.db.database import SessionLocal
+from app.models.models import Report, Media, MLArtifact, IssueLabel
+from app.schemas.schemas import IssueType, MLAnalysisRequest, MLAnalysisResponse
+from app.services.heatmap_tiles import heatmap_tiles
+from app.services.image_processing import ImageDecodeError, ProcessedImage, image_processor
+from app.services.media_cache import media_cache
+from app.services.ml_backends import InferenceBackend, InferenceError, get_inference_backend
+from app.services.ml_batching import MicroBatcher
+from app.services.result_cache import content_hash, ml_result_cache
+from app.services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
+# Zero-shot candidate labels -> stored IssueType values
+ISSUE_LABEL_TYPES = {
+    "pothole": IssueType.POTHOLE,
+    "flooding": IssueType.FLOODING,
+    "graffiti": IssueType.GRAFFITI,
+    "broken streetlight": IssueType.BROKEN_LIGHT,
+    "trash overflow": IssueType.TRASH,
+    "traffic accident": IssueType.TRAFFIC_ACCIDENT,
+    "downed power line": IssueType.DOWNED_WIRE,
+    "damaged road sign": IssueType.DAMAGED_SIGN,
+    "debris": IssueType.DEBRIS,
+    "vandalism": IssueType.VANDALISM,
+    "other": IssueType.OTHER,
+}
+
+# Base severity (0-10) per issue type, before confidence weighting
+ISSUE_SEVERITY = {
+    IssueType.DOWNED_WIRE.value: 9.5,
+    IssueType.TRAFFIC_ACCIDENT.value: 8.5,
+    IssueType.FLOODING.value: 7.5,
+    IssueType.POTHOLE.value: 6.0,
+    IssueType.BROKEN_LIGHT.value: 5.5,
+    IssueType.DAMAGED_SIGN.value: 5.0,
+    IssueType.DEBRIS.value: 4.5,
+    IssueType.TRASH.value: 3.5,
+    IssueType.VANDALISM.value: 3.0,
+    IssueType.GRAFFITI.value: 2.0,
+    IssueType.OTHER.value: 2.0,
+}
+
+# Latest model status per backend, refreshed in the background
+_model_status_snapshots: Dict[str, Dict[str, Any]] = {}
+
+# One zero-shot batcher per (backend, model, label set), shared by every
+# MLService instance in the process so concurrent requests coalesce.
+_zero_shot_batchers: Dict[tuple, MicroBatcher] = {}
+
+
+async def close_zero_shot_batchers(timeout: Optional[float] = None):
+    """Finish (or after ``timeout``, cancel) the batches still in flight."""
+    await asyncio.gather(*(batcher.close(timeout) for batcher in _zero_shot_batchers.values()))
+
+
+class MLAnalysisError(Exception):
+    """Raised when one or more pipelines failed for a report; the report is marked FAILED."""
+
+
+def _get_zero_shot_batcher(
+    backend: InferenceBackend, model_id: str, labels: List[str]
+) -> MicroBatcher:
+    key = (backend.name, model_id, tuple(labels))
+    batcher = _zero_shot_batchers.get(key)
+    if batcher is None:
+        batcher = MicroBatcher(
+            lambda texts: backend.zero_shot_batch(model_id, texts, list(labels)),
+            max_batch_size=settings.BATCH_SIZE,
+            max_wait=settings.ML_BATCH_MAX_WAIT_MS / 1000
+        )
+        _zero_shot_batchers[key] = batcher
+    return batcher
+
 
 class MLService:
     """Service for handling machine learning operations using Hugging Face models."""
     
-    def __init__(self):
-        self.api_url = settings.HUGGINGFACE_API_URL
-        self.api_token = settings.HUGGINGFACE_API_TOKEN
+    IMAGE_PIPELINES = ("image_caption", "object_detection", "vqa")
+    
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = get_inference_backend(backend)
         self.confidence_threshold = settings.ML_CONFIDENCE_THRESHOLD
+        self.pipeline_timeout = settings.ML_PIPELINE_TIMEOUT
+        self.media_cache = media_cache
+        self.result_cache = ml_result_cache
+        self._images: Dict[str, asyncio.Future] = {}
         
         # Model configurations
         self.models = {
@@ -30,6 +105,14 @@ class MLService:
             "sentiment": "cardiffnlp/twitter-roberta-base-sentiment-latest"
         }
         
+        # Largest side (px) worth sending to each image model, where smaller
+        # than the shared model variant; the models resize to roughly this
+        # resolution internally anyway.
+        self.model_input_sizes = {
+            "image_caption": 384,
+            "vqa": 640
+        }
+        
         # Issue classification labels
         self.issue_labels = [
             "pothole", "flooding", "graffiti", "broken streetlight",
@@ -37,226 +120,493 @@ class MLService:
             "damaged road sign", "debris", "vandalism", "other"
         ]
     
-    async def analyze_report(self, report_id: str):
-        """Analyze a complete report with text and media."""
-        # This would fetch the report from database and run analysis
-        # Implementation depends on database integration
-        pass
+    async def analyze_report(self, report_id: str, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+        """Analyze a complete report with text and media.
+        
+        Stages: load the report and its media, run the text and per-image
+        pipelines concurrently, then write artifacts, issue labels and scores
+        in a single transaction. Returns a summary with per-stage timings, or
+        None if the report does not exist.
+        
+        If any pipeline fails, nothing is written except ``status = "FAILED"``
+        and MLAnalysisError is raised so the caller (the Celery task) can
+        retry; successful pipeline outputs are cached, so a retry only
+        repeats the failed ones.
+        
+        Database work runs in worker threads, so analyses sharing an event
+        loop (see ``process_reports_ml_batch``) overlap their queries with
+        each other's inference instead of blocking the loop.
+        """
+        owns_session = db is None
+        db = db or SessionLocal()
+        timings = {}
+        
+        try:
+            # Stage 1: load report and media rows
+            stage_start = time.perf_counter()
+            loaded = await asyncio.to_thread(self._load_report_inputs, db, report_id)
+            if loaded is None:
+                logger.warning(f"Report {report_id} not found for analysis")
+                return None
+            report, text, image_urls = loaded
+            timings["load_ms"] = _elapsed_ms(stage_start)
+            
+            # Stage 2: text and image pipelines, all concurrently
+            stage_start = time.perf_counter()
+            analyses = await asyncio.gather(
+                self.analyze_content(MLAnalysisRequest(
+                    text=text or None, pipelines=["text_classification"]
+                )),
+                *(
+                    self.analyze_content(MLAnalysisRequest(
+                        media_url=url, pipelines=list(self.IMAGE_PIPELINES)
+                    ))
+                    for url in image_urls.values()
+                )
+            )
+            text_analysis, image_analyses = analyses[0], dict(zip(image_urls, analyses[1:]))
+            failed = text_analysis.failed_pipelines + [
+                pipeline for analysis in image_analyses.values() for pipeline in analysis.failed_pipelines
+            ]
+            
+            classification = text_analysis.text_classification
+            if classification is None and not failed:
+                # No usable report text: classify what the images show instead
+                captions = [a.image_caption for a in image_analyses.values() if a.image_caption]
+                if captions:
+                    classification = await self._run_pipeline(
+                        "text_classification", self._classify_text(". ".join(captions))
+                    )
+                    if classification is None:
+                        failed.append("text_classification")
+            timings["inference_ms"] = _elapsed_ms(stage_start)
+            
+            if failed:
+                await asyncio.to_thread(self._set_status, db, report, "FAILED")
+                raise MLAnalysisError(f"Analysis of report {report_id} failed in: {', '.join(sorted(set(failed)))}")
+            
+            # Stage 3: persist everything in one transaction
+            stage_start = time.perf_counter()
+            artifacts, labels = self._build_report_rows(
+                report_id, classification, text_analysis, image_analyses
+            )
+            primary = next((label for label in labels if label.is_primary), None)
+            # Read before the commit, which expires the new rows
+            primary_issue = primary.label if primary else None
+            confidence_score = primary.confidence if primary else None
+            severity_score = self._severity_score(primary) if primary else None
+            await asyncio.to_thread(
+                self._persist_analysis, db, report, artifacts, labels, confidence_score, severity_score
+            )
+            timings["persist_ms"] = _elapsed_ms(stage_start)
+            
+            summary = {
+                "report_id": report_id,
+                "primary_issue": primary_issue,
+                "severity_score": severity_score,
+                "confidence_score": confidence_score,
+                "artifacts": len(artifacts),
+                "labels": len(labels),
+                "timings": timings
+            }
+            logger.info(f"Analyzed report {report_id}: {summary}")
+            return summary
+        
+        except Exception:
+            await asyncio.to_thread(db.rollback)
+            raise
+        finally:
+            if owns_session:
+                await asyncio.to_thread(db.close)
+    
+    @staticmethod
+    def _load_report_inputs(db: Session, report_id: str) -> Optional[tuple]:
+        """The report, its text and presigned URLs of its images (None if it does not exist)."""
+        report = db.query(Report).filter(Report.id == report_id).first()
+        if not report:
+            return None
+        images = db.query(Media, literal_column("media.has_variants")).filter(
+            Media.report_id == report_id,
+            Media.media_type == "image"
+        ).all()
+        text = " ".join(part for part in (report.title, report.description) if part)
+        image_urls = {}
+        if images:
+            # The model variant where one was stored, else the original
+            storage_service = StorageService()
+            image_urls = {
+                media.id: storage_service.get_presigned_url(
+                    StorageService.variant_key(media.s3_key, "model") if has_variants else media.s3_key
+                )
+                for media, has_variants in images
+            }
+        return report, text, image_urls
+    
+    @staticmethod
+    def _set_status(db: Session, report: Report, status: str):
+        report.status = status
+        db.commit()
+    
+    @staticmethod
+    def _persist_analysis(
+        db: Session,
+        report: Report,
+        artifacts: List[MLArtifact],
+        labels: List[IssueLabel],
+        confidence_score: Optional[float],
+        severity_score: Optional[float]
+    ):
+        """Replace the report's artifacts and labels and store its scores, in one transaction."""
+        def replace_rows():
+            db.query(MLArtifact).filter(MLArtifact.report_id == report.id).delete(
+                synchronize_session=False
+            )
+            db.query(IssueLabel).filter(IssueLabel.report_id == report.id).delete(
+                synchronize_session=False
+            )
+            db.add_all(artifacts + labels)
+        
+        # Moves the report's heatmap counts from its old primary label to the new one
+        tile_deltas = heatmap_tiles.move(db, [report.id], replace_rows)
+        report.confidence_score = confidence_score
+        report.severity_score = severity_score
+        report.status = "PROCESSED"
+        report.processed_at = datetime.utcnow()
+        db.commit()
+        heatmap_tiles.commit(db, tile_deltas)
+    
+    def _build_report_rows(
+        self,
+        report_id: str,
+        classification: Optional[Dict[str, Any]],
+        text_analysis: MLAnalysisResponse,
+        image_analyses: Dict[str, MLAnalysisResponse]
+    ) -> tuple:
+        """Build MLArtifact and IssueLabel rows from pipeline outputs."""
+        artifacts = []
+        labels = []
+        
+        if classification:
+            artifacts.append(MLArtifact(
+                report_id=report_id,
+                artifact_type="text_classification",
+                payload=classification,
+                model_name=self.models["zero_shot"],
+                confidence=classification.get("confidence"),
+                processing_time_ms=text_analysis.processing_time_ms
+            ))
+            
+            scores = classification.get("all_labels") or {
+                classification["label"]: classification.get("confidence", 0.0)
+            }
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            for rank, (label, score) in enumerate(ranked):
+                if score < settings.ML_LABEL_MIN_CONFIDENCE:
+                    continue
+                labels.append(IssueLabel(
+                    report_id=report_id,
+                    label=ISSUE_LABEL_TYPES.get(label, IssueType.OTHER).value,
+                    source="ml",
+                    confidence=score,
+                    is_primary=rank == 0
+                ))
+        
+        for media_id, analysis in image_analyses.items():
+            outputs = {
+                "image_caption": analysis.image_caption,
+                "object_detection": analysis.object_detection,
+                "vqa": analysis.vqa_results
+            }
+            for pipeline, output in outputs.items():
+                if output is None:
+                    continue
+                artifacts.append(MLArtifact(
+                    report_id=report_id,
+                    artifact_type=pipeline,
+                    payload={"media_id": media_id, "result": output},
+                    model_name=self.models[pipeline],
+                    confidence=analysis.confidence_scores.get(pipeline),
+                    processing_time_ms=analysis.processing_time_ms
+                ))
+        
+        return artifacts, labels
+    
+    @staticmethod
+    def _severity_score(label: IssueLabel) -> float:
+        """0-10 severity: issue-type weight, discounted by label confidence."""
+        base = ISSUE_SEVERITY.get(label.label, ISSUE_SEVERITY[IssueType.OTHER.value])
+        return round(base * (0.5 + 0.5 * (label.confidence or 0.0)), 1)
     
     async def analyze_content(self, request: MLAnalysisRequest) -> MLAnalysisResponse:
-        """Analyze provided content based on requested pipelines."""
+        """Analyze provided content based on requested pipelines.
+
+        Independent pipelines run concurrently, each under its own timeout, so
+        total latency tracks the slowest model rather than the sum of all of
+        them. A failing pipeline is dropped from the response and listed in
+        ``failed_pipelines`` instead of discarding the results of the others.
+        An image that cannot be decoded is skipped like a missing one, since
+        retrying would not help.
+        """
         start_time = time.time()
         results = {}
         confidence_scores = {}
+        failed_pipelines = []
         
-        try:
-            # Run requested ML pipelines
-            for pipeline in request.pipelines:
-                if pipeline == "text_classification" and request.text:
-                    result = await self._classify_text(request.text)
-                    results["text_classification"] = result
-                    confidence_scores["text_classification"] = result.get("confidence", 0)
-                
-                elif pipeline == "image_caption" and request.media_url:
-                    caption = await self._generate_image_caption(request.media_url)
-                    results["image_caption"] = caption
-                    confidence_scores["image_caption"] = 0.8  # Default confidence
-                
-                elif pipeline == "object_detection" and request.media_url:
-                    detections = await self._detect_objects(request.media_url)
-                    results["object_detection"] = detections
-                    confidence_scores["object_detection"] = max(
-                        [d.get("confidence", 0) for d in detections], default=0
-                    )
-                
-                elif pipeline == "vqa" and request.media_url:
-                    vqa_results = await self._visual_question_answering(
-                        request.media_url, request.text or "What issue is shown in this image?"
-                    )
-                    results["vqa_results"] = vqa_results
-                    confidence_scores["vqa"] = vqa_results.get("confidence", 0)
+        media_url = request.media_url
+        if media_url and set(request.pipelines) & set(self.IMAGE_PIPELINES):
+            try:
+                await asyncio.wait_for(self._load_image(media_url), timeout=self.pipeline_timeout)
+            except ImageDecodeError as e:
+                logger.warning(f"Skipping image pipelines for undecodable media: {e}")
+                media_url = None
+            except Exception:
+                pass  # reported by each image pipeline
         
-        except Exception as e:
-            logger.error(f"Error in ML analysis: {e}")
-            # Return partial results if some pipelines succeeded
+        # Schedule requested ML pipelines
+        pipelines = {}
+        for pipeline in request.pipelines:
+            if pipeline == "text_classification" and request.text:
+                pipelines[pipeline] = self._classify_text(request.text)
+            
+            elif pipeline == "image_caption" and media_url:
+                pipelines[pipeline] = self._generate_image_caption(media_url)
+            
+            elif pipeline == "object_detection" and media_url:
+                pipelines[pipeline] = self._detect_objects(media_url)
+            
+            elif pipeline == "vqa" and media_url:
+                pipelines[pipeline] = self._visual_question_answering(
+                    media_url, request.text or "What issue is shown in this image?"
+                )
+        
+        outcomes = await asyncio.gather(
+            *(self._run_pipeline(name, coro) for name, coro in pipelines.items())
+        )
+        # Preprocessed images are only shared within one analysis
+        if request.media_url:
+            self._images.pop(request.media_url, None)
+        
+        for pipeline, result in zip(pipelines, outcomes):
+            if result is None:
+                failed_pipelines.append(pipeline)
+                continue
+            
+            if pipeline == "text_classification":
+                results["text_classification"] = result
+                confidence_scores["text_classification"] = result.get("confidence", 0)
+            
+            elif pipeline == "image_caption":
+                results["image_caption"] = result
+                confidence_scores["image_caption"] = 0.8  # Default confidence
+            
+            elif pipeline == "object_detection":
+                results["object_detection"] = result
+                confidence_scores["object_detection"] = max(
+                    [d.get("confidence", 0) for d in result], default=0
+                )
+            
+            elif pipeline == "vqa":
+                results["vqa_results"] = result
+                confidence_scores["vqa"] = result.get("confidence", 0)
         
         processing_time = int((time.time() - start_time) * 1000)
         
         return MLAnalysisResponse(
             **results,
+            failed_pipelines=failed_pipelines,
             processing_time_ms=processing_time,
             confidence_scores=confidence_scores
         )
     
-    async def _classify_text(self, text: str) -> Dict[str, Any]:
-        """Classify text using zero-shot classification."""
+    async def _run_pipeline(self, name: str, coro) -> Optional[Any]:
+        """Run a single pipeline under the per-pipeline timeout."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/{self.models['zero_shot']}",
-                    headers={"Authorization": f"Bearer {self.api_token}"},
-                    json={
-                        "inputs": text,
-                        "parameters": {
-                            "candidate_labels": self.issue_labels
-                        }
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Find best label above confidence threshold
-                    best_score = max(result["scores"])
-                    best_label = result["labels"][result["scores"].index(best_score)]
-                    
-                    return {
-                        "label": best_label,
-                        "confidence": best_score,
-                        "all_labels": dict(zip(result["labels"], result["scores"]))
-                    }
-                else:
-                    logger.error(f"Text classification API error: {response.status_code}")
-                    return {"label": "other", "confidence": 0.0}
-        
+            return await asyncio.wait_for(coro, timeout=self.pipeline_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"ML pipeline '{name}' timed out after {self.pipeline_timeout}s")
         except Exception as e:
-            logger.error(f"Text classification error: {e}")
-            return {"label": "other", "confidence": 0.0}
+            logger.error(f"Error in ML pipeline '{name}': {e}")
+        return None
+    
+    async def _classify_text(self, text: str) -> Dict[str, Any]:
+        """Classify text using zero-shot classification; backend errors propagate."""
+        model_id = self.models['zero_shot']
+        key = self.result_cache.make_key(
+            "zero_shot", [self.backend.name, model_id, self.issue_labels], content_hash(text)
+        )
+        result = await self.result_cache.get_or_compute(
+            key, lambda: self._zero_shot(model_id, text)
+        )
+        
+        # Find best label above confidence threshold
+        best_score = max(result["scores"])
+        best_label = result["labels"][result["scores"].index(best_score)]
+        
+        return {
+            "label": best_label,
+            "confidence": best_score,
+            "all_labels": dict(zip(result["labels"], result["scores"]))
+        }
+    
+    async def _zero_shot(self, model_id: str, text: str) -> Dict[str, Any]:
+        """Run zero-shot classification, micro-batched when enabled."""
+        if settings.ML_BATCHING_ENABLED:
+            batcher = _get_zero_shot_batcher(self.backend, model_id, self.issue_labels)
+            return await batcher.submit(text)
+        return await self.backend.zero_shot(model_id, text, self.issue_labels)
     
     async def _generate_image_caption(self, image_url: str) -> str:
-        """Generate caption for image."""
-        try:
-            # Download image
-            async with httpx.AsyncClient() as client:
-                image_response = await client.get(image_url, timeout=30.0)
-                image_data = image_response.content
-                
-                # Call caption model
-                response = await client.post(
-                    f"{self.api_url}/{self.models['image_caption']}",
-                    headers={"Authorization": f"Bearer {self.api_token}"},
-                    data=image_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result[0]["generated_text"] if result else "Unable to generate caption"
-                else:
-                    logger.error(f"Image caption API error: {response.status_code}")
-                    return "Caption generation failed"
+        """Generate caption for image; backend errors propagate."""
+        # Download and preprocess once (shared with other pipelines)
+        image = await self._load_image(image_url)
         
-        except Exception as e:
-            logger.error(f"Image captioning error: {e}")
-            return "Caption generation failed"
+        # Call caption model
+        model_id = self.models['image_caption']
+        result = await self.result_cache.get_or_compute(
+            self.result_cache.make_key(
+                "image_caption", [self.backend.name, model_id], image.digest
+            ),
+            lambda: self._infer_resized(
+                self.backend.image_to_text, model_id, image, "image_caption"
+            )
+        )
+        if not result or not result[0].get("generated_text"):
+            raise InferenceError(f"Model {model_id} returned no caption")
+        return result[0]["generated_text"]
     
     async def _detect_objects(self, image_url: str) -> List[Dict[str, Any]]:
-        """Detect objects in image."""
-        try:
-            async with httpx.AsyncClient() as client:
-                # Download image
-                image_response = await client.get(image_url, timeout=30.0)
-                image_data = image_response.content
-                
-                # Call object detection model
-                response = await client.post(
-                    f"{self.api_url}/{self.models['object_detection']}",
-                    headers={"Authorization": f"Bearer {self.api_token}"},
-                    data=image_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    detections = response.json()
-                    
-                    # Filter detections by confidence threshold
-                    filtered_detections = [
-                        {
-                            "label": det["label"],
-                            "confidence": det["score"],
-                            "bbox": det["box"]  # {xmin, ymin, xmax, ymax}
-                        }
-                        for det in detections
-                        if det["score"] >= self.confidence_threshold
-                    ]
-                    
-                    return filtered_detections
-                else:
-                    logger.error(f"Object detection API error: {response.status_code}")
-                    return []
+        """Detect objects in image; backend errors propagate."""
+        # Download and preprocess once (shared with other pipelines)
+        image = await self._load_image(image_url)
         
-        except Exception as e:
-            logger.error(f"Object detection error: {e}")
-            return []
+        # Call object detection model
+        model_id = self.models['object_detection']
+        detections = await self.result_cache.get_or_compute(
+            self.result_cache.make_key(
+                "object_detection", [self.backend.name, model_id], image.digest
+            ),
+            lambda: self.backend.object_detection(model_id, image.model_data)
+        )
+        
+        # Filter detections by confidence threshold
+        filtered_detections = [
+            {
+                "label": det["label"],
+                "confidence": det["score"],
+                # {xmin, ymin, xmax, ymax}, mapped back to original pixels
+                "bbox": self._scale_box(det["box"], image.model_scale)
+            }
+            for det in detections
+            if det["score"] >= self.confidence_threshold
+        ]
+        
+        return filtered_detections
     
     async def _visual_question_answering(self, image_url: str, question: str) -> Dict[str, Any]:
-        """Answer questions about image content."""
-        try:
-            async with httpx.AsyncClient() as client:
-                # Download image
-                image_response = await client.get(image_url, timeout=30.0)
-                image_data = image_response.content
-                
-                # Call VQA model
-                response = await client.post(
-                    f"{self.api_url}/{self.models['vqa']}",
-                    headers={"Authorization": f"Bearer {self.api_token}"},
-                    json={
-                        "inputs": {
-                            "question": question,
-                            "image": image_data.hex()  # Convert to hex for JSON
-                        }
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "answer": result[0]["answer"],
-                        "confidence": result[0]["score"]
-                    }
-                else:
-                    logger.error(f"VQA API error: {response.status_code}")
-                    return {"answer": "Unknown", "confidence": 0.0}
+        """Answer questions about image content; backend errors propagate."""
+        # Download and preprocess once (shared with other pipelines)
+        image = await self._load_image(image_url)
         
-        except Exception as e:
-            logger.error(f"VQA error: {e}")
-            return {"answer": "Unknown", "confidence": 0.0}
+        # Call VQA model
+        model_id = self.models['vqa']
+        result = await self.result_cache.get_or_compute(
+            self.result_cache.make_key(
+                "vqa", [self.backend.name, model_id],
+                f"{image.digest}:{content_hash(question)}"
+            ),
+            lambda: self._infer_resized(
+                self.backend.visual_question_answering, model_id, image, "vqa", question
+            )
+        )
+        if not result:
+            raise InferenceError(f"Model {model_id} returned no answer")
+        return {
+            "answer": result[0]["answer"],
+            "confidence": result[0]["score"]
+        }
+    
+    async def _load_image(self, image_url: str) -> ProcessedImage:
+        """Fetch and preprocess ``image_url`` at most once per analysis."""
+        task = self._images.get(image_url)
+        if task is None:
+            async def load() -> ProcessedImage:
+                image_data = await self.media_cache.fetch(image_url)
+                return await image_processor.process(image_data)
+            
+            task = asyncio.ensure_future(load())
+            self._images[image_url] = task
+        return await asyncio.shield(task)
+    
+    async def _infer_resized(self, infer, model_id: str, image: ProcessedImage, pipeline: str, *args):
+        """Run ``infer`` on the model variant, shrunk further if the model wants less."""
+        image_data = image.model_data
+        max_side = self.model_input_sizes.get(pipeline)
+        if max_side and max(image.model_width, image.model_height) > max_side:
+            image_data = await image_processor.resize(image_data, max_side)
+        return await infer(model_id, image_data, *args)
     
-    async def get_model_status(self) -> Dict[str, Any]:
-        """Get status of all ML models."""
-        model_status = {}
+    @staticmethod
+    def _scale_box(box: Dict[str, Any], scale: float) -> Dict[str, Any]:
+        """Map a detection box from model-variant to original pixel coordinates."""
+        if scale == 1.0:
+            return box
+        return {key: round(value * scale) for key, value in box.items()}
+    
+    def batching_stats(self) -> Dict[str, Any]:
+        """Per-model micro-batching counters."""
+        return {
+            model_id: batcher.stats()
+            for (backend, model_id, _), batcher in _zero_shot_batchers.items()
+            if backend == self.backend.name
+        }
+    
+    async def get_model_status(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get status of all ML models.
         
-        for name, model_id in self.models.items():
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"{self.api_url}/{model_id}",
-                        headers={"Authorization": f"Bearer {self.api_token}"},
-                        timeout=10.0
-                    )
-                    
-                    if response.status_code == 200:
-                        model_status[name] = {
-                            "status": "available",
-                            "model_id": model_id
-                        }
-                    else:
-                        model_status[name] = {
-                            "status": "unavailable",
-                            "model_id": model_id
-                        }
-            except Exception as e:
-                model_status[name] = {
-                    "status": "error",
-                    "model_id": model_id,
-                    "error": str(e)
-                }
+        Serves the cached snapshot kept warm by the background refresher;
+        ``refresh`` (or a missing/expired snapshot) forces a live probe.
+        """
+        snapshot = _model_status_snapshots.get(self.backend.name)
+        if refresh or snapshot is None or snapshot["expires_at"] < time.monotonic():
+            return await self.refresh_model_status()
+        return snapshot["status"]
+    
+    async def refresh_model_status(self) -> Dict[str, Any]:
+        """Probe every configured model concurrently and store the snapshot."""
+        # Several pipelines share a model; probe each model id once
+        model_ids = sorted(set(self.models.values()))
+        probes = await asyncio.gather(*(self._probe_model(model_id) for model_id in model_ids))
+        by_model = dict(zip(model_ids, probes))
         
+        model_status = {
+            name: {**by_model[model_id], "model_id": model_id, "backend": self.backend.name}
+            for name, model_id in self.models.items()
+        }
+        _model_status_snapshots[self.backend.name] = {
+            "status": model_status,
+            "expires_at": time.monotonic() + settings.ML_STATUS_MAX_AGE
+        }
         return model_status
     
+    async def _probe_model(self, model_id: str) -> Dict[str, Any]:
+        """Probe one model, recording when it was checked and how long it took."""
+        checked_at = datetime.utcnow().isoformat()
+        start_time = time.perf_counter()
+        try:
+            probe = await asyncio.wait_for(
+                self.backend.probe(model_id), timeout=settings.ML_STATUS_PROBE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            probe = {"status": "error", "error": "probe timed out"}
+        except Exception as e:
+            probe = {"status": "error", "error": str(e)}
+        
+        return {
+            **probe,
+            "checked_at": checked_at,
+            "latency_ms": int((time.perf_counter() - start_time) * 1000)
+        }
+    
     async def test_model(self, model_name: str, test_data: Dict[str, Any]) -> Dict[str, Any]:
         """Test a specific model with provided data."""
         if model_name not in self.models:
@@ -273,3 +623,19 @@ class MLService:
             
         except Exception as e:
             return {"error": str(e)}
+
+
+def _elapsed_ms(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+
+async def run_model_status_refresher(interval: Optional[float] = None):
+    """Keep the model status snapshot warm; runs until cancelled."""
+    interval = interval or settings.ML_STATUS_REFRESH_INTERVAL
+    ml_service = MLService()
+    while True:
+        try:
+            await ml_service.refresh_model_status()
+        except Exception as e:
+            logger.error(f"Model status refresh failed: {e}")
+        await asyncio.sleep(interval)
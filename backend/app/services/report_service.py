@@ -1,27 +1,111 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import (
+    func, tuple_, case, literal_column, table, column, insert, update, values, bindparam, cast,
+    String, DateTime, Integer, Boolean
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
+import base64
+import json
 import logging
 import asyncio
+import uuid
 
+from app.core.config import settings
+from app.db.database import AnySession, run_in_session, sync_view
 from app.models.models import Report, Media, MLArtifact, IssueLabel
-from app.schemas.schemas import ReportCreate, ReportResponse, ReportQuery, PaginatedResponse
+from app.schemas.schemas import (
+    ReportCreate, ReportResponse, ReportQuery, PaginatedResponse, MediaResponse, CountMode, ReportSort,
+    MLArtifactResponse, IssueLabelResponse, LocationResponse
+)
 from app.services.ml_service import MLService
 from app.services.storage_service import StorageService
-from app.services.geocoding_service import GeocodingService
+from app.services.geocoding_service import GeocodingService, normalize_address
+from app.services.heatmap_tiles import heatmap_tiles
+from app.services.image_processing import ImageDecodeError, image_processor
+from app.services.spatial_index import (
+    BBox, parse_bbox, parse_point, point_coordinates, report_locations
+)
+from app.services.search_index import SEARCH_CONFIG, build_tsquery, report_search_index
 
 logger = logging.getLogger(__name__)
 
+# Insert-only view of the reports table for bulk ingestion; includes
+# external_id, which is only written by connectors.
+_reports_insert_table = table(
+    "reports",
+    column("id", String),
+    column("title", String),
+    column("description", String),
+    column("user_id", String),
+    column("source", String),
+    column("address", String),
+    column("status", String),
+    column("geometry", String),
+    column("external_id", String),
+    column("created_at", DateTime)
+)
+
+# Media rows as written on upload; includes has_variants, which is FALSE
+# for images stored without thumbnail/model variants.
+_media_insert_table = table(
+    "media",
+    column("id", String),
+    column("report_id", String),
+    column("s3_key", String),
+    column("media_type", String),
+    column("file_size", Integer),
+    column("mime_type", String),
+    column("has_variants", Boolean)
+)
+
+
+def _from_wgs84(geometry):
+    """``geometry`` (SRID 4326, as parsed from input coordinates) in the SRID of reports.geometry."""
+    if settings.SPATIAL_SRID != 4326:
+        return func.ST_Transform(geometry, settings.SPATIAL_SRID)
+    return geometry
+
+
+def _encode_cursor(report: Report) -> str:
+    """Opaque keyset cursor pointing just past ``report``."""
+    payload = json.dumps({"c": report.created_at.isoformat(), "i": str(report.id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(payload["c"]), payload["i"]
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
 
 class ReportService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: AnySession):
+        # Queries are built against the sync view of ``db`` and executed
+        # through ``_run``, so the same code serves Session and AsyncSession.
+        self.session = db
+        self.db = sync_view(db)
         self.ml_service = MLService()
         self.storage_service = StorageService()
         self.geocoding_service = GeocodingService()
+        self.image_processor = image_processor
     
-    async def create_report(self, report_data: ReportCreate, media_files: List = None) -> Report:
-        """Create a new report with optional media files."""
+    async def create_report(
+        self, report_data: ReportCreate, media_files: List = None, defer_geocoding: Optional[bool] = None
+    ) -> Report:
+        """Create a new report with optional media files.
+        
+        With ``defer_geocoding`` (default ``GEOCODE_DEFERRED``) an address-only
+        report is stored without geometry; the caller queues it for
+        ``geocode_pending_reports``.
+        """
+        if defer_geocoding is None:
+            defer_geocoding = settings.GEOCODE_DEFERRED
         try:
             # Create report record
             report = Report(
@@ -33,17 +117,30 @@ class ReportService:
             )
             
             # Handle geolocation
+            location = None
             if report_data.lat and report_data.lon:
-                report.geometry = f"POINT({report_data.lon} {report_data.lat})"
-            elif report_data.address:
+                location = (report_data.lon, report_data.lat)
+            elif report_data.address and not defer_geocoding:
                 # Geocode address
                 coords = await self.geocoding_service.geocode_address(report_data.address)
                 if coords:
-                    report.geometry = f"POINT({coords['lon']} {coords['lat']})"
+                    location = (coords["lon"], coords["lat"])
+            if location:
+                report.geometry = self._wgs84_point(*location)
             
-            self.db.add(report)
-            self.db.commit()
-            self.db.refresh(report)
+            def save():
+                self.db.add(report)
+                self.db.flush()
+                tile_deltas = heatmap_tiles.deltas(self.db, [report.id])
+                self.db.commit()
+                heatmap_tiles.commit(self.db, tile_deltas)
+                self.db.refresh(report)
+            await self._run(save)
+            
+            if report_locations.loaded and location:
+                report_locations.insert(report.id, *location)
+            if report_search_index.loaded:
+                report_search_index.add(report.id, report.title, report.description)
             
             # Process media files if provided
             if media_files:
@@ -53,39 +150,359 @@ class ReportService:
             return report
             
         except Exception as e:
-            self.db.rollback()
+            await self._run(self.db.rollback)
             logger.error(f"Error creating report: {e}")
             raise
     
+    def _wgs84_point(self, lon: float, lat: float):
+        """Value for reports.geometry of the WGS84 point (lon, lat), stored in SPATIAL_SRID."""
+        ewkt = f"SRID=4326;POINT({lon} {lat})"
+        if self._is_postgres():
+            return _from_wgs84(func.ST_GeomFromEWKT(ewkt))
+        return ewkt
+    
+    async def _run(self, fn, *args):
+        """Run sync ORM code ``fn(*args)`` on this service's session."""
+        return await run_in_session(self.session, lambda _session: fn(*args))
+    
+    async def bulk_create_reports(
+        self, items: List[ReportCreate], defer_geocoding: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Insert many reports with batched multi-row INSERTs.
+        
+        Records whose (source, external_id) already exists, in the database
+        or earlier in ``items``, are skipped. Returns the new report ids, the
+        number of duplicates and, with ``defer_geocoding``, the ids of
+        address-only reports stored without geometry.
+        """
+        if defer_geocoding is None:
+            defer_geocoding = settings.GEOCODE_DEFERRED
+        now = datetime.utcnow()
+        seen = set()
+        rows = []
+        pending_addresses: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            if item.external_id is not None:
+                key = (item.source.value, item.external_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "title": item.title,
+                "description": item.description,
+                "user_id": item.user_id,
+                "source": item.source.value,
+                "address": item.address,
+                "status": "PENDING",
+                "geometry": None,
+                "external_id": item.external_id,
+                "created_at": now
+            })
+            if item.lat is not None and item.lon is not None:
+                rows[-1]["geometry"] = f"SRID=4326;POINT({item.lon} {item.lat})"
+            elif item.address:
+                pending_addresses.setdefault(item.address.strip(), []).append(rows[-1])
+        
+        if not defer_geocoding:
+            await self._geocode_rows(pending_addresses)
+        
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(_reports_insert_table)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(_reports_insert_table)
+        else:
+            stmt = None
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=["source", "external_id"],
+                index_where=_reports_insert_table.c.external_id.isnot(None)
+            )
+        else:
+            stmt = insert(_reports_insert_table)
+        if dialect == "postgresql":
+            # Row geometries are WGS84 EWKT; store them in SPATIAL_SRID
+            stmt = stmt.values(
+                geometry=_from_wgs84(func.ST_GeomFromEWKT(bindparam("geometry_ewkt", type_=String)))
+            )
+        stmt = stmt.returning(_reports_insert_table.c.id)
+        
+        def insert_rows() -> List[str]:
+            ids = []
+            batch_size = settings.BULK_INSERT_BATCH_SIZE
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                if dialect == "postgresql":
+                    batch = [{**row, "geometry_ewkt": row["geometry"]} for row in batch]
+                # executemany with RETURNING: SQLAlchemy batches the rows
+                # into multi-VALUES statements
+                result = self.db.execute(stmt, batch)
+                ids.extend(str(report_id) for report_id in result.scalars().all())
+            tile_deltas = heatmap_tiles.deltas(self.db, ids)
+            self.db.commit()
+            heatmap_tiles.commit(self.db, tile_deltas)
+            return ids
+        
+        try:
+            inserted_ids = await self._run(insert_rows)
+        except Exception as e:
+            await self._run(self.db.rollback)
+            logger.error(f"Error bulk inserting reports: {e}")
+            raise
+        
+        inserted = set(inserted_ids)
+        for row in rows:
+            if row["id"] not in inserted:
+                continue
+            coords = point_coordinates(row["geometry"])
+            if report_locations.loaded and coords:
+                report_locations.insert(row["id"], *coords)
+            if report_search_index.loaded:
+                report_search_index.add(row["id"], row["title"], row["description"])
+        
+        geocode_pending = [
+            row["id"] for group in pending_addresses.values() for row in group
+            if row["id"] in inserted and row["geometry"] is None
+        ] if defer_geocoding else []
+        
+        logger.info(f"Bulk inserted {len(inserted_ids)} of {len(items)} reports")
+        return {
+            "report_ids": inserted_ids,
+            "duplicates": len(items) - len(inserted_ids),
+            "geocode_pending": geocode_pending
+        }
+    
+    async def geocode_pending_reports(self, report_ids: List[str]) -> Dict[str, int]:
+        """Backfill geometry for address-only reports stored without it.
+        
+        Each distinct address is geocoded once and the results are written
+        with batched UPDATEs. Reports that already have a geometry are left
+        alone; addresses that fail to resolve stay without one.
+        """
+        rows = await self._run(
+            self.db.query(Report.id, Report.address).filter(
+                Report.id.in_(report_ids),
+                Report.geometry.is_(None),
+                Report.address.isnot(None)
+            ).all
+        )
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        for report_id, address in rows:
+            if address.strip():
+                pending.setdefault(address.strip(), []).append({"id": str(report_id), "geometry": None})
+        
+        await self._geocode_rows(pending)
+        resolved = [row for group in pending.values() for row in group if row["geometry"]]
+        
+        try:
+            updated = await self._run(self._update_geometries, resolved) if resolved else 0
+        except Exception as e:
+            await self._run(self.db.rollback)
+            logger.error(f"Error backfilling report geometry: {e}")
+            raise
+        
+        for row in resolved:
+            coords = point_coordinates(row["geometry"])
+            if report_locations.loaded and coords:
+                report_locations.insert(row["id"], *coords)
+        
+        logger.info(f"Geocoded {updated} of {len(rows)} pending reports ({len(pending)} distinct addresses)")
+        return {"pending": len(rows), "addresses": len(pending), "geocoded": updated}
+    
+    def _update_geometries(self, rows: List[Dict[str, Any]]) -> int:
+        reports = Report.__table__
+        updated_ids: List[str] = []
+        batch_size = settings.BULK_INSERT_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if self.db.bind.dialect.name == "postgresql":
+                # One UPDATE ... FROM (VALUES ...) per batch; psycopg2 would
+                # otherwise send an executemany UPDATE row by row
+                data = values(column("id", String), column("geometry", String), name="geocoded").data(
+                    [(row["id"], row["geometry"]) for row in batch]
+                )
+                stmt = update(reports).where(
+                    reports.c.id == cast(data.c.id, reports.c.id.type),
+                    reports.c.geometry.is_(None)
+                ).values(geometry=_from_wgs84(func.ST_GeomFromEWKT(data.c.geometry))).returning(reports.c.id)
+                updated_ids.extend(str(report_id) for report_id in self.db.execute(stmt).scalars())
+            else:
+                pending = {
+                    str(report_id) for (report_id,) in self.db.query(Report.id).filter(
+                        Report.id.in_([row["id"] for row in batch]), Report.geometry.is_(None)
+                    )
+                }
+                batch = [row for row in batch if row["id"] in pending]
+                if not batch:
+                    continue
+                stmt = update(reports).where(
+                    reports.c.id == bindparam("report_id"),
+                    reports.c.geometry.is_(None)
+                ).values(geometry=bindparam("point"))
+                self.db.execute(stmt, [{"report_id": row["id"], "point": row["geometry"]} for row in batch])
+                updated_ids.extend(row["id"] for row in batch)
+        tile_deltas = heatmap_tiles.deltas(self.db, updated_ids)
+        self.db.commit()
+        heatmap_tiles.commit(self.db, tile_deltas)
+        return len(updated_ids)
+    
+    async def _geocode_rows(self, rows_by_address: Dict[str, List[Dict[str, Any]]]):
+        """Set row geometries by geocoding each distinct address once.
+        
+        Addresses are grouped by their normalized form and at most
+        ``GEOCODE_BATCH_CONCURRENCY`` lookups run at a time.
+        """
+        if not rows_by_address:
+            return
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        addresses: Dict[str, str] = {}
+        for address, rows in rows_by_address.items():
+            key = normalize_address(address)
+            addresses.setdefault(key, address)
+            groups.setdefault(key, []).extend(rows)
+        
+        semaphore = asyncio.Semaphore(settings.GEOCODE_BATCH_CONCURRENCY)
+        
+        async def geocode(address: str):
+            async with semaphore:
+                return await self.geocoding_service.geocode_address(address)
+        
+        keys = list(groups)
+        results = await asyncio.gather(*(geocode(addresses[key]) for key in keys))
+        for key, coords in zip(keys, results):
+            if coords:
+                for row in groups[key]:
+                    row["geometry"] = f"SRID=4326;POINT({coords['lon']} {coords['lat']})"
+    
     async def get_report(self, report_id: str) -> Optional[ReportResponse]:
-        """Get a report by ID with all related data."""
-        report = self.db.query(Report).filter(Report.id == report_id).first()
-        if not report:
+        """Get a report by ID with all related data.
+        
+        Related rows are loaded with one SELECT per relationship, so the
+        detail view costs four queries however much media it has.
+        """
+        loaded = await self._run(self._load_report, report_id)
+        if not loaded:
             return None
+        report, geometry, originals_only = loaded
         
-        return self._convert_to_response(report)
+        urls = await self.storage_service.get_presigned_urls(self._media_keys(report.media, originals_only))
+        return self._convert_to_response(report, urls, geometry)
+    
+    def _load_report(self, report_id: str):
+        """The report with its relationships loaded, its WGS84 geometry (None
+        if stored in 4326) and the ids of images stored without variants.
+        """
+        columns = [Report]
+        if self._is_postgres() and settings.SPATIAL_SRID != 4326:
+            # Responses carry WGS84 coordinates whatever the storage SRID
+            columns.append(func.ST_AsEWKT(func.ST_Transform(Report.geometry, 4326)))
+        row = self.db.query(*columns).options(
+            selectinload(Report.ml_artifacts),
+            selectinload(Report.issue_labels)
+        ).filter(Report.id == report_id).first()
+        if not row:
+            return None
+        report, geometry = (row[0], row[1]) if len(columns) > 1 else (row, None)
+        
+        # Media takes the place of selectinload(Report.media): the same single
+        # SELECT, also reading has_variants, which is not mapped on Media
+        media_rows = self.db.query(Media, literal_column("media.has_variants")).filter(
+            Media.report_id == report.id
+        ).all()
+        set_committed_value(report, "media", [media for media, _ in media_rows])
+        originals_only = {
+            media.id for media, has_variants in media_rows
+            if media.media_type == "image" and not has_variants
+        }
+        return report, geometry, originals_only
     
     async def query_reports(self, query: ReportQuery) -> PaginatedResponse:
         """Query reports with filtering and pagination."""
-        db_query = self.db.query(Report)
+        return await self._run(self._query_reports, query)
+    
+    def _query_reports(self, query: ReportQuery) -> PaginatedResponse:
+        db_query, rank = self._apply_filters(self.db.query(Report), query)
         
-        # Apply filters
+        # Get total count
+        total, total_is_estimate = self._count_reports(db_query, query.count)
+        
+        # Apply pagination: keyset on (created_at, id) when a cursor is given,
+        # offset otherwise. One extra row tells us whether a next page exists.
+        sort = query.sort or (
+            ReportSort.RELEVANCE if rank is not None and not query.cursor else ReportSort.NEWEST
+        )
+        if sort == ReportSort.RELEVANCE and query.cursor:
+            raise ValueError("cursor pagination requires sort=newest")
+        
+        order_by = [Report.created_at.desc(), Report.id.desc()]
+        if sort == ReportSort.RELEVANCE and rank is not None:
+            order_by.insert(0, rank.desc())
+        db_query = db_query.order_by(*order_by)
+        if query.cursor:
+            created_at, report_id = _decode_cursor(query.cursor)
+            db_query = db_query.filter(
+                tuple_(Report.created_at, Report.id) < tuple_(created_at, report_id)
+            )
+        else:
+            db_query = db_query.offset((query.page - 1) * query.per_page)
+        reports = db_query.limit(query.per_page + 1).all()
+        
+        next_cursor = None
+        if len(reports) > query.per_page:
+            reports = reports[:query.per_page]
+            # The cursor is a (created_at, id) keyset position, which says
+            # nothing about rank; relevance-ordered results page by number.
+            if not (sort == ReportSort.RELEVANCE and rank is not None):
+                next_cursor = _encode_cursor(reports[-1])
+        
+        # Convert to response format
+        items = [self._convert_to_summary(report) for report in reports]
+        
+        return PaginatedResponse(
+            items=items,
+            total=total,
+            page=query.page,
+            per_page=query.per_page,
+            pages=(total + query.per_page - 1) // query.per_page,
+            next_cursor=next_cursor,
+            total_is_estimate=total_is_estimate
+        )
+    
+    def _apply_filters(self, db_query, query: ReportQuery):
+        """Apply every ReportQuery filter; returns the query and a relevance expression (or None)."""
         if query.bbox:
-            # Parse bbox: "min_lon,min_lat,max_lon,max_lat"
-            coords = [float(x) for x in query.bbox.split(',')]
-            # Add spatial filter (would need PostGIS functions)
-            pass
+            db_query = self._filter_bbox(db_query, parse_bbox(query.bbox))
         
+        if query.near:
+            lat, lon = parse_point(query.near)
+            db_query = self._filter_radius(db_query, lat, lon, query.radius_m)
+        
+        rank = None
         if query.q:
-            # Text search in title and description
+            db_query, rank = self._filter_text(db_query, query.q)
+        
+        if query.issue_type:
+            # Reports whose primary label is one of the requested types;
+            # EXISTS keeps one row per report, unlike a join.
             db_query = db_query.filter(
-                (Report.title.ilike(f"%{query.q}%")) |
-                (Report.description.ilike(f"%{query.q}%"))
+                self.db.query(IssueLabel.id).filter(
+                    IssueLabel.report_id == Report.id,
+                    IssueLabel.is_primary,
+                    IssueLabel.label.in_([issue_type.value for issue_type in query.issue_type])
+                ).exists()
             )
         
-        if query.issue_type:
-            # Filter by issue types
-            pass
+        if query.status:
+            db_query = db_query.filter(Report.status.in_([status.value for status in query.status]))
+        
+        if query.min_severity is not None and query.max_severity is not None \
+                and query.min_severity > query.max_severity:
+            raise ValueError("min_severity must not exceed max_severity")
+        if query.min_severity is not None:
+            db_query = db_query.filter(Report.severity_score >= query.min_severity)
+        if query.max_severity is not None:
+            db_query = db_query.filter(Report.severity_score <= query.max_severity)
         
         if query.since:
             db_query = db_query.filter(Report.created_at >= query.since)
@@ -93,26 +510,116 @@ class ReportService:
         if query.until:
             db_query = db_query.filter(Report.created_at <= query.until)
         
-        # Get total count
-        total = db_query.count()
+        return db_query, rank
+    
+    def _is_postgres(self) -> bool:
+        return self.db.bind.dialect.name == "postgresql"
+    
+    def _filter_bbox(self, db_query, bbox: BBox):
+        """Restrict to reports inside ``bbox`` (WGS84)."""
+        if not self._is_postgres():
+            return db_query.filter(Report.id.in_(self._fallback_index().query_bbox(bbox)))
         
-        # Apply pagination
-        offset = (query.page - 1) * query.per_page
-        reports = db_query.offset(offset).limit(query.per_page).all()
+        envelope = func.ST_MakeEnvelope(*bbox, 4326)
+        if settings.SPATIAL_SRID != 4326:
+            envelope = func.ST_Transform(envelope, settings.SPATIAL_SRID)
+        # && is answered from the GiST index alone; for point geometries the
+        # bounding-box test is exact, so no ST_Intersects recheck is needed.
+        return db_query.filter(Report.geometry.op("&&")(envelope))
+    
+    def _filter_radius(self, db_query, lat: float, lon: float, radius_m: float):
+        """Restrict to reports within ``radius_m`` metres of (lat, lon)."""
+        if not self._is_postgres():
+            return db_query.filter(
+                Report.id.in_(self._fallback_index().query_radius(lon, lat, radius_m))
+            )
         
-        # Convert to response format
-        items = [self._convert_to_summary(report) for report in reports]
+        geometry = Report.geometry
+        if settings.SPATIAL_SRID != 4326:
+            geometry = func.ST_Transform(geometry, 4326)
+        # geography(...) measures in metres on the spheroid; written this way
+        # it matches the ix_reports_geography expression index.
+        center = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+        return db_query.filter(
+            func.ST_DWithin(func.geography(geometry), func.geography(center), radius_m)
+        )
+    
+    def _filter_text(self, db_query, q: str):
+        """Restrict to reports matching every word of ``q`` (as a prefix).
         
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=query.page,
-            per_page=query.per_page,
-            pages=(total + query.per_page - 1) // query.per_page
+        Returns the filtered query and a relevance expression to order by.
+        """
+        tsquery = build_tsquery(q)
+        if tsquery is None:
+            return db_query, None
+        
+        if not self._is_postgres():
+            if not report_search_index.loaded:
+                report_search_index.build(
+                    self.db.query(Report.id, Report.title, Report.description)
+                )
+            scores = report_search_index.search(q)
+            db_query = db_query.filter(Report.id.in_(scores))
+            return db_query, case(scores, value=Report.id, else_=0.0) if scores else None
+        
+        # Trigger-maintained, GIN-indexed tsvector (title weighted A, description B)
+        search_vector = literal_column("reports.search_vector")
+        ts_query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        return (
+            db_query.filter(search_vector.op("@@")(ts_query)),
+            func.ts_rank_cd(search_vector, ts_query)
+        )
+    
+    def _fallback_index(self):
+        """In-memory grid index of report locations for databases without PostGIS."""
+        if not report_locations.loaded:
+            report_locations.build(self.db.query(Report.id, Report.geometry))
+        return report_locations
+    
+    def _count_reports(self, db_query, mode: CountMode) -> Tuple[int, bool]:
+        """Count filtered reports; returns (total, is_estimate)."""
+        if mode == CountMode.ESTIMATED and self._is_postgres():
+            return self._estimate_count(db_query), True
+        
+        if mode in (CountMode.CAPPED, CountMode.ESTIMATED):
+            cap = settings.REPORTS_COUNT_CAP
+            limited = db_query.with_entities(Report.id).limit(cap + 1).subquery()
+            total = self.db.query(func.count()).select_from(limited).scalar()
+            return min(total, cap), total > cap
+        
+        count_query = db_query.with_entities(func.count(Report.id)).order_by(None)
+        return count_query.scalar(), False
+    
+    def _estimate_count(self, db_query) -> int:
+        """Planner row estimate for ``db_query`` via EXPLAIN, without scanning."""
+        plan = self._explain(db_query.with_entities(Report.id))
+        return int(plan["Plan"]["Plan Rows"])
+    
+    def _explain(self, db_query, analyze: bool = False) -> Dict[str, Any]:
+        """PostgreSQL EXPLAIN (FORMAT JSON) of ``db_query``; ``analyze`` executes it."""
+        # Expanding IN parameters are only rendered as individual
+        # placeholders with render_postcompile; the params below must come
+        # from this same compilation.
+        compiled = db_query.statement.compile(
+            dialect=self.db.bind.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        params = (
+            tuple(compiled.params[name] for name in compiled.positiontup)
+            if compiled.positional else compiled.params
         )
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        plan = self.db.connection().exec_driver_sql(
+            f"EXPLAIN ({options}) {compiled}", params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]
     
     async def update_status(self, report_id: str, status: str) -> Optional[Report]:
         """Update report status."""
+        return await self._run(self._update_status, report_id, status)
+    
+    def _update_status(self, report_id: str, status: str) -> Optional[Report]:
         report = self.db.query(Report).filter(Report.id == report_id).first()
         if not report:
             return None
@@ -126,57 +633,213 @@ class ReportService:
     
     async def delete_report(self, report_id: str) -> bool:
         """Delete a report and all related data."""
-        report = self.db.query(Report).filter(Report.id == report_id).first()
+        report = await self._run(
+            self.db.query(Report)
+            .options(selectinload(Report.media))
+            .filter(Report.id == report_id)
+            .first
+        )
         if not report:
             return False
         
-        # Delete media files from storage
-        for media in report.media:
-            await self.storage_service.delete_file(media.s3_key)
+        # Delete media files (and derived image variants) from storage
+        await self.storage_service.delete_files(self._stored_keys(report.media))
         
         # Delete from database (cascade will handle related records)
-        self.db.delete(report)
-        self.db.commit()
+        def delete():
+            tile_deltas = heatmap_tiles.deltas(self.db, [report_id], -1)
+            self.db.delete(report)
+            self.db.commit()
+            heatmap_tiles.commit(self.db, tile_deltas)
+        await self._run(delete)
+        report_locations.remove(report_id)
+        report_search_index.remove(report_id)
         
         return True
     
+    async def delete_reports(self, report_ids: List[str]) -> Dict[str, int]:
+        """Delete many reports, their related rows and stored media.
+        
+        Storage objects are removed with batched deletes and database rows
+        with one DELETE per table, independent of the number of reports.
+        """
+        media_items = await self._run(
+            self.db.query(Media).filter(Media.report_id.in_(report_ids)).all
+        )
+        objects_deleted = await self.storage_service.delete_files(self._stored_keys(media_items))
+        
+        def delete() -> int:
+            tile_deltas = heatmap_tiles.deltas(self.db, report_ids, -1)
+            for model in (Media, MLArtifact, IssueLabel):
+                self.db.query(model).filter(model.report_id.in_(report_ids)).delete(
+                    synchronize_session=False
+                )
+            deleted = self.db.query(Report).filter(Report.id.in_(report_ids)).delete(
+                synchronize_session=False
+            )
+            self.db.commit()
+            heatmap_tiles.commit(self.db, tile_deltas)
+            return deleted
+        
+        try:
+            deleted = await self._run(delete)
+        except Exception as e:
+            await self._run(self.db.rollback)
+            logger.error(f"Error bulk deleting reports: {e}")
+            raise
+        
+        for report_id in report_ids:
+            report_locations.remove(report_id)
+            report_search_index.remove(report_id)
+        
+        logger.info(f"Deleted {deleted} reports and {objects_deleted} stored objects")
+        return {"deleted": deleted, "objects_deleted": objects_deleted}
+    
+    @staticmethod
+    def _stored_keys(media_items: List[Media]) -> List[str]:
+        """Every storage key written for ``media_items``, including image variants."""
+        keys = []
+        for media in media_items:
+            keys.append(media.s3_key)
+            if media.media_type == "image":
+                keys.extend(
+                    StorageService.variant_key(media.s3_key, variant) for variant in ("model", "thumb")
+                )
+        return keys
+    
     async def _process_media_files(self, report_id: str, media_files: List):
-        """Process and store media files."""
-        for file in media_files:
+        """Process and store media files.
+        
+        Files are handled concurrently (up to MEDIA_UPLOAD_CONCURRENCY at a
+        time) and recorded with a single bulk Media insert.
+        """
+        slots = asyncio.Semaphore(settings.MEDIA_UPLOAD_CONCURRENCY)
+        
+        async def store(file) -> Optional[Dict[str, Any]]:
+            async with slots:
+                try:
+                    return await self._store_media_file(report_id, file)
+                except Exception as e:
+                    logger.error(f"Error processing media file: {e}")
+                    return None
+        
+        rows = [row for row in await asyncio.gather(*(store(file) for file in media_files)) if row]
+        if not rows:
+            return
+        
+        def save():
+            self.db.execute(insert(_media_insert_table), rows)
+            self.db.commit()
+        await self._run(save)
+    
+    async def _store_media_file(self, report_id: str, file) -> Dict[str, Any]:
+        """Upload one file (and its image variants); returns its Media row values."""
+        is_image = file.content_type.startswith("image")
+        
+        # Decode images once to derive the model-sized and thumbnail
+        # variants; the original is stored untouched. Images Pillow cannot
+        # decode are kept as the original only.
+        processed = None
+        if is_image:
             try:
-                # Upload to storage
-                s3_key = await self.storage_service.upload_file(
-                    file, f"reports/{report_id}/"
-                )
-                
-                # Create media record
-                media = Media(
-                    report_id=report_id,
-                    s3_key=s3_key,
-                    media_type="image" if file.content_type.startswith("image") else "video",
-                    file_size=file.size,
-                    mime_type=file.content_type
+                processed = await self.image_processor.process(await file.read())
+            except ImageDecodeError as e:
+                logger.warning(f"Storing {file.filename} without variants: {e}")
+            await file.seek(0)
+        
+        # Upload to storage
+        s3_key = await self.storage_service.upload_file(
+            file, f"reports/{report_id}/"
+        )
+        
+        if processed:
+            await asyncio.gather(
+                self.storage_service.upload_bytes(
+                    processed.model_data,
+                    StorageService.variant_key(s3_key, "model"),
+                    "image/jpeg"
+                ),
+                self.storage_service.upload_bytes(
+                    processed.thumbnail_data,
+                    StorageService.variant_key(s3_key, "thumb"),
+                    "image/jpeg"
                 )
-                
-                self.db.add(media)
-                
-            except Exception as e:
-                logger.error(f"Error processing media file: {e}")
+            )
         
-        self.db.commit()
+        return {
+            "id": str(uuid.uuid4()),
+            "report_id": report_id,
+            "s3_key": s3_key,
+            "media_type": "image" if is_image else "video",
+            "file_size": file.size,
+            "mime_type": file.content_type,
+            "has_variants": processed is not None
+        }
     
-    def _convert_to_response(self, report: Report) -> ReportResponse:
-        """Convert database model to response schema."""
-        # This would include proper conversion logic
-        # For now, returning a simplified version
+    def _convert_to_response(self, report: Report, urls: Dict[str, str], geometry=None) -> ReportResponse:
+        """Convert database model to response schema.
+        
+        ``urls`` maps storage keys to presigned URLs (see ``_media_keys``);
+        ``geometry`` is the report's location in WGS84 when it is stored in
+        another SRID.
+        """
+        location = None
+        coords = point_coordinates(report.geometry if geometry is None else geometry)
+        if coords:
+            location = LocationResponse(coordinates=list(coords))
+        
+        labels = sorted(
+            report.issue_labels,
+            key=lambda label: (not label.is_primary, -(label.confidence or 0.0))
+        )
+        
         return ReportResponse(
             id=report.id,
             title=report.title,
             description=report.description,
             status=report.status,
             source=report.source,
+            location=location,
+            address=report.address,
+            severity_score=report.severity_score,
+            confidence_score=report.confidence_score,
             created_at=report.created_at,
-            processed_at=report.processed_at
+            processed_at=report.processed_at,
+            media=[self._convert_media(media, urls) for media in report.media],
+            ml_artifacts=[
+                MLArtifactResponse.model_validate(artifact) for artifact in report.ml_artifacts
+            ],
+            issue_labels=[IssueLabelResponse.model_validate(label) for label in labels]
+        )
+    
+    @staticmethod
+    def _media_keys(media_items: List[Media], originals_only: set = frozenset()) -> List[str]:
+        """Storage keys to presign for ``media_items``: originals and image thumbnails.
+        
+        Images in ``originals_only`` have no thumbnail; their original is
+        used in its place (see ``_convert_media``).
+        """
+        keys = []
+        for media in media_items:
+            keys.append(media.s3_key)
+            if media.media_type == "image" and media.id not in originals_only:
+                keys.append(StorageService.variant_key(media.s3_key, "thumb"))
+        return keys
+    
+    def _convert_media(self, media: Media, urls: Dict[str, str]) -> MediaResponse:
+        """Convert a media record using presigned URLs generated in bulk."""
+        thumbnail_url = None
+        if media.media_type == "image":
+            thumbnail_url = urls.get(StorageService.variant_key(media.s3_key, "thumb")) \
+                or urls.get(media.s3_key)
+        
+        return MediaResponse(
+            id=media.id,
+            url=urls.get(media.s3_key, ""),
+            thumbnail_url=thumbnail_url,
+            media_type=media.media_type,
+            file_size=media.file_size,
+            mime_type=media.mime_type
         )
     
     def _convert_to_summary(self, report: Report):
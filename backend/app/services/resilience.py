@@ -0,0 +1,211 @@
+"""
+Adaptive concurrency limiting and circuit breaking for calls to external services.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit.
+
+    The limit grows by roughly one slot per window of fast, successful calls
+    and is halved whenever the dependency signals overload (timeouts, 429,
+    5xx). Calls slower than ``latency_target`` shrink it gently, so queueing
+    upstream is not mistaken for spare capacity.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, latency_target: float):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Slots held on a previous (closed) loop will never be released
+            self.in_flight = 0
+            self._waiters.clear()
+            self._loop = loop
+
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just as we were cancelled; hand it back
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def release(self, latency: float, overloaded: bool = False):
+        if overloaded:
+            self.limit = max(self.min_limit, self.limit / 2)
+        elif latency > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with support for server retry hints."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, max_open: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_open = max_open
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        if self.state == self.CLOSED:
+            return
+
+        now = time.monotonic()
+        if self.state == self.OPEN and now >= self.open_until:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            # Let exactly one trial call through
+            self._probe_in_flight = True
+            return
+
+        raise CircuitOpenError(self.name, max(0.0, self.open_until - now))
+
+    def abandon_call(self):
+        """The admitted call was cancelled before producing an outcome."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        self.failures += 1
+        # A server hint (model loading, rate limited) means every call will
+        # fail until then, so open immediately instead of counting up.
+        if retry_after is not None or self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            delay = min(self.max_open, retry_after if retry_after is not None else self.reset_timeout)
+            self.open_until = time.monotonic() + delay
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened for {delay:.0f}s")
+            self.state = self.OPEN
+            self._probe_in_flight = False
+
+
+class DependencyGuard:
+    """Adaptive limiter plus circuit breaker in front of one dependency."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.limiter = AdaptiveLimiter(
+            initial=settings.ML_CONCURRENCY_INITIAL,
+            min_limit=settings.ML_CONCURRENCY_MIN,
+            max_limit=settings.ML_CONCURRENCY_MAX,
+            latency_target=settings.ML_LATENCY_TARGET
+        )
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.ML_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.ML_BREAKER_RESET_TIMEOUT,
+            max_open=settings.ML_BREAKER_MAX_OPEN
+        )
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        is_overload: Callable[[Exception], bool],
+        retry_after: Callable[[Exception], Optional[float]] = lambda e: None,
+    ) -> Any:
+        """Run ``fn`` under the limiter, failing fast while the circuit is open."""
+        self.breaker.before_call()
+        try:
+            await self.limiter.acquire()
+        except asyncio.CancelledError:
+            self.breaker.abandon_call()
+            raise
+
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self.limiter.release(time.monotonic() - start)
+            self.breaker.abandon_call()
+            raise
+        except Exception as e:
+            overloaded = is_overload(e)
+            self.limiter.release(time.monotonic() - start, overloaded=overloaded)
+            if overloaded:
+                self.breaker.record_failure(retry_after(e))
+            else:
+                # The dependency answered (e.g. a 4xx): it is reachable
+                self.breaker.record_success()
+            raise
+
+        self.limiter.release(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_in_s": max(0.0, self.breaker.open_until - time.monotonic())
+            if self.breaker.state == CircuitBreaker.OPEN else 0.0,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "queued": self.limiter.queued,
+        }
@@ -0,0 +1,174 @@
+"""
+Two-tier (in-process LRU + Redis) cache for expensive, deterministic results.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_RETWEET_PREFIX = re.compile(r"^rt\s+@\w+:?\s*")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of free text used for cache keys.
+
+    Case, surrounding/internal whitespace and a leading retweet marker do not
+    change what a report is about, so they are folded away.
+    """
+    normalized = " ".join(text.lower().split())
+    return _RETWEET_PREFIX.sub("", normalized)
+
+
+def content_hash(data: Any) -> str:
+    """Stable SHA-256 digest of text (normalized) or raw bytes."""
+    if isinstance(data, str):
+        data = normalize_text(data).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """LRU in front of Redis, keyed by namespace, version and content hash.
+
+    Redis is optional: if it is disabled or unreachable the cache silently
+    degrades to the local tier so lookups never fail the caller.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl: int, redis_url: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.redis_url = redis_url
+        self.local = LRUCache(max_entries, ttl)
+
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def make_key(self, kind: str, version_parts: Iterable[Any], digest: str) -> str:
+        """Build a key whose version changes whenever any of ``version_parts`` does."""
+        version = hashlib.sha1(
+            json.dumps([settings.CACHE_VERSION, *version_parts], sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+        return f"{self.namespace}:{kind}:{version}:{digest}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value)
+                    self.redis_hits += 1
+                    return value
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Result cache read failed for {key}: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any):
+        self.local.set(key, value)
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(key, json.dumps(value), ex=self.ttl)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Result cache write failed for {key}: {e}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key`` or compute and store it."""
+        value = await self.get(key)
+        if value is None:
+            value = await compute()
+            if value is not None:
+                await self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self.local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+        }
+
+    def _get_redis(self):
+        """Lazily connect to Redis on the running loop, if configured."""
+        if not self.redis_url:
+            return None
+
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            try:
+                from redis import asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed; result cache is local only")
+                self.redis_url = None
+                return None
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=1.0)
+            self._redis_loop = loop
+        return self._redis
+
+
+ml_result_cache = ResultCache(
+    namespace="ml",
+    max_entries=settings.ML_RESULT_CACHE_SIZE,
+    ttl=settings.ML_RESULT_CACHE_TTL,
+    redis_url=settings.REDIS_URL if settings.ML_RESULT_CACHE_REDIS_ENABLED else None,
+)
@@ -0,0 +1,125 @@
+"""
+Keyword search helpers: tsquery construction for PostgreSQL and an in-memory
+inverted index used when the database has no full-text search (e.g. SQLite
+test runs).
+"""
+
+import bisect
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Text search configuration used by the reports.search_vector column;
+# must match the migration that defines it.
+SEARCH_CONFIG = "english"
+
+# Field weights mirroring setweight(..., 'A') / setweight(..., 'B')
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens of ``text``."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def build_tsquery(q: str) -> Optional[str]:
+    """Turn free text into a to_tsquery expression with prefix matching.
+
+    Only word characters survive, so user input can never inject tsquery
+    operators. Returns None when nothing searchable is left.
+    """
+    terms = tokenize(q)
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+class InvertedIndex:
+    """Term -> {document: weighted frequency} index with prefix lookups.
+
+    All query terms must match (as a prefix of some indexed term), mirroring
+    the ``&`` of ``build_tsquery``.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._documents: Dict[str, List[str]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix range scans
+        self._lock = threading.Lock()
+
+    def build(self, rows: Iterable[Tuple[str, Optional[str], Optional[str]]]):
+        """(Re)build from ``(id, title, description)`` rows."""
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            for doc_id, title, description in rows:
+                self._add(str(doc_id), title, description)
+            self._vocabulary = sorted(self._postings)
+            self.loaded = True
+
+    def add(self, doc_id: str, title: Optional[str], description: Optional[str]):
+        with self._lock:
+            self._remove(str(doc_id))
+            for term in self._add(str(doc_id), title, description):
+                index = bisect.bisect_left(self._vocabulary, term)
+                if index == len(self._vocabulary) or self._vocabulary[index] != term:
+                    self._vocabulary.insert(index, term)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(str(doc_id))
+
+    def search(self, q: str) -> Dict[str, float]:
+        """Documents matching every term of ``q`` with their relevance score."""
+        terms = tokenize(q)
+        if not terms:
+            return {}
+
+        scores: Optional[Dict[str, float]] = None
+        for term in terms:
+            matches: Dict[str, float] = defaultdict(float)
+            for indexed in self._expand_prefix(term):
+                for doc_id, weight in self._postings[indexed].items():
+                    matches[doc_id] += weight
+
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {doc_id: score + matches[doc_id] for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return {}
+        return scores
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add(self, doc_id: str, title: Optional[str], description: Optional[str]) -> List[str]:
+        weights: Dict[str, float] = defaultdict(float)
+        for term in tokenize(title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+
+        for term, weight in weights.items():
+            self._postings[term][doc_id] = weight
+        self._documents[doc_id] = list(weights)
+        return self._documents[doc_id]
+
+    def _remove(self, doc_id: str):
+        # Emptied terms stay in the vocabulary; they just have no postings
+        for term in self._documents.pop(doc_id, []):
+            self._postings[term].pop(doc_id, None)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        return self._vocabulary[start:end]
+
+
+# Process-wide fallback index of report text, built lazily on first use
+report_search_index = InvertedIndex()
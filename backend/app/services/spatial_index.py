@@ -0,0 +1,191 @@
+"""
+Spatial helpers: bbox/point parsing and an in-memory grid index used when the
+database has no PostGIS (e.g. SQLite test runs).
+"""
+
+import math
+import re
+import struct
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+EARTH_RADIUS_M = 6371008.8
+
+BBox = Tuple[float, float, float, float]  # min_lon, min_lat, max_lon, max_lat
+
+_WKT_POINT = re.compile(
+    r"^\s*(?:SRID=\d+;)?\s*POINT\s*\(\s*([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)\s*$", re.IGNORECASE
+)
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """Parse ``"min_lon,min_lat,max_lon,max_lat"``, clamped to valid WGS84 ranges."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(x) for x in bbox.split(','))
+    except ValueError:
+        raise ValueError("bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise ValueError("bbox coordinates must be finite numbers")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+
+    return (
+        _clamp(min_lon, -180.0, 180.0),
+        _clamp(min_lat, -90.0, 90.0),
+        _clamp(max_lon, -180.0, 180.0),
+        _clamp(max_lat, -90.0, 90.0),
+    )
+
+
+def parse_point(point: str) -> Tuple[float, float]:
+    """Parse ``"lat,lon"`` into ``(lat, lon)``."""
+    try:
+        lat, lon = (float(x) for x in point.split(','))
+    except ValueError:
+        raise ValueError("point must be 'lat,lon'")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise ValueError("point is outside valid latitude/longitude ranges")
+    return lat, lon
+
+
+def point_coordinates(geometry) -> Optional[Tuple[float, float]]:
+    """Return ``(lon, lat)`` of a point geometry stored as (E)WKT or (E)WKB."""
+    if geometry is None:
+        return None
+
+    data = getattr(geometry, "data", geometry)  # geoalchemy2 elements wrap the raw value
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+
+    if isinstance(data, str):
+        match = _WKT_POINT.match(data)
+        if match:
+            return float(match.group(1)), float(match.group(2))
+        try:
+            data = bytes.fromhex(data)  # hex-encoded WKB, as returned by PostGIS
+        except ValueError:
+            return None
+
+    if not isinstance(data, (bytes, bytearray)) or len(data) < 21:
+        return None
+
+    byte_order = "<" if data[0] == 1 else ">"
+    geom_type, = struct.unpack(byte_order + "I", data[1:5])
+    offset = 5
+    if geom_type & 0x20000000:  # EWKB SRID flag
+        offset += 4
+    if geom_type & 0xFF != 1:  # not a point
+        return None
+    lon, lat = struct.unpack(byte_order + "dd", data[offset:offset + 16])
+    return lon, lat
+
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class SpatialGridIndex:
+    """Uniform lon/lat grid of point ids.
+
+    Queries only visit the cells overlapping the search area, so cost scales
+    with the number of points in view rather than the total indexed.
+    """
+
+    def __init__(self, cell_size: float = 0.01):
+        self.cell_size = cell_size
+        self.loaded = False
+        self._cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = defaultdict(dict)
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def build(self, rows: Iterable[Tuple[str, object]]):
+        """(Re)build from ``(id, geometry)`` rows."""
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+            for item_id, geometry in rows:
+                coords = point_coordinates(geometry)
+                if coords:
+                    self._insert(str(item_id), *coords)
+            self.loaded = True
+
+    def insert(self, item_id: str, lon: float, lat: float):
+        with self._lock:
+            self._remove(str(item_id))
+            self._insert(str(item_id), lon, lat)
+
+    def remove(self, item_id: str):
+        with self._lock:
+            self._remove(str(item_id))
+
+    def _remove(self, item_id: str):
+        coords = self._points.pop(item_id, None)
+        if coords:
+            cell = self._cells.get(self._cell(*coords))
+            if cell is not None:
+                cell.pop(item_id, None)
+
+    def query_bbox(self, bbox: BBox) -> Set[str]:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        result = set()
+        for cell in self._cells_in(bbox):
+            for item_id, (lon, lat) in cell.items():
+                if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+                    result.add(item_id)
+        return result
+
+    def query_radius(self, lon: float, lat: float, radius_m: float) -> Set[str]:
+        # Degree extents of the radius; longitude degrees shrink with latitude
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        bbox = (max(-180.0, lon - dlon), max(-90.0, lat - dlat), min(180.0, lon + dlon), min(90.0, lat + dlat))
+
+        result = set()
+        for cell in self._cells_in(bbox):
+            for item_id, (plon, plat) in cell.items():
+                if haversine_m(lon, lat, plon, plat) <= radius_m:
+                    result.add(item_id)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _insert(self, item_id: str, lon: float, lat: float):
+        self._points[item_id] = (lon, lat)
+        self._cells[self._cell(lon, lat)][item_id] = (lon, lat)
+
+    def _cell(self, lon: float, lat: float) -> Tuple[int, int]:
+        return int(math.floor(lon / self.cell_size)), int(math.floor(lat / self.cell_size))
+
+    def _cells_in(self, bbox: BBox) -> List[Dict[str, Tuple[float, float]]]:
+        min_x, min_y = self._cell(bbox[0], bbox[1])
+        max_x, max_y = self._cell(bbox[2], bbox[3])
+        # Sparse data with a huge viewport: scanning occupied cells is cheaper
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._cells):
+            return [
+                cell for (x, y), cell in self._cells.items()
+                if min_x <= x <= max_x and min_y <= y <= max_y
+            ]
+        return [
+            self._cells[(x, y)]
+            for x in range(min_x, max_x + 1)
+            for y in range(min_y, max_y + 1)
+            if (x, y) in self._cells
+        ]
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+# Process-wide fallback index of report locations, built lazily on first use
+report_locations = SpatialGridIndex(settings.SPATIAL_INDEX_CELL_SIZE)
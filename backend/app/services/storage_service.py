@@ -1,8 +1,11 @@
 import boto3
 import asyncio
 import aiofiles
+import aiofiles.os
 import logging
-from typing import Optional
+import os
+from typing import Any, Dict, Iterable, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import uuid
 
@@ -10,57 +13,145 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart parts smaller than this (except the last one)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+# Maximum keys per DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+
 
 class StorageService:
-    """Service for handling file storage operations with AWS S3."""
+    """Service for handling file storage operations with AWS S3.
+    
+    With ``STORAGE_BACKEND=local`` objects are kept under
+    ``LOCAL_STORAGE_DIR`` and served by the app itself, for development and
+    tests without S3.
+    """
     
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        self.backend = settings.STORAGE_BACKEND
         self.bucket = settings.S3_BUCKET
+        self.chunk_size = max(settings.S3_MULTIPART_CHUNK_SIZE, S3_MIN_PART_SIZE)
+        
+        self.s3_client = None
+        if self.backend == "s3":
+            self.s3_client = boto3.client(
+                's3',
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION,
+                # Enough connections for concurrent part uploads of several files
+                config=Config(max_pool_connections=max(10, settings.S3_MULTIPART_CONCURRENCY * 4))
+            )
     
     async def upload_file(self, file, prefix: str = "") -> str:
-        """Upload file to S3 and return the key."""
+        """Stream an UploadFile to storage and return the key.
+        
+        The file is read in ``S3_MULTIPART_CHUNK_SIZE`` chunks; at most
+        ``S3_MULTIPART_CONCURRENCY`` chunks are in memory at once, and all
+        blocking I/O happens off the event loop.
+        """
         try:
             # Generate unique filename
             file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
             unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
             s3_key = f"{prefix}{unique_filename}"
             
-            # Read file content
-            content = await file.read()
-            
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=s3_key,
-                Body=content,
-                ContentType=file.content_type
-            )
+            if self.backend == "local":
+                await self._write_local(s3_key, self._iter_chunks(file))
+            else:
+                await self._upload_s3_stream(file, s3_key, file.content_type)
             
-            logger.info(f"Uploaded file to S3: {s3_key}")
+            logger.info(f"Uploaded file to storage: {s3_key}")
             return s3_key
-            
+        
         except Exception as e:
-            logger.error(f"Error uploading file to S3: {e}")
+            logger.error(f"Error uploading file to storage: {e}")
             raise
     
+    async def upload_bytes(self, data: bytes, s3_key: str, content_type: str) -> str:
+        """Upload an in-memory object (e.g. a derived image variant) to storage."""
+        try:
+            if self.backend == "local":
+                await self._write_local(s3_key, self._iter_bytes(data))
+            else:
+                await asyncio.to_thread(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket,
+                    Key=s3_key,
+                    Body=data,
+                    ContentType=content_type
+                )
+            logger.info(f"Uploaded file to storage: {s3_key}")
+            return s3_key
+        except Exception as e:
+            logger.error(f"Error uploading file to storage: {e}")
+            raise
+    
+    @staticmethod
+    def variant_key(s3_key: str, variant: str) -> str:
+        """Key of a derived variant ("thumb", "model") of an uploaded image."""
+        directory, _, filename = s3_key.rpartition('/')
+        stem = filename.rsplit('.', 1)[0]
+        prefix = f"{directory}/" if directory else ""
+        return f"{prefix}{variant}/{stem}.jpg"
+    
     async def delete_file(self, s3_key: str) -> bool:
-        """Delete file from S3."""
+        """Delete file from storage."""
         try:
-            self.s3_client.delete_object(Bucket=self.bucket, Key=s3_key)
-            logger.info(f"Deleted file from S3: {s3_key}")
+            if self.backend == "local":
+                await aiofiles.os.remove(self._local_path(s3_key))
+            else:
+                await asyncio.to_thread(self.s3_client.delete_object, Bucket=self.bucket, Key=s3_key)
+            logger.info(f"Deleted file from storage: {s3_key}")
+            return True
+        except FileNotFoundError:
             return True
         except Exception as e:
-            logger.error(f"Error deleting file from S3: {e}")
+            logger.error(f"Error deleting file from storage: {e}")
             return False
     
+    async def delete_files(self, s3_keys: Iterable[str]) -> int:
+        """Delete many objects; returns how many were deleted.
+        
+        S3 deletes go out as concurrent ``delete_objects`` batches of up to
+        1000 keys (the API maximum) rather than one request per key.
+        """
+        keys = list(dict.fromkeys(s3_keys))
+        if not keys:
+            return 0
+        
+        if self.backend == "local":
+            results = await asyncio.gather(*(self.delete_file(key) for key in keys))
+            return sum(results)
+        
+        batches = [keys[i:i + S3_DELETE_BATCH_SIZE] for i in range(0, len(keys), S3_DELETE_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._delete_s3_batch(batch) for batch in batches)
+        )
+        return sum(results)
+    
+    async def _delete_s3_batch(self, keys: List[str]) -> int:
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.delete_objects,
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+            )
+        except Exception as e:
+            logger.error(f"Error deleting {len(keys)} files from S3: {e}")
+            return 0
+        
+        errors = response.get("Errors", [])
+        for error in errors:
+            logger.error(f"Error deleting file from S3: {error.get('Key')}: {error.get('Message')}")
+        logger.info(f"Deleted {len(keys) - len(errors)} files from S3")
+        return len(keys) - len(errors)
+    
     def get_presigned_url(self, s3_key: str, expiration: int = None) -> str:
         """Generate presigned URL for file access."""
+        if self.backend == "local":
+            return f"{settings.LOCAL_STORAGE_URL.rstrip('/')}/{s3_key}"
+        
         try:
             expiration = expiration or settings.S3_PRESIGNED_URL_EXPIRATION
             url = self.s3_client.generate_presigned_url(
@@ -72,3 +163,145 @@ class StorageService:
         except Exception as e:
             logger.error(f"Error generating presigned URL: {e}")
             return ""
+    
+    async def get_presigned_urls(self, s3_keys: Iterable[str], expiration: int = None) -> Dict[str, str]:
+        """Presign many keys in one worker-thread hop.
+        
+        Signing is local CPU work (no S3 round trip), so batching keeps a
+        media-heavy response from stalling the event loop once per key.
+        """
+        keys = list(dict.fromkeys(s3_keys))
+        if not keys:
+            return {}
+        urls = await asyncio.to_thread(
+            lambda: [self.get_presigned_url(key, expiration) for key in keys]
+        )
+        return dict(zip(keys, urls))
+    
+    async def _upload_s3_stream(self, file, s3_key: str, content_type: Optional[str]):
+        """Single PUT for small files, concurrent multipart upload otherwise."""
+        extra = {"ContentType": content_type} if content_type else {}
+        
+        first_chunk = await file.read(self.chunk_size)
+        if len(first_chunk) < self.chunk_size:
+            await asyncio.to_thread(
+                self.s3_client.put_object,
+                Bucket=self.bucket, Key=s3_key, Body=first_chunk, **extra
+            )
+            return
+        
+        upload = await asyncio.to_thread(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket, Key=s3_key, **extra
+        )
+        upload_id = upload["UploadId"]
+        
+        # A slot is reserved before each chunk is read and released once its
+        # part is uploaded, so at most S3_MULTIPART_CONCURRENCY chunks are
+        # buffered or in flight at any time.
+        slots = asyncio.Semaphore(settings.S3_MULTIPART_CONCURRENCY)
+        tasks: List[asyncio.Task] = []
+        try:
+            await slots.acquire()
+            chunk, part_number = first_chunk, 1
+            while chunk:
+                tasks.append(asyncio.create_task(
+                    self._upload_part(s3_key, upload_id, part_number, chunk, slots)
+                ))
+                await slots.acquire()
+                self._raise_failed_part(tasks, s3_key)
+                chunk = await file.read(self.chunk_size)
+                part_number += 1
+            slots.release()  # reserved for a read that hit end of file
+            
+            await asyncio.wait(tasks)
+            self._raise_failed_part(tasks, s3_key)
+            parts = [task.result() for task in tasks]
+            await asyncio.to_thread(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+            logger.info(f"Multipart upload of {s3_key} completed in {len(parts)} parts")
+        
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await asyncio.to_thread(
+                    self.s3_client.abort_multipart_upload,
+                    Bucket=self.bucket, Key=s3_key, UploadId=upload_id
+                )
+            except ClientError as e:
+                logger.error(f"Error aborting multipart upload of {s3_key}: {e}")
+            raise
+    
+    @staticmethod
+    def _raise_failed_part(tasks: List[asyncio.Task], s3_key: str):
+        """Raise the error of the first finished part upload that failed.
+        
+        A cancelled part is reported as an ordinary error: ``exception()``
+        would raise CancelledError, which reads as the request itself being
+        cancelled.
+        """
+        failed = next((t for t in tasks if t.done() and (t.cancelled() or t.exception())), None)
+        if failed is None:
+            return
+        if failed.cancelled():
+            raise RuntimeError(f"Part upload of {s3_key} was cancelled")
+        raise failed.exception()
+    
+    async def _upload_part(
+        self, s3_key: str, upload_id: str, part_number: int, data: bytes, slots: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.upload_part,
+                Bucket=self.bucket,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        finally:
+            slots.release()
+    
+    async def _iter_chunks(self, file):
+        while True:
+            chunk = await file.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    async def _iter_bytes(data: bytes):
+        yield data
+    
+    async def _write_local(self, s3_key: str, chunks):
+        """Write chunks to the local store atomically (temp file + rename)."""
+        path = self._local_path(s3_key)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out:
+                async for chunk in chunks:
+                    await out.write(chunk)
+            await aiofiles.os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    @staticmethod
+    def _local_path(s3_key: str) -> str:
+        root = os.path.abspath(settings.LOCAL_STORAGE_DIR)
+        path = os.path.abspath(os.path.join(root, s3_key))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Invalid storage key: {s3_key}")
+        return path
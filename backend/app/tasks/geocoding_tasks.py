@@ -0,0 +1,39 @@
+import asyncio
+from app.celery import celery_app
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.report_service import ReportService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True)
+def geocode_reports_batch(self, report_ids: list):
+    """Resolve addresses of reports stored with geometry pending.
+    
+    Identical addresses in the batch are geocoded once, lookups run with
+    bounded concurrency and geometries are written back in bulk.
+    """
+    db = SessionLocal()
+    try:
+        result = asyncio.run(ReportService(db).geocode_pending_reports(report_ids))
+        return {'status': 'Geocoding completed', **result}
+        
+    except Exception as e:
+        logger.error(f"Error in geocoding task: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def enqueue_geocoding(report_ids: list) -> bool:
+    """Queue background geocoding, GEOCODE_BATCH_SIZE reports per task message."""
+    try:
+        chunk_size = settings.GEOCODE_BATCH_SIZE
+        for start in range(0, len(report_ids), chunk_size):
+            geocode_reports_batch.delay(report_ids[start:start + chunk_size])
+        return True
+    except Exception as e:
+        logger.error(f"Error enqueuing geocoding for {len(report_ids)} reports: {e}")
+        return False
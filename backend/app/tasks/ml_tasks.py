@@ -1,17 +1,23 @@
+import asyncio
 from celery import current_task
 from app.celery import celery_app
-from app.services.ml_service import MLService
+from app.core.config import settings
+from app.services.ml_service import MLAnalysisError, MLService
 from app.db.database import SessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, max_retries=settings.ML_TASK_MAX_RETRIES)
 def process_report_ml(self, report_id: str):
-    """Background task to process report with ML analysis."""
+    """Background task to process report with ML analysis.
+    
+    A failed analysis (report left FAILED) is retried with exponential
+    backoff.
+    """
+    db = SessionLocal()
     try:
-        db = SessionLocal()
         ml_service = MLService()
         
         # Update task state
@@ -21,9 +27,7 @@ def process_report_ml(self, report_id: str):
         )
         
         # Perform ML analysis
-        result = ml_service.analyze_report(report_id)
-        
-        db.close()
+        result = asyncio.run(ml_service.analyze_report(report_id, db))
         
         return {
             'current': 4,
@@ -32,6 +36,9 @@ def process_report_ml(self, report_id: str):
             'result': result
         }
         
+    except MLAnalysisError as e:
+        logger.warning(f"{e}; retry {self.request.retries + 1} of {self.max_retries}")
+        raise self.retry(exc=e, countdown=_retry_delay(self.request.retries))
     except Exception as e:
         logger.error(f"Error in ML processing task: {e}")
         self.update_state(
@@ -39,6 +46,8 @@ def process_report_ml(self, report_id: str):
             meta={'error': str(e)}
         )
         raise
+    finally:
+        db.close()
 
 
 @celery_app.task(bind=True)
@@ -63,6 +72,83 @@ def batch_process_reports(self, report_ids: list):
         raise
 
 
+@celery_app.task(bind=True, max_retries=settings.ML_TASK_MAX_RETRIES)
+def process_reports_ml_batch(self, report_ids: list):
+    """Analyze many reports in one task.
+    
+    Reports run concurrently on one event loop, so their text
+    classifications share zero-shot micro-batches and pooled connections
+    instead of paying per-task startup for each report. Reports whose
+    analysis failed are retried together in a follow-up batch, with
+    exponential backoff.
+    """
+    try:
+        results = asyncio.run(_analyze_reports(report_ids))
+        failed = [
+            report_id for report_id, result in zip(report_ids, results)
+            if isinstance(result, Exception)
+        ]
+        for report_id, result in zip(report_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error analyzing report {report_id} in batch: {result}")
+        
+        if failed and self.request.retries < self.max_retries:
+            self.retry(
+                args=(failed,), countdown=_retry_delay(self.request.retries), throw=False
+            )
+        
+        return {
+            'status': 'Batch analysis completed',
+            'processed': len(report_ids) - len(failed),
+            'failed': failed
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in batch analysis task: {e}")
+        raise
+
+
+async def _analyze_reports(report_ids: list) -> list:
+    ml_service = MLService()
+    semaphore = asyncio.Semaphore(settings.ML_BULK_CONCURRENCY)
+    
+    async def analyze(report_id: str):
+        async with semaphore:
+            # Each report gets its own session (analyze_report opens one),
+            # used from worker threads so the loop stays free for inference
+            return await ml_service.analyze_report(report_id)
+    
+    return await asyncio.gather(
+        *(analyze(report_id) for report_id in report_ids), return_exceptions=True
+    )
+
+
+def _retry_delay(retries: int) -> int:
+    return settings.ML_TASK_RETRY_BACKOFF * 2 ** retries
+
+
+def enqueue_report_ml(report_id: str) -> bool:
+    """Queue ML analysis for a single report."""
+    try:
+        process_report_ml.delay(report_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error enqueuing analysis for report {report_id}: {e}")
+        return False
+
+
+def enqueue_report_analysis(report_ids: list) -> bool:
+    """Queue ML analysis for many reports, ML_BULK_TASK_SIZE per task message."""
+    try:
+        chunk_size = settings.ML_BULK_TASK_SIZE
+        for start in range(0, len(report_ids), chunk_size):
+            process_reports_ml_batch.delay(report_ids[start:start + chunk_size])
+        return True
+    except Exception as e:
+        logger.error(f"Error enqueuing analysis for {len(report_ids)} reports: {e}")
+        return False
+
+
 @celery_app.task
 def cleanup_old_reports():
     """Periodic task to clean up old processed reports."""
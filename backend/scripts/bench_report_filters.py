@@ -0,0 +1,157 @@
+"""
+Benchmark the query_reports filters against a seeded PostgreSQL database.
+
+Run from backend/ against a scratch database (DATABASE_URL):
+
+    python scripts/bench_report_filters.py --seed 1000000   # seed, then benchmark
+    python scripts/bench_report_filters.py                  # benchmark existing rows
+    python scripts/bench_report_filters.py --cleanup        # remove seeded rows
+    python scripts/bench_report_filters.py --dry-run        # print each case's SQL, no database
+
+Each case runs the exact SQL ReportService builds (first page, newest first)
+under EXPLAIN ANALYZE and reports the median execution time and the indexes
+the plan used. Seeded rows have titles starting with "bench-".
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.models.models import Report  # noqa: E402
+from app.schemas.schemas import IssueType, ReportQuery, ReportStatus  # noqa: E402
+from app.services.report_service import ReportService  # noqa: E402
+
+CASES = {
+    "no filters": ReportQuery(),
+    "status": ReportQuery(status=[ReportStatus.PENDING]),
+    "severity": ReportQuery(min_severity=8),
+    "issue_type": ReportQuery(issue_type=[IssueType.FLOODING]),
+    "status + issue_type + severity": ReportQuery(
+        status=[ReportStatus.PROCESSED], issue_type=[IssueType.POTHOLE], min_severity=5
+    ),
+}
+
+SEED_REPORTS = """
+INSERT INTO reports (id, title, description, source, status, severity_score, created_at)
+SELECT gen_random_uuid(),
+       'bench-' || n,
+       'seeded report ' || n,
+       'WEB',
+       (ARRAY['PENDING', 'PROCESSING', 'PROCESSED', 'FAILED', 'REVIEWED'])[1 + n % 5],
+       CASE WHEN n % 5 = 2 THEN round((random() * 10)::numeric, 2) END,
+       now() - (n || ' seconds')::interval
+FROM generate_series(1, :rows) AS n
+"""
+
+SEED_LABELS = """
+INSERT INTO issue_labels (id, report_id, label, source, confidence, is_primary)
+SELECT gen_random_uuid(), r.id,
+       (ARRAY['pothole', 'flooding', 'graffiti', 'broken_light', 'trash', 'other'])
+           [1 + floor(random() * 6)::int],
+       'ml', random(), true
+FROM reports r
+WHERE r.title LIKE 'bench-%' AND r.status IN ('PROCESSED', 'REVIEWED')
+"""
+
+
+def seed(db, rows: int):
+    print(f"Seeding {rows} reports...")
+    db.execute(text(SEED_REPORTS), {"rows": rows})
+    db.execute(text(SEED_LABELS))
+    db.commit()
+    db.execute(text("ANALYZE reports"))
+    db.execute(text("ANALYZE issue_labels"))
+    db.commit()
+
+
+def cleanup(db):
+    db.execute(text(
+        "DELETE FROM issue_labels WHERE report_id IN "
+        "(SELECT id FROM reports WHERE title LIKE 'bench-%')"
+    ))
+    deleted = db.execute(text("DELETE FROM reports WHERE title LIKE 'bench-%'")).rowcount
+    db.commit()
+    print(f"Removed {deleted} seeded reports")
+
+
+def plan_indexes(node: Dict[str, Any]) -> List[str]:
+    """Index names used anywhere in a plan tree, plus any reports seq scans."""
+    found = []
+    if "Index Name" in node:
+        found.append(node["Index Name"])
+    if node.get("Node Type") == "Seq Scan":
+        found.append(f"SEQ SCAN {node.get('Relation Name')}")
+    for child in node.get("Plans", []):
+        found.extend(plan_indexes(child))
+    return found
+
+
+def case_query(service: ReportService, query: ReportQuery):
+    db_query, _ = service._apply_filters(service.db.query(Report), query)
+    return db_query.order_by(Report.created_at.desc(), Report.id.desc()).limit(query.per_page)
+
+
+def render_sql(service: ReportService, query: ReportQuery) -> str:
+    """A case's SQL for PostgreSQL with parameters inlined, as _explain sends it."""
+    return str(case_query(service, query).statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True, "literal_binds": True}
+    ))
+
+
+def run_case(service: ReportService, query: ReportQuery, repeat: int):
+    db_query = case_query(service, query)
+
+    timings = []
+    for _ in range(repeat):
+        plan = service._explain(db_query, analyze=True)
+        timings.append(plan["Execution Time"])
+    return statistics.median(timings), sorted(set(plan_indexes(plan["Plan"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, metavar="ROWS", help="seed this many reports first")
+    parser.add_argument("--cleanup", action="store_true", help="delete seeded rows and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (median reported)")
+    parser.add_argument("--dry-run", action="store_true", help="print each case's SQL and exit")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        # Builds queries only; nothing connects to DATABASE_URL
+        service = ReportService(Session())
+        for name, query in CASES.items():
+            print(f"-- {name}\n{render_sql(service, query)};\n")
+        return
+
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "postgresql":
+            sys.exit("This benchmark needs PostgreSQL (set DATABASE_URL)")
+        if args.cleanup:
+            cleanup(db)
+            return
+        if args.seed:
+            seed(db, args.seed)
+
+        service = ReportService(db)
+        total = db.execute(text("SELECT count(*) FROM reports")).scalar()
+        print(f"{total} reports\n")
+        print(f"{'case':<34} {'median ms':>10}  plan")
+        for name, query in CASES.items():
+            median, indexes = run_case(service, query, args.repeat)
+            print(f"{name:<34} {median:>10.2f}  {', '.join(indexes) or '-'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compile an address extract into the offline gazetteer used by
+GEOCODER_BACKEND=gazetteer.
+
+Run from backend/:
+
+    python scripts/build_gazetteer.py city.csv data/gazetteer
+    python scripts/build_gazetteer.py --format geonames US.txt data/gazetteer
+
+Supported inputs:
+
+- ``openaddresses``: OpenAddresses CSV (LON, LAT, NUMBER, STREET, UNIT,
+  CITY, POSTCODE; header case does not matter)
+- ``csv``: any CSV with ``address``, ``lat`` and ``lon`` columns
+- ``geonames``: a GeoNames dump (tab separated, no header); place names
+
+``--format`` defaults to openaddresses when the header has NUMBER and
+STREET columns, csv otherwise. Point GAZETTEER_PATH at the output
+directory.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.gazetteer import build_gazetteer  # noqa: E402
+from app.services.geocoding_service import normalize_address  # noqa: E402
+
+Entry = Tuple[str, float, float, List[str]]
+
+
+def read_openaddresses(path: str) -> Iterator[Entry]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            record = {k.lower(): (v or "").strip() for k, v in record.items() if k}
+            street = " ".join(p for p in (record.get("number"), record.get("street")) if p)
+            if not street:
+                continue
+            if record.get("unit"):
+                street = f"{street} {record['unit']}"
+            locality = " ".join(p for p in (record.get("city"), record.get("postcode")) if p)
+            address = f"{street}, {locality}" if locality else street
+            # Also findable without the postcode, and without city and postcode
+            keys = [street]
+            if record.get("city"):
+                keys.append(f"{street}, {record['city']}")
+            yield address, float(record["lat"]), float(record["lon"]), keys
+
+
+def read_csv(path: str) -> Iterator[Entry]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            record = {k.lower(): (v or "").strip() for k, v in record.items() if k}
+            if record.get("address"):
+                yield record["address"], float(record["lat"]), float(record["lon"]), []
+
+
+def read_geonames(path: str) -> Iterator[Entry]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 6:
+                continue
+            yield fields[1], float(fields[4]), float(fields[5]), [fields[2]] if fields[2] else []
+
+
+def detect_format(path: str) -> str:
+    with open(path, newline="", encoding="utf-8") as f:
+        header = {column.strip().lower() for column in next(csv.reader(f), [])}
+    return "openaddresses" if {"number", "street"} <= header else "csv"
+
+
+READERS = {"openaddresses": read_openaddresses, "csv": read_csv, "geonames": read_geonames}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="input file")
+    parser.add_argument("output", help="output directory")
+    parser.add_argument("--format", choices=sorted(READERS), help="input format (detected if omitted)")
+    parser.add_argument("--cell-size", type=float, default=0.005, help="reverse index grid cell, degrees")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.source)
+    start = time.perf_counter()
+    rows = build_gazetteer(READERS[fmt](args.source), args.output, normalize_address, args.cell_size)
+    print(f"Wrote {rows} entries to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
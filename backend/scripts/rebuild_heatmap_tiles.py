@@ -0,0 +1,32 @@
+"""
+Recompute the pre-aggregated heatmap tiles (heatmap_cells) from the reports
+table.
+
+Run from backend/ after the heatmap_cells migration on an existing database,
+or after changing HEATMAP_MIN_ZOOM, HEATMAP_MAX_ZOOM or HEATMAP_TILE_CELLS:
+
+    python scripts/rebuild_heatmap_tiles.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.services.heatmap_tiles import heatmap_tiles  # noqa: E402
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        located = heatmap_tiles.rebuild(db)
+        print(f"Rebuilt heatmap tiles from {located} located reports in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
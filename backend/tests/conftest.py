@@ -0,0 +1,30 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def db():
+    """Session on TEST_DATABASE_URL, rolled back after the test.
+
+    On PostgreSQL the schema is expected to be migrated; other databases
+    get the ORM tables created.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        Base.metadata.create_all(engine)
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
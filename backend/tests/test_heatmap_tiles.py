@@ -0,0 +1,137 @@
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("app.models.models", reason="ORM models are not importable")
+
+from app.services.analytics_service import _heatmap_points  # noqa: E402
+from app.services.heatmap_tiles import HeatmapTiles  # noqa: E402
+
+
+class UpsertRecorder:
+    """Stands in for the Session: records executed upserts and commits, flushes nothing."""
+
+    def __init__(self, fail=False):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+        self.fail = fail
+        self.upserts = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def execute(self, stmt, rows):
+        if self.fail:
+            raise RuntimeError("deadlock detected")
+        self.upserts.append(rows)
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def totals(rows):
+    """Net report_count per (issue_type, zoom) over the upserted rows."""
+    net = Counter()
+    for row in rows:
+        net[(row["issue_type"], row["zoom"])] += row["report_count"]
+    return net
+
+
+@pytest.fixture
+def tiles(monkeypatch):
+    tiles = HeatmapTiles(min_zoom=3, max_zoom=6, cells=8)
+    located = {"r1": (37.7749, -122.4194, datetime(2026, 10, 1), "pothole")}
+    monkeypatch.setattr(
+        tiles, "_locate", lambda db, report_ids: [located[report_id] for report_id in report_ids if report_id in located]
+    )
+    tiles.located = located
+    return tiles
+
+
+def test_move_writes_old_and_new_label_in_one_upsert(tiles):
+    db = UpsertRecorder()
+
+    def relabel():
+        lat, lon, created_at, _ = tiles.located["r1"]
+        tiles.located["r1"] = (lat, lon, created_at, "flooding")
+
+    deltas = tiles.move(db, ["r1"], relabel)
+    assert db.upserts == []
+    tiles.commit(db, deltas)
+
+    assert db.commits == 1
+    (rows,) = db.upserts
+    zooms = tiles.max_zoom - tiles.min_zoom + 1
+    assert Counter((row["issue_type"], row["report_count"]) for row in rows) == {
+        ("pothole", -1): zooms, ("flooding", 1): zooms
+    }
+
+
+def test_move_without_change_writes_nothing(tiles):
+    db = UpsertRecorder()
+    tiles.commit(db, tiles.move(db, ["r1"], lambda: None))
+    assert db.upserts == []
+    assert db.commits == 0
+
+
+def test_move_out_of_the_map_only_removes(tiles):
+    db = UpsertRecorder()
+    tiles.commit(db, tiles.move(db, ["r1"], lambda: tiles.located.pop("r1")))
+
+    (rows,) = db.upserts
+    assert set(totals(rows).values()) == {-1}
+    assert {row["issue_type"] for row in rows} == {"pothole"}
+
+
+def test_delete_removes_one_report_per_zoom(tiles):
+    db = UpsertRecorder()
+    tiles.located["r2"] = (37.7750, -122.4195, datetime(2026, 10, 1), "pothole")
+    tiles.located["r3"] = (37.7750, -122.4195, datetime(2026, 10, 1), "")
+
+    added = tiles.deltas(db, ["r1", "r2", "r3"])
+    removed = tiles.deltas(db, ["r2", "r3", "unlocated"], -1)
+    tiles.commit(db, removed)
+
+    (rows,) = db.upserts
+    zooms = range(tiles.min_zoom, tiles.max_zoom + 1)
+    assert totals(rows) == {**{("pothole", z): -1 for z in zooms}, **{("", z): -1 for z in zooms}}
+    net = added.copy()
+    net.update(removed)
+    assert {key[4] for key, count in net.items() if count} == {"pothole"}
+    assert sum(count for count in net.values() if count) == len(zooms)
+
+
+def test_failed_tile_write_is_rolled_back_not_raised(tiles):
+    db = UpsertRecorder(fail=True)
+    tiles.commit(db, tiles.deltas(db, ["r1"]))
+    assert (db.commits, db.rollbacks) == (0, 1)
+
+
+def test_upsert_rows_are_sorted_by_key(tiles):
+    db = UpsertRecorder()
+    tiles.located["r2"] = (-33.8688, 151.2093, datetime(2026, 9, 30), "")
+    tiles.located["r3"] = (51.5074, -0.1278, datetime(2026, 10, 2), "graffiti")
+
+    tiles.apply(db, ["r3", "r1", "r2"])
+
+    (rows,) = db.upserts
+    keys = [(row["zoom"], row["tile_x"], row["tile_y"], row["day"], row["issue_type"], row["cell"]) for row in rows]
+    assert keys == sorted(keys)
+
+
+def test_intensity_uses_the_zoom_wide_peak():
+    zoom = 10
+    quiet_tile = {(100, 200, 5): 2}
+    busy_tile = {(101, 200, 5): 8}
+    quiet = _heatmap_points(quiet_tile, zoom, peak=8)
+    busy = _heatmap_points(busy_tile, zoom, peak=8)
+    assert [point["intensity"] for point in quiet] == [0.25]
+    assert [point["intensity"] for point in busy] == [1.0]
+    # A stale (cached) peak never yields intensities above 1
+    assert _heatmap_points(busy_tile, zoom, peak=4)[0]["intensity"] == 1.0
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("app.models.models", reason="ORM models are not importable")
+
+from app.models.models import Report  # noqa: E402
+from app.services.hotspots import HotspotIndex  # noqa: E402
+
+
+def add_reports(db, count, created_at, geometry="SRID=4326;POINT(-73.9857 40.7484)"):
+    reports = [Report(title="Pothole", geometry=geometry, created_at=created_at) for _ in range(count)]
+    db.add_all(reports)
+    db.flush()
+    return reports
+
+
+def loaded_reports(index):
+    return sum(int(bins[1].sum()) for bins in index._days.values())
+
+
+def test_late_committed_reports_are_picked_up_once(db, monkeypatch):
+    monkeypatch.setattr("app.services.hotspots.settings.HOTSPOT_REFRESH_OVERLAP", 300.0)
+    index = HotspotIndex(cell_size=0.002)
+    now = datetime.utcnow()
+    add_reports(db, 3, now - timedelta(hours=1))
+    add_reports(db, 2, now - timedelta(seconds=30))
+
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+    assert loaded_reports(index) == 5
+
+    # Stamped before the previous request, committed after it
+    add_reports(db, 4, now - timedelta(seconds=20))
+    # ...and one whose geometry was geocoded after the previous request
+    pending, = add_reports(db, 1, now - timedelta(seconds=25), geometry=None)
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+    assert loaded_reports(index) == 9
+
+    pending.geometry = "SRID=4326;POINT(-73.9857 40.7484)"
+    db.flush()
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+    assert loaded_reports(index) == 10
+
+
+def test_settled_reports_are_not_reread(db, monkeypatch):
+    monkeypatch.setattr("app.services.hotspots.settings.HOTSPOT_REFRESH_OVERLAP", 0.0)
+    index = HotspotIndex(cell_size=0.002)
+    add_reports(db, 3, datetime.utcnow() - timedelta(minutes=5))
+
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+    asyncio.run(index.hotspots(db, days=2, limit=5))
+
+    assert loaded_reports(index) == 3
+    assert index.stats()["unsettled_reports"] == 0
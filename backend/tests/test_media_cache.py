@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import media_cache as media_cache_module
+from app.services.media_cache import MediaCache, MediaTooLargeError
+
+BODY = b"x" * 1000
+
+
+def presigned(signature: str, signed_at: float = None, expires: int = 3600) -> str:
+    amz_date = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(signed_at or time.time()))
+    return (
+        "https://bucket.s3.amazonaws.com/reports/r1/a.jpg?X-Amz-Algorithm=AWS4-HMAC-SHA256"
+        f"&X-Amz-Date={amz_date}&X-Amz-Expires={expires}&X-Amz-Signature={signature}"
+    )
+
+
+@pytest.fixture
+def origin(monkeypatch):
+    """Fake S3: accepts signatures starting with "good", serves ETag "v1"."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if not request.url.params["X-Amz-Signature"].startswith("good"):
+            return httpx.Response(403)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=BODY, headers={"etag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(media_cache_module, "get_http_client", lambda: client)
+    return requests
+
+
+def test_resigned_url_is_revalidated_not_refetched(origin):
+    cache = MediaCache(max_bytes=10_000, max_item_bytes=5_000, ttl=60)
+
+    async def run():
+        assert await cache.fetch(presigned("good1")) == BODY
+        assert await cache.fetch(presigned("good1")) == BODY
+        assert await cache.fetch(presigned("good2")) == BODY
+
+    asyncio.run(run())
+    assert len(origin) == 2
+    assert origin[1].headers["if-none-match"] == '"v1"'
+    assert (cache.misses, cache.hits, cache.revalidations) == (1, 1, 1)
+
+
+def test_invalid_or_expired_url_is_not_served_from_cache(origin):
+    cache = MediaCache(max_bytes=10_000, max_item_bytes=5_000, ttl=60)
+    expired = presigned("good1", signed_at=time.time() - 120, expires=60)
+
+    async def run():
+        await cache.fetch(presigned("good1"))
+        with pytest.raises(httpx.HTTPStatusError):
+            await cache.fetch(presigned("forged"))
+        await cache.fetch(expired)
+
+    asyncio.run(run())
+    assert len(origin) == 3
+    assert cache.hits == 0
+
+
+def test_download_over_limit_is_aborted(origin):
+    cache = MediaCache(max_bytes=10_000, max_item_bytes=500, ttl=60)
+    with pytest.raises(MediaTooLargeError):
+        asyncio.run(cache.fetch(presigned("good1")))
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,55 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.services.ml_batching import MicroBatcher
+
+
+async def double(items):
+    await asyncio.sleep(0.01)
+    return [item * 2 for item in items]
+
+
+def test_in_flight_batches_survive_garbage_collection():
+    batcher = MicroBatcher(double, max_batch_size=2, max_wait=0.001)
+
+    async def run():
+        callers = [asyncio.ensure_future(batcher.submit(i)) for i in range(5)]
+        await asyncio.sleep(0.002)
+        gc.collect()
+        assert batcher.stats()["in_flight"] > 0
+        return await asyncio.wait_for(asyncio.gather(*callers), timeout=1)
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert batcher.stats()["in_flight"] == 0
+
+
+def test_close_dispatches_pending_and_waits():
+    batcher = MicroBatcher(double, max_batch_size=10, max_wait=60)
+
+    async def run():
+        caller = asyncio.ensure_future(batcher.submit(21))
+        await asyncio.sleep(0)
+        await batcher.close()
+        assert caller.done()
+        return caller.result()
+
+    assert asyncio.run(run()) == 42
+
+
+def test_close_cancels_batches_past_timeout():
+    async def hang(items):
+        await asyncio.sleep(60)
+
+    batcher = MicroBatcher(hang, max_batch_size=1, max_wait=0)
+
+    async def run():
+        caller = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0.01)
+        await batcher.close(timeout=0.01)
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+    asyncio.run(run())
+    assert batcher.stats()["in_flight"] == 0
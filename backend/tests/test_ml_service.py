@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+
+pytest.importorskip("app.models.models", reason="ORM models are not importable")
+
+from app.models.models import IssueLabel, Report  # noqa: E402
+from app.schemas.schemas import MLAnalysisResponse  # noqa: E402
+from app.services.ml_service import MLAnalysisError, MLService  # noqa: E402
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = MLService()
+    service.analysis = MLAnalysisResponse(
+        text_classification={"label": "flooding", "confidence": 0.8, "all_labels": {"flooding": 0.8, "pothole": 0.6}},
+        processing_time_ms=5,
+        confidence_scores={"text_classification": 0.8}
+    )
+
+    async def analyze_content(request):
+        return service.analysis
+
+    monkeypatch.setattr(service, "analyze_content", analyze_content)
+    return service
+
+
+@pytest.fixture
+def statement_threads(db):
+    """Ids of the threads that sent each statement on ``db``."""
+    threads = []
+
+    def record(*args):
+        threads.append(threading.get_ident())
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield threads
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_analyze_report_runs_queries_off_the_event_loop(db, service, statement_threads):
+    report = Report(title="Street flooded", description="after the storm", status="PENDING")
+    db.add(report)
+    db.commit()
+    report_id = report.id
+    statement_threads.clear()
+
+    async def run():
+        loop_thread = threading.get_ident()
+        summary = await service.analyze_report(report_id, db)
+        return loop_thread, summary
+
+    loop_thread, summary = asyncio.run(run())
+    threads = list(statement_threads)
+
+    assert summary["primary_issue"] == "flooding"
+    assert threads and loop_thread not in threads
+    db.expire_all()
+    assert db.get(Report, report_id).status == "PROCESSED"
+    assert {label.label for label in db.query(IssueLabel).filter(IssueLabel.report_id == report_id)} == {
+        "flooding", "pothole"
+    }
+
+
+def test_failed_pipeline_marks_report_failed(db, service):
+    report = Report(title="Street flooded", status="PENDING")
+    db.add(report)
+    db.commit()
+    service.analysis = MLAnalysisResponse(
+        failed_pipelines=["text_classification"], processing_time_ms=5, confidence_scores={}
+    )
+
+    with pytest.raises(MLAnalysisError):
+        asyncio.run(service.analyze_report(report.id, db))
+
+    db.expire_all()
+    assert db.get(Report, report.id).status == "FAILED"
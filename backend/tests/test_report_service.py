@@ -0,0 +1,158 @@
+import asyncio
+import re
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+pytest.importorskip("app.models.models", reason="ORM models are not importable")
+
+from app.core.config import settings  # noqa: E402
+from app.models.models import IssueLabel, Media, MLArtifact, Report  # noqa: E402
+from app.schemas.schemas import CountMode, IssueType, ReportQuery, ReportSort, ReportStatus  # noqa: E402
+from app.services.report_service import ReportService  # noqa: E402
+from app.services.search_index import report_search_index  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+
+
+class ExplainRecorder(Session):
+    """Session on a PostgreSQL dialect that records EXPLAIN statements instead of running them."""
+
+    def __init__(self, dialect):
+        super().__init__()
+        self.bind = SimpleNamespace(dialect=dialect)
+        self.statements = []
+
+    def connection(self, *args, **kwargs):
+        return self
+
+    def exec_driver_sql(self, sql, params):
+        self.statements.append((sql, params))
+        return SimpleNamespace(scalar=lambda: [{"Plan": {"Plan Rows": 42}}])
+
+
+@contextmanager
+def count_statements(db):
+    """Collects the SQL statements ``db`` sends to the database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def detailed_report(db):
+    """A report with two images (one stored without variants), a video, an artifact and labels."""
+    report = Report(title="Flooded underpass", description="Water over the road", status="PROCESSED")
+    db.add(report)
+    db.flush()
+    media = [
+        Media(report_id=report.id, s3_key=f"reports/{report.id}/{name}", media_type=media_type)
+        for name, media_type in [("a.jpg", "image"), ("b.heic", "image"), ("c.mp4", "video")]
+    ]
+    db.add_all(media)
+    db.add(MLArtifact(
+        report_id=report.id, artifact_type="caption", payload={"caption": "a flooded road"}, model_name="blip"
+    ))
+    db.add_all([
+        IssueLabel(report_id=report.id, label="flooding", source="ml", confidence=0.9, is_primary=True),
+        IssueLabel(report_id=report.id, label="pothole", source="ml", confidence=0.2)
+    ])
+    db.flush()
+    db.execute(text("UPDATE media SET has_variants = false WHERE id = :id"), {"id": media[1].id})
+    db.expire_all()
+    return report.id, media
+
+
+def filtered_query():
+    return ReportQuery(
+        status=[ReportStatus.PENDING, ReportStatus.PROCESSED],
+        issue_type=[IssueType.POTHOLE, IssueType.FLOODING],
+        count=CountMode.ESTIMATED
+    )
+
+
+@pytest.mark.parametrize("dialect", [postgresql.psycopg2.dialect(), postgresql.asyncpg.dialect()])
+def test_estimated_count_binds_in_filters(dialect):
+    db = ExplainRecorder(dialect)
+    service = ReportService(db)
+    db_query, _ = service._apply_filters(db.query(Report), filtered_query())
+
+    assert service._count_reports(db_query, CountMode.ESTIMATED) == (42, True)
+
+    (sql, params), = db.statements
+    assert sql.startswith("EXPLAIN (FORMAT JSON) ")
+    assert "POSTCOMPILE" not in sql
+    if dialect.paramstyle == "pyformat":
+        assert set(re.findall(r"%\((\w+)\)s", sql)) == set(params)
+        assert {"PENDING", "PROCESSED", "pothole", "flooding"} <= set(params.values())
+    else:
+        assert len(set(re.findall(r"\$(\d+)", sql))) == len(params)
+        assert {"PENDING", "PROCESSED", "pothole", "flooding"} <= set(params)
+
+
+def test_estimated_count_with_in_filters_on_database(db):
+    result = ReportService(db)._query_reports(filtered_query())
+    assert result.total >= 0
+
+
+def test_relevance_results_page_by_number(db):
+    reports = [
+        Report(title=f"Pothole {i}", description="pothole " * (i % 4) + "on the road", status="PENDING")
+        for i in range(12)
+    ] + [Report(title=f"Graffiti {i}", description="on a wall", status="PENDING") for i in range(5)]
+    db.add_all(reports)
+    db.flush()
+    if db.bind.dialect.name != "postgresql":
+        report_search_index.build(db.query(Report.id, Report.title, Report.description))
+    matching = {report.id for report in reports[:12]}
+
+    service = ReportService(db)
+    seen = []
+    for page in range(1, 4):
+        result = service._query_reports(ReportQuery(q="pothole", page=page, per_page=5))
+        assert result.next_cursor is None
+        seen += [item["id"] for item in result.items]
+
+    assert len(seen) == len(set(seen))
+    assert matching <= set(seen)
+
+    newest = service._query_reports(ReportQuery(q="pothole", sort=ReportSort.NEWEST, per_page=5))
+    assert newest.next_cursor is not None
+
+
+def test_get_report_query_count(db, detailed_report, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    report_id, media = detailed_report
+    service = ReportService(db)
+
+    with count_statements(db) as statements:
+        response = asyncio.run(service.get_report(report_id))
+
+    # report, media (with has_variants), ml_artifacts, issue_labels
+    assert len(statements) == 4
+    assert len(response.media) == 3
+    assert [label.label for label in response.issue_labels] == ["flooding", "pothole"]
+    items = {item.id: item for item in response.media}
+    assert items[media[0].id].thumbnail_url.endswith(StorageService.variant_key(media[0].s3_key, "thumb"))
+    assert items[media[1].id].thumbnail_url == items[media[1].id].url
+    assert items[media[2].id].thumbnail_url is None
+
+
+def test_query_reports_query_count(db, detailed_report):
+    service = ReportService(db)
+    for count_mode, expected in [(CountMode.EXACT, 2), (CountMode.CAPPED, 2)]:
+        with count_statements(db) as statements:
+            result = service._query_reports(ReportQuery(per_page=5, count=count_mode))
+        assert len(statements) == expected, statements
+        assert result.items
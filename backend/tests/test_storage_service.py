@@ -0,0 +1,101 @@
+import asyncio
+import io
+import threading
+
+import pytest
+
+from app.services.storage_service import StorageService
+
+CHUNK_SIZE = 4
+
+
+class FakeUpload:
+    def __init__(self, data: bytes, filename="photo.jpg", content_type="image/jpeg"):
+        self.filename = filename
+        self.content_type = content_type
+        self._data = io.BytesIO(data)
+
+    async def read(self, size: int) -> bytes:
+        return self._data.read(size)
+
+
+class FakeS3:
+    """Records multipart calls; ``fail_part`` makes that part raise ``error``."""
+
+    def __init__(self, fail_part=None, error=None):
+        self.fail_part = fail_part
+        self.error = error
+        self.parts = []
+        self.completed = []
+        self.aborted = []
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, Bucket, Key, **extra):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise self.error
+        with self._lock:
+            self.parts.append(PartNumber)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed.append((Key, MultipartUpload["Parts"]))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append((Key, UploadId))
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.storage_service.settings.STORAGE_BACKEND", "local")
+    monkeypatch.setattr("app.services.storage_service.settings.LOCAL_STORAGE_DIR", str(tmp_path))
+    return StorageService()
+
+
+@pytest.fixture
+def s3_storage(local_storage):
+    local_storage.backend = "s3"
+    local_storage.chunk_size = CHUNK_SIZE
+    return local_storage
+
+
+def test_local_backend_round_trip(local_storage, tmp_path):
+    key = asyncio.run(local_storage.upload_file(FakeUpload(b"image bytes"), prefix="reports/"))
+
+    assert (tmp_path / key).read_bytes() == b"image bytes"
+    assert not list(tmp_path.rglob("*.part"))
+    assert local_storage.get_presigned_url(key).endswith(f"/{key}")
+
+    assert asyncio.run(local_storage.delete_files([key, "reports/missing.jpg"])) == 2
+    assert not (tmp_path / key).exists()
+
+
+def test_local_backend_rejects_keys_outside_storage_dir(local_storage):
+    with pytest.raises(ValueError):
+        asyncio.run(local_storage.upload_bytes(b"x", "../escape.jpg", "image/jpeg"))
+
+
+def test_multipart_upload_completes_in_order(s3_storage):
+    s3_storage.s3_client = FakeS3()
+
+    asyncio.run(s3_storage.upload_file(FakeUpload(b"0123456789")))
+
+    (_, parts), = s3_storage.s3_client.completed
+    assert [part["PartNumber"] for part in parts] == [1, 2, 3]
+    assert not s3_storage.s3_client.aborted
+
+
+@pytest.mark.parametrize("error, raised", [
+    (OSError("connection reset"), OSError),
+    (asyncio.CancelledError(), RuntimeError),
+])
+def test_failed_part_aborts_multipart_upload(s3_storage, error, raised):
+    s3_storage.s3_client = FakeS3(fail_part=2, error=error)
+
+    with pytest.raises(raised):
+        asyncio.run(s3_storage.upload_file(FakeUpload(b"0123456789abcdef")))
+
+    assert [upload_id for _, upload_id in s3_storage.s3_client.aborted] == ["upload-1"]
+    assert not s3_storage.s3_client.completed